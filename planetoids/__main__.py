@@ -25,4 +25,4 @@ from app import *
 
 # Application code
 if __name__ == '__main__':
-    Planetoids(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    Planetoids(width=GAME_WIDTH,height=GAME_HEIGHT,fps=GAME_FPS).run()
@@ -12,6 +12,11 @@ Dec 8, 2022
 from consts import *
 from game2d import *
 from wave import *
+from inputs import readMask
+from rewind import History
+from effects import Effects
+from shared import StatePublisher
+import atexit
 import json
 
 # PRIMARY RULE: Planetoids can only access attributes in wave.py via getters/setters
@@ -64,6 +69,12 @@ class Planetoids(GameApp):
     # Invariant: _wave is a Wave object, or None if there is no wave currently active.
     #            _wave is only None if _state is STATE_INACTIVE.
     #
+    # Attribute _history: the rewind history of the wave
+    # Invariant: _history is a History object, or None if _wave is None
+    #
+    # Attribute _publisher: the shared state block every wave publishes to
+    # Invariant: _publisher is a StatePublisher, or None if EXPORT_BLOCK is None
+    #
     # Attribute _title: the game title
     # Invariant: _title is a GLabel, or None if there is no title to display. It is None 
     #            whenever the _state is not STATE_INACTIVE.
@@ -73,10 +84,10 @@ class Planetoids(GameApp):
     #            only None if _state is STATE_ACTIVE.
     #
     # Attribute _score: Label to be displayed for the score
-    # Invariant: _score is a GLabel only not None when STATE_ACTIVE
+    # Invariant: _score is a GBitmapLabel only not None when STATE_ACTIVE
     #
     # Attribute _lives: Label to be displayed for the lives
-    # Invariant: _lives is a GLabel only not None when STATE_ACTIVE 
+    # Invariant: _lives is a GBitmapLabel only not None when STATE_ACTIVE 
 
     def start(self):
         """
@@ -89,26 +100,34 @@ class Planetoids(GameApp):
         This method should make sure that all of the attributes satisfy the given
         invariants. When done, it sets the _state to STATE_INACTIVE and creates both 
         the title (in attribute _title) and a message (in attribute _message) saying 
-        that the user should press a key to play a game.
+        that the user should press a key to play a game. It also packs the images of 
+        the game into a texture atlas, so that drawing a wave switches textures rarely.
         """
+        self.load_atlas(ATLAS_IMAGES)
         self._title = GLabel(text="Planetoids", font_size=TITLE_SIZE,
-            font_name=TITLE_FONT, halign='center')
+            font_name=TITLE_FONT, halign='center', layer='hud')
         self._title.bottom = self.height /2 + TITLE_OFFSET
         self._title.x = self.width/2
         
         self._message = GLabel(text="Press 'S' to Start", font_size=MESSAGE_SIZE,
-            font_name=MESSAGE_FONT, halign='center')
+            font_name=MESSAGE_FONT, halign='center', layer='hud')
         self._message.bottom = self.height /2 + MESSAGE_OFFSET
         self._message.x = self.width/2
 
         self._state = STATE_INACTIVE
         self._wave = None
-        self._score = GLabel(text="0", font_size=MESSAGE_SIZE,
-            font_name=MESSAGE_FONT)
+        self._history = None
+        self._publisher = None
+        if not EXPORT_BLOCK is None:
+            self._publisher = StatePublisher(EXPORT_BLOCK)
+            atexit.register(self._publisher.close)
+        # The score and lives change every frame, so their glyphs are rendered once
+        self._score = GBitmapLabel(text="0", font_size=MESSAGE_SIZE,
+            font_name=MESSAGE_FONT, layer='hud')
         self._score.top = self.height
         self._score.right = self.width
-        self._lives = GLabel(text=str(SHIP_LIVES), font_size=MESSAGE_SIZE, 
-            font_name=MESSAGE_FONT)
+        self._lives = GBitmapLabel(text=str(SHIP_LIVES), font_size=MESSAGE_SIZE, 
+            font_name=MESSAGE_FONT, layer='hud')
         self._lives.top = self.height
         self._lives.left = 0
 
@@ -149,6 +168,10 @@ class Planetoids(GameApp):
         application switches to this state if the state was STATE_PAUSED in the
         previous frame, and the player pressed a key. This state only lasts one animation
         frame before switching to STATE_ACTIVE.
+
+        In STATE_ACTIVE and STATE_PAUSED, holding REWIND_KEY plays the wave backwards
+        (see rewind.py) instead of updating it, back to REWIND_SECONDS ago at most.
+        Rewinding from STATE_PAUSED brings the ship back and returns to STATE_ACTIVE.
         
         You are allowed to add more states if you wish. Should you do so, you should
         describe them here.
@@ -165,11 +188,19 @@ class Planetoids(GameApp):
         if self._state == STATE_LOADING:
             dic = self.load_json(DEFAULT_WAVE)
             self._wave = Wave(dic)
+            self._wave.setEffects(Effects())
+            self._wave.setPublisher(self._publisher)
+            self._history = History()
             self._state = STATE_ACTIVE
 
         if self._state == STATE_ACTIVE:
+            if self.input.is_key_down(REWIND_KEY):
+                if len(self._history):
+                    self._history.rewind(self._wave, REWIND_SPEED)
+            else:
+                self._history.push(self._wave, readMask(self.input))
+                self._wave.update(self.input)
             self._wave.draw(self.view)
-            self._wave.update(self.input)
             self._score.text = "Score: " + str(self._wave.getScore())
             self._lives.text = "Lives: " + str(self._wave.getLives())
             if self._wave.pauseCheck():
@@ -179,13 +210,18 @@ class Planetoids(GameApp):
                 
         if self._state == STATE_PAUSED:
             self._message = GLabel(text="Press 'S' to Continue", 
-                font_size=MESSAGE_SIZE, font_name=MESSAGE_FONT, halign='center')
+                font_size=MESSAGE_SIZE, font_name=MESSAGE_FONT, halign='center',
+                layer='hud')
             self._message.bottom = self.height /2 + MESSAGE_OFFSET
             self._message.x = self.width/2
             if self.input.is_key_down('s'):
                 self._message = None
                 self._wave.resetShip()
                 self._state = STATE_ACTIVE    
+            elif self.input.is_key_down(REWIND_KEY) and len(self._history):
+                self._message = None
+                self._history.rewind(self._wave, REWIND_SPEED)
+                self._state = STATE_ACTIVE
         
         if self._state == STATE_COMPLETE:
             self._message = None
@@ -221,11 +257,11 @@ class Planetoids(GameApp):
         """
         if self._wave._lives == 0:
             self._message = GLabel(text="You lost!", font_size=TITLE_SIZE,
-                font_name=TITLE_FONT, halign='center')
+                font_name=TITLE_FONT, halign='center', layer='hud')
             self._message.bottom = self.height /2 + MESSAGE_OFFSET
             self._message.x = self.width/2
         else:
             self._message = GLabel(text="You Won!", font_size=TITLE_SIZE, 
-                font_name=TITLE_FONT, halign='center')
+                font_name=TITLE_FONT, halign='center', layer='hud')
             self._message.bottom = self.height /2 + MESSAGE_OFFSET
             self._message.x = self.width/2
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Tree-search autopilot for Planetoids
+
+This module contains a pilot that plays a wave by searching ahead with Monte Carlo
+tree search. Every AUTOPILOT_REPEAT frames it copies the wave and grows a search tree
+whose branches are the input masks over the four keys in INPUT_KEYS, each held for
+AUTOPILOT_REPEAT frames. Leaves are scored by a random rollout of AUTOPILOT_HORIZON
+frames, using the change in getScore() and getLives() over the rollout. The pilot
+then holds the most visited mask at the root.
+
+The search relies on Wave.copy, which copies the models without rebuilding their
+images, and on the headless step function, which never draws.
+
+To watch the throughput of the search, run
+
+    python planetoids/autopilot.py wave1.json
+
+from the root folder. It plays the wave and reports the rollouts per second.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from headless import *
+import argparse
+import math
+import time
+
+
+class _Node(object):
+    """
+    A single node in the search tree.
+
+    The wave of a node is the state after its mask was held from the parent wave.
+    """
+    # Attribute parent: the parent node
+    # Invariant: parent is a _Node, or None for the root
+    #
+    # Attribute mask: the input mask that led to this node
+    # Invariant: mask is an int, or None for the root
+    #
+    # Attribute wave: the wave state at this node
+    # Invariant: wave is a Wave object owned by this node
+    #
+    # Attribute children: the expanded children
+    # Invariant: children is a list of _Node
+    #
+    # Attribute untried: the masks not yet expanded
+    # Invariant: untried is a list of int
+    #
+    # Attribute visits: the number of rollouts through this node
+    # Invariant: visits is an int >= 0
+    #
+    # Attribute total: the sum of the rollout values through this node
+    # Invariant: total is a float
+
+    def __init__(self, parent, mask, wave, rng):
+        self.parent = parent
+        self.mask = mask
+        self.wave = wave
+        self.children = []
+        self.untried = list(range(1 << len(INPUT_KEYS)))
+        rng.shuffle(self.untried)
+        self.visits = 0
+        self.total = 0.0
+
+
+class AutoPilot(object):
+    """
+    A pilot that chooses its inputs with Monte Carlo tree search.
+
+    The pilot keeps running totals of the rollouts it has performed and the time it
+    has spent searching, for throughput reports.
+    """
+    # Attribute _iterations: the search iterations per decision
+    # Invariant: _iterations is an int > 0
+    #
+    # Attribute _held: the mask chosen at the last decision
+    # Invariant: _held is an int
+    #
+    # Attribute rollouts: the number of rollouts performed so far
+    # Invariant: rollouts is an int >= 0
+    #
+    # Attribute frames: the number of frames simulated by the search so far
+    # Invariant: frames is an int >= 0
+    #
+    # Attribute seconds: the time spent searching so far
+    # Invariant: seconds is a float >= 0
+
+    def __init__(self, iterations=AUTOPILOT_ITERATIONS):
+        self._iterations = iterations
+        self._held = 0
+        self.rollouts = 0
+        self.frames = 0
+        self.seconds = 0.0
+
+    def __call__(self, wave, frame, rng):
+        if frame % AUTOPILOT_REPEAT == 0:
+            self._held = self.plan(wave, rng)
+        return self._held
+
+    def plan(self, wave, rng):
+        """
+        Returns the best input mask for wave found by the tree search
+
+        Parameter wave: The wave to plan for (it is not modified)
+        Precondition: wave is a Wave object
+
+        Parameter rng: The random number generator for the search
+        Precondition: rng is a random.Random
+        """
+        start = time.perf_counter()
+        root = _Node(None, None, wave.copy(), rng)
+        self._base = (wave.getScore(), wave.getLives())
+        self._low = None
+        self._high = None
+        for i in range(self._iterations):
+            node = root
+            while not node.untried and node.children:
+                node = self._select(node)
+            if node.untried and not node.wave.endCheck():
+                node = self._expand(node, rng)
+            value = self._rollout(node.wave, rng)
+            while not node is None:
+                node.visits += 1
+                node.total += value
+                node = node.parent
+        self.seconds += time.perf_counter()-start
+
+        best = max(root.children, key=lambda c: c.visits, default=None)
+        return 0 if best is None else best.mask
+
+    def report(self):
+        """
+        Returns a readable summary of the search throughput so far
+        """
+        seconds = max(self.seconds, 1e-9)
+        return '%d rollouts in %.2fs: %.0f rollouts/s, %.0f simulated frames/s' % (
+            self.rollouts, self.seconds, self.rollouts/seconds, self.frames/seconds)
+
+    def _select(self, node):
+        """
+        Returns the child of node with the best upper confidence bound.
+
+        Rollout values are rescaled to 0..1 by the range seen so far in this search.
+        """
+        span = max(self._high-self._low, 1e-9)
+        log = math.log(node.visits)
+        best = None
+        bound = None
+        for child in node.children:
+            mean = (child.total/child.visits-self._low)/span
+            b = mean+AUTOPILOT_EXPLORE*math.sqrt(log/child.visits)
+            if bound is None or b > bound:
+                best = child
+                bound = b
+        return best
+
+    def _expand(self, node, rng):
+        """
+        Returns a new child of node for one of its untried masks
+        """
+        mask = node.untried.pop()
+        wave = node.wave.copy()
+        for frame in range(AUTOPILOT_REPEAT):
+            if wave.endCheck():
+                break
+            step(wave, mask)
+            self.frames += 1
+        child = _Node(node, mask, wave, rng)
+        node.children.append(child)
+        return child
+
+    def _rollout(self, wave, rng):
+        """
+        Returns the value of a random rollout from wave (which is not modified)
+        """
+        wave = wave.copy()
+        mask = 0
+        for frame in range(AUTOPILOT_HORIZON):
+            if wave.endCheck():
+                break
+            if frame % AUTOPILOT_REPEAT == 0:
+                mask = rng.randrange(1 << len(INPUT_KEYS))
+            step(wave, mask)
+            self.frames += 1
+        self.rollouts += 1
+
+        lost = self._base[1]-wave.getLives()
+        value = wave.getScore()-self._base[0]-AUTOPILOT_LIFE_COST*lost
+        if wave.endCheck() and wave.getLives() > 0:
+            value += AUTOPILOT_LIFE_COST
+        self._low = value if self._low is None else min(self._low, value)
+        self._high = value if self._high is None else max(self._high, value)
+        return value
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play waves with the tree-search autopilot.')
+    parser.add_argument('waves', nargs='*', help='wave files in Data (default: all)')
+    parser.add_argument('--frames', type=int, default=600, help='frames to play per wave')
+    parser.add_argument('--iterations', type=int, default=AUTOPILOT_ITERATIONS,
+        help='search iterations per decision')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the search')
+    args = parser.parse_args()
+
+    for name in args.waves or waveNames():
+        wave = Wave(loadWave(name))
+        pilot = AutoPilot(args.iterations)
+        masks = run(wave, pilot, args.frames, args.seed)
+        print('%s: score %d, lives %d after %d frames; %s' % (name, wave.getScore(),
+            wave.getLives(), len(masks), pilot.report()))
@@ -0,0 +1,148 @@
+"""
+Batch runner for balancing Planetoids waves
+
+This module plays many headless games at once to compare waves. It takes every
+combination of wave files, pilot random seeds and pilots, and fans them out over a
+pool of worker processes. Each worker plays one game with the headless loop and
+returns its results, and the runner merges them into a single columnar JSON file:
+an object mapping each column name to the list of its values, one per game.
+
+The columns are the wave, seed and pilot of the game; the final score and lives; the
+number of frames played and the frames needed to clear the wave (-1 if it was not
+cleared); and the mean, median, 99th percentile and worst time taken to step a frame,
+in microseconds.
+
+For example, to play all waves with 16 seeds of the random and turret pilots, run
+
+    python planetoids/batch.py --seeds 16 --pilots random turret
+
+from the root folder. Use --help to see all of the options.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from headless import *
+from autopilot import AutoPilot
+import argparse
+import multiprocessing
+import concurrent.futures
+
+# The pilots available to the batch runner
+BATCH_PILOTS = dict(PILOTS, auto=AutoPilot)
+
+# The columns of the output file, in order
+COLUMNS = ('wave', 'seed', 'pilot', 'score', 'lives', 'frames', 'clear_frames',
+    'mean_us', 'p50_us', 'p99_us', 'max_us')
+
+
+def percentile(values, fraction):
+    """
+    Returns the value at the given fraction of the sorted list values
+
+    Parameter values: The sorted values
+    Precondition: values is a non-empty sorted list of numbers
+
+    Parameter fraction: The fraction of the way through the list
+    Precondition: fraction is a float in 0..1
+    """
+    return values[min(int(fraction*len(values)), len(values)-1)]
+
+
+def warmup():
+    """
+    Prepares a worker process by loading the textures that the models use.
+
+    Otherwise the first few frames of the first game in each worker would pay for
+    loading them, skewing the frame-cost columns.
+    """
+    bootstrap()
+    for name in (SHIP_IMAGE, LARGE_IMAGE, MEDIUM_IMAGE, SMALL_IMAGE):
+        GameApp.load_texture(name)
+
+
+def play(job):
+    """
+    Returns the results of playing one game as a dictionary of column values.
+
+    This function is run in the worker processes.
+
+    Parameter job: The game to play
+    Precondition: job is a tuple (wave name, seed, pilot name, frames)
+    """
+    name, seed, pilot, frames = job
+    wave = Wave(loadWave(name))
+    costs = []
+    masks = run(wave, BATCH_PILOTS[pilot](), frames, seed, costs=costs)
+    cleared = wave.endCheck() and wave.getLives() > 0
+    costs.sort()
+    if not costs:
+        costs = [0.0]
+    return {'wave': name, 'seed': seed, 'pilot': pilot, 'score': wave.getScore(),
+        'lives': wave.getLives(), 'frames': len(masks),
+        'clear_frames': len(masks) if cleared else -1,
+        'mean_us': 1e6*sum(costs)/len(costs), 'p50_us': 1e6*percentile(costs, 0.5),
+        'p99_us': 1e6*percentile(costs, 0.99), 'max_us': 1e6*costs[-1]}
+
+
+def runBatch(jobs, workers=None):
+    """
+    Returns the results of all jobs merged into columns.
+
+    The jobs are played on a pool of worker processes. The results are in the same
+    order as the jobs, no matter which worker finished first.
+
+    Parameter jobs: The games to play
+    Precondition: jobs is a list of job tuples (see play)
+
+    Parameter workers: The number of worker processes
+    Precondition: workers is None (one per CPU) or an int > 0
+    """
+    # Kivy does not survive a fork, so every worker starts a fresh interpreter
+    context = multiprocessing.get_context('spawn')
+    chunk = max(1, len(jobs)//(4*(workers or os.cpu_count() or 1)))
+    columns = {c: [] for c in COLUMNS}
+    with concurrent.futures.ProcessPoolExecutor(workers, mp_context=context,
+            initializer=warmup) as pool:
+        for result in pool.map(play, jobs, chunksize=chunk):
+            for c in COLUMNS:
+                columns[c].append(result[c])
+    return columns
+
+
+def summarize(columns):
+    """
+    Prints the mean score and clear rate of every wave and pilot combination
+    """
+    groups = {}
+    for i in range(len(columns['wave'])):
+        key = (columns['wave'][i], columns['pilot'][i])
+        groups.setdefault(key, []).append(i)
+    for key in sorted(groups):
+        rows = groups[key]
+        score = sum(columns['score'][i] for i in rows)/len(rows)
+        clear = sum(1 for i in rows if columns['clear_frames'][i] >= 0)
+        cost = sum(columns['mean_us'][i] for i in rows)/len(rows)
+        print('%-12s %-8s games %4d  mean score %7.1f  cleared %4d  %.0f us/frame'
+            % (key[0], key[1], len(rows), score, clear, cost))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play waves x seeds x pilots headless.')
+    parser.add_argument('--waves', nargs='*', help='wave files in Data (default: all)')
+    parser.add_argument('--seeds', type=int, default=4, help='number of seeds per game')
+    parser.add_argument('--first-seed', type=int, default=0, help='the first seed')
+    parser.add_argument('--pilots', nargs='*', default=['random'],
+        choices=sorted(BATCH_PILOTS), help='pilots to play with')
+    parser.add_argument('--frames', type=int, default=3600, help='maximum frames per game')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes')
+    parser.add_argument('--output', default='batch.json', help='columnar JSON output file')
+    args = parser.parse_args()
+
+    jobs = [(name, seed, pilot, args.frames) for name in (args.waves or waveNames())
+        for pilot in args.pilots
+        for seed in range(args.first_seed, args.first_seed+args.seeds)]
+    columns = runBatch(jobs, args.workers)
+    with open(args.output, 'w') as f:
+        json.dump(columns, f)
+    summarize(columns)
+    print('wrote %d games to %s' % (len(jobs), args.output))
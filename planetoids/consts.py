@@ -19,6 +19,8 @@ GAME_WIDTH  = 800
 GAME_HEIGHT = 700
 # The offscreen dead zone for "wrapping"
 DEAD_ZONE = 48
+# The animation frames per second of the game
+GAME_FPS = 60
 
 ### SHIP CONSTANTS ###
 
@@ -72,6 +74,11 @@ SMALL_RADIUS = 16
 # The speed of a small planetoid
 SMALL_SPEED  = 3
 
+# The reach of the blast of an explosive planetoid, beyond the radius of what it hits
+EXPLOSIVE_RADIUS = 96
+# The color that explosive planetoids are tinted
+EXPLOSIVE_COLOR  = 'orange'
+
 ### BULLET CONSTANTS ###
 
 # The radius of a bullet (width/2 and height/2)
@@ -114,6 +121,178 @@ MESSAGE_SIZE = 60
 # The y-offset for the message (the value to add to the center y value)
 MESSAGE_OFFSET = -70
 
+### INPUT CONSTANTS ###
+
+# The keys read by Wave.update, in the bit order of an input mask
+INPUT_KEYS = ('left', 'right', 'up', 'spacebar')
+
+### HEADLESS CONSTANTS ###
+
+# The folder (next to Data) holding the golden state-hash traces
+TRACE_FOLDER = 'Traces'
+# The number of frames recorded in a golden trace
+TRACE_FRAMES = 600
+# The number of sub-pixel steps used when quantizing state for hashing
+TRACE_QUANTUM = 1024
+
+### AUTOPILOT CONSTANTS ###
+
+# The number of tree-search iterations the autopilot runs per decision
+AUTOPILOT_ITERATIONS = 48
+# The number of frames an input mask is held for in the search tree
+AUTOPILOT_REPEAT = 6
+# The number of frames in a random rollout from a leaf of the search tree
+AUTOPILOT_HORIZON = 30
+# The score penalty for losing a life during a rollout
+AUTOPILOT_LIFE_COST = 100
+# The exploration constant for choosing children in the search tree
+AUTOPILOT_EXPLORE = 1.4
+
+### SERVER CONSTANTS ###
+
+# The number of simulation ticks per second on the match server
+SERVER_TICK_RATE = 60
+# The default local TCP port of the match server
+SERVER_PORT = 8765
+# The number of ticks between state messages sent to match clients
+SERVER_STATE_EVERY = 1
+# The most bytes of unsent messages a match client may fall behind by before it is dropped
+SERVER_SEND_LIMIT = 1 << 20
+
+### SYNC CONSTANTS ###
+
+# The number of steps per pixel when quantizing positions for state sync
+SYNC_POSITION_QUANTUM = 8
+# The number of steps per pixel/frame when quantizing velocities for state sync
+SYNC_VELOCITY_QUANTUM = 256
+# The number of steps per degree when quantizing angles for state sync
+SYNC_ANGLE_QUANTUM = 16
+# The number of sent snapshots a sync encoder keeps while waiting for an ack
+SYNC_HISTORY = 120
+
+### VERSUS CONSTANTS ###
+
+# The most frames a versus peer may run ahead of the last confirmed remote input
+VERSUS_MAX_ROLLBACK = 8
+# The score for destroying the other player's ship in versus mode
+VERSUS_KILL_SCORE = 50
+# The number of recent inputs repeated in every versus input packet
+VERSUS_REDUNDANCY = 4
+# The local UDP port of the first versus player (the second uses the next port)
+VERSUS_PORT = 9110
+
+### EXPORT CONSTANTS ###
+
+# The default number of entities a shared state block can hold
+EXPORT_CAPACITY = 4096
+# The shared state block the game publishes to, or None not to publish (see below)
+EXPORT_BLOCK = None
+
+### PARTITION CONSTANTS ###
+
+# The default number of worker processes (and strips) of a partitioned field
+PARTITION_WORKERS = 4
+# The spare rows in each partition buffer, and the most bullets fired into a strip per tick
+PARTITION_SLACK = 65536
+# The asteroids per window-sized area of the fields used to benchmark partitioning
+PARTITION_DENSITY = 50
+
+### TIMER CONSTANTS ###
+
+# The number of slots in each level of a timing wheel
+TIMER_SLOTS = 64
+# The number of levels of a timing wheel (timers reach TIMER_SLOTS**TIMER_LEVELS frames)
+TIMER_LEVELS = 4
+
+### COLLISION CONSTANTS ###
+
+# The collision layer bits of the groups of entities
+LAYER_SHIP         = 1
+LAYER_BULLET       = 2
+LAYER_ASTEROID     = 4
+# Layers reserved for pickups, enemies and enemy bullets
+LAYER_PICKUP       = 8
+LAYER_ENEMY        = 16
+LAYER_ENEMY_BULLET = 32
+# The layer of each entity kind, as named by Wave.getEntities
+KIND_LAYERS = {'ship': LAYER_SHIP, 'bullet': LAYER_BULLET, SMALL_ASTEROID: LAYER_ASTEROID,
+    MEDIUM_ASTEROID: LAYER_ASTEROID, LARGE_ASTEROID: LAYER_ASTEROID}
+# The layers each layer collides with. Every entry must agree with its reverse.
+LAYER_MASKS = {
+    LAYER_SHIP:         LAYER_ASTEROID | LAYER_PICKUP | LAYER_ENEMY | LAYER_ENEMY_BULLET,
+    LAYER_BULLET:       LAYER_ASTEROID | LAYER_ENEMY,
+    LAYER_ASTEROID:     LAYER_SHIP | LAYER_BULLET | LAYER_ENEMY,
+    LAYER_PICKUP:       LAYER_SHIP,
+    LAYER_ENEMY:        LAYER_SHIP | LAYER_BULLET | LAYER_ASTEROID,
+    LAYER_ENEMY_BULLET: LAYER_SHIP,
+}
+
+### NEAREST CONSTANTS ###
+
+# The asteroids per grid cell that a nearest-asteroid index aims for
+NEAREST_PER_CELL = 2
+# The most asteroids that a nearest-asteroid index scans linearly instead of by grid
+NEAREST_SCAN = 64
+# The most (query, asteroid) pairs that a linear scan measures at once
+NEAREST_SCAN_PAIRS = 1 << 18
+# The half-angle in degrees of the aim-assist cone of a ship or missile
+NEAREST_SPREAD = 30
+# The length of the aim-assist cone of a ship or missile
+NEAREST_REACH = 300
+
+### REWIND CONSTANTS ###
+
+# The seconds of play a rewind history always keeps
+REWIND_SECONDS = 5
+# The frames between the full keyframes of a rewind history
+REWIND_KEYFRAME = 30
+# The key held down to rewind the game
+REWIND_KEY = 'r'
+# The frames rewound for each frame the rewind key is held
+REWIND_SPEED = 2
+
+### EFFECT CONSTANTS ###
+
+# The filmstrip of explosion particles, and its grid as (rows, columns)
+EXPLOSION_IMAGE  = 'explosion.png'
+EXPLOSION_FORMAT = (2,4)
+# The size of an explosion particle at scale 1
+EXPLOSION_SIZE   = 24
+# The particles thrown out by destroying a small asteroid (larger ones throw more)
+EXPLOSION_PARTICLES = 40
+# The frames an explosion particle lives, as a (low, high) range
+EXPLOSION_LIFE   = (20,45)
+# The speed of explosion particles, as a (low, high) range
+EXPLOSION_SPEED  = (0.5,3.0)
+# The particles of ship thrust per frame the up arrow is held
+THRUST_PARTICLES = 4
+# The frames a thrust particle lives, as a (low, high) range
+THRUST_LIFE      = (8,16)
+# The speed of thrust particles away from the back of the ship, as a (low, high) range
+THRUST_SPEED     = (1.5,3.0)
+# The most particles of each effect alive at once
+EFFECT_CAPACITY  = 8192
+
+### ATLAS CONSTANTS ###
+
+# The images packed into the texture atlas when the game starts
+ATLAS_IMAGES = [SHIP_IMAGE, LARGE_IMAGE, MEDIUM_IMAGE, SMALL_IMAGE, EXPLOSION_IMAGE]
+
+### FRAME CONSTANTS ###
+
+# The folder (next to Data) holding the golden frame images
+FRAME_FOLDER    = 'Frames'
+# The frames of the replay of each golden trace saved as golden images
+FRAME_GOLDEN    = (0, 150, 300, 450)
+# The size of frame images, as a fraction of the game window
+FRAME_SCALE     = 0.5
+# The seed for the particle effects of rendered frames
+FRAME_SEED      = 1110
+# The most a pixel channel (0..255) may differ from its golden image without counting
+FRAME_THRESHOLD = 48
+# The fraction of the pixels that may count as different in a matching frame
+FRAME_TOLERANCE = 0.002
+
 ### JSON FILES ###
 
 # The default wave
@@ -129,9 +308,17 @@ everything after the word python. So if you start the game typing
 Python puts ['planetoids', 'default.json'] into sys.argv. Below, we take advantage of 
 this fact to change the constant DEFAULT_LEVEL. This is the level file to be used when 
 you start the game.  
+
+Adding --export NAME (before or after the level file) sets EXPORT_BLOCK, so that the
+game publishes its state to the shared memory block NAME (see shared.py).
 """
+args = sys.argv[1:]
+if '--export' in args[:-1]:
+    index = args.index('--export')
+    EXPORT_BLOCK = args[index+1]
+    del args[index:index+2]
 try:
-    file = sys.argv[1]
+    file = args[0]
     if file[-5:].lower() == '.json':
         DEFAULT_WAVE = file
     else:
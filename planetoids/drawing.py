@@ -0,0 +1,334 @@
+"""
+Drawing benchmarks for Planetoids
+
+This module measures what it costs to put a wave on screen, frame by frame. It
+plays a wave headlessly with a pilot, draws it to a GView attached to the Kivy
+window every frame, and times the two halves of a frame separately:
+
+    submit  the Python side: GObject.draw calls and GView.commit
+    render  the GL side: Kivy drawing the window canvas
+
+The view is compared with an immediate-mode view that empties its canvas and adds
+everything again every frame, as GView did before it was retained. The asteroids
+are also drawn as one GImage each against a single GSpriteBatch, and waves are
+drawn with and without the texture atlas, counting the texture switches per frame.
+Asteroids spread far past the window are drawn with and without culling. Finally,
+a score and a lives label that change every frame are drawn as GLabels and as
+GBitmapLabels.
+
+To run the benchmarks with waves of a growing number of asteroids, run
+
+    python planetoids/drawing.py
+
+from the root folder. This needs a display (or a virtual one) for the Kivy window.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from consts import *
+from headless import *
+import numpy as np
+
+# The distance from the ship start that the asteroids of openWave keep clear of
+CLEAR_RADIUS = 260
+
+
+class RedrawView(GView):
+    """
+    A view that clears its canvas and adds every command again each frame.
+
+    This is how GView used to work, kept here to compare against.
+    """
+
+    def clear(self):
+        self._frame.clear()
+        self._contents = set()
+        self._changes = 0
+        self._culled = 0
+
+    def draw(self, cmd, layer=None):
+        if not cmd in self._contents:
+            self._frame.add(cmd)
+            self._contents.add(cmd)
+            self._changes += 1
+
+    def commit(self):
+        pass
+
+
+def openWave(count, seed=0, spread=1):
+    """
+    Returns the JSON dictionary of wave1.json with count random asteroids, none of
+    them within CLEAR_RADIUS of where the ship starts.
+
+    The ship survives the first couple of seconds, however many asteroids there
+    are, so that every frame of a short benchmark is drawn.
+
+    The asteroids are spread over an area spread windows wide and spread windows
+    tall, with the window in its bottom left corner. Asteroids past the window wrap
+    back onto it as soon as they move, so such a wave is only drawn, never played.
+    """
+    data = loadWave('wave1.json')
+    rng = random.Random(seed)
+    (x0, y0) = data['ship']['position']
+    sizes = (SMALL_ASTEROID, MEDIUM_ASTEROID, LARGE_ASTEROID)
+    data['asteroids'] = []
+    while len(data['asteroids']) < count:
+        (x, y) = (rng.uniform(0, spread*GAME_WIDTH), rng.uniform(0, spread*GAME_HEIGHT))
+        if (x-x0)**2+(y-y0)**2 > CLEAR_RADIUS**2:
+            data['asteroids'].append({'size': rng.choice(sizes), 'position': [x, y],
+                'direction': [rng.uniform(-1, 1), rng.uniform(-1, 1)]})
+    return data
+
+
+def textureBinds(group):
+    """
+    Returns the number of times the texture changes when drawing group, in order
+
+    Drawing without a texture uses Kivy's blank one, which counts as a texture.
+
+    Parameter group: The instructions to draw
+    Precondition: group is a Kivy InstructionGroup or Canvas
+    """
+    from kivy.graphics.instructions import VertexInstruction
+    binds = 0
+    last = None
+    stack = [iter(group.children)]
+    while stack:
+        instruction = next(stack[-1], None)
+        if instruction is None:
+            stack.pop()
+        elif hasattr(instruction, 'children'):
+            stack.append(iter(instruction.children))
+        elif isinstance(instruction, VertexInstruction):
+            texture = instruction.texture
+            name = None if texture is None else texture.id
+            if binds == 0 or name != last:
+                binds += 1
+                last = name
+    return binds
+
+
+def measure(view, wave, frames, pilot, seed=0):
+    """
+    Returns the mean (submit, render, changes) per frame of drawing wave to view
+
+    Parameter view: The view to draw to
+    Precondition: view is a GView attached to the Kivy window
+
+    Parameter wave: The wave to play
+    Precondition: wave is a Wave object
+
+    Parameter frames: The number of frames to play
+    Precondition: frames is an int > 0
+
+    Parameter pilot: The pilot flying the ship
+    Precondition: pilot is a pilot as in headless.py
+    """
+    from kivy.core.window import Window
+    rng = random.Random(seed)
+    submit = render = 0.0
+    changes = 0
+    for frame in range(frames):
+        step(wave, pilot(wave, frame, rng))
+        start = time.perf_counter()
+        view.clear()
+        wave.draw(view)
+        view.commit()
+        submit += time.perf_counter()-start
+        changes += view.changes
+        start = time.perf_counter()
+        Window.dispatch('on_draw')
+        render += time.perf_counter()-start
+    return (submit/frames, render/frames, changes/frames)
+
+
+def bench(count, frames=120, seed=0):
+    """
+    Prints the drawing costs of a wave of count asteroids with each kind of view
+    """
+    from kivy.core.window import Window
+    results = []
+    for kind in (RedrawView, GView):
+        view = kind()
+        Window.add_widget(view)
+        wave = Wave(openWave(count, seed))
+        results.append(measure(view, wave, frames, TurretPilot(), seed))
+        Window.remove_widget(view)
+    (redraw, retained) = results
+    print('%4d asteroids: redraw submit %.2f ms render %.2f ms (%.0f changes); '
+        'retained submit %.2f ms render %.2f ms (%.1f changes per frame)' % (count,
+        1000*redraw[0], 1000*redraw[1], redraw[2], 1000*retained[0],
+        1000*retained[1], retained[2]))
+
+
+def benchBatch(count, frames=30, seed=0):
+    """
+    Prints the median drawing costs of count turning asteroids, drawn as one GImage
+    each and as one GSpriteBatch.
+
+    Medians rather than means, as the software renderer stalls now and then for far
+    longer than a frame takes.
+    """
+    from kivy.core.window import Window
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0, GAME_WIDTH, count)
+    y = rng.uniform(0, GAME_HEIGHT, count)
+    angle = rng.uniform(0, 360, count)
+    results = []
+    for batched in (False, True):
+        view = GView()
+        Window.add_widget(view)
+        if batched:
+            batch = GSpriteBatch(source=MEDIUM_IMAGE, width=MEDIUM_RADIUS*2,
+                height=MEDIUM_RADIUS*2)
+        else:
+            images = [GImage(source=MEDIUM_IMAGE, width=MEDIUM_RADIUS*2,
+                height=MEDIUM_RADIUS*2) for _ in range(count)]
+        submit = []
+        render = []
+        for frame in range(frames):
+            angle += 1
+            start = time.perf_counter()
+            view.clear()
+            if batched:
+                batch.set(np.column_stack((x, y)), angle)
+                batch.draw(view)
+            else:
+                for k in range(count):
+                    images[k].x = float(x[k])
+                    images[k].y = float(y[k])
+                    images[k].angle = float(angle[k])
+                    images[k].draw(view)
+            view.commit()
+            submit.append(time.perf_counter()-start)
+            start = time.perf_counter()
+            Window.dispatch('on_draw')
+            render.append(time.perf_counter()-start)
+        Window.remove_widget(view)
+        results.append((np.median(submit), np.median(render)))
+    ((single, drawn), (batched, rendered)) = results
+    print('%5d asteroids: images submit %.2f ms render %.2f ms; '
+        'batch submit %.2f ms render %.2f ms' % (count, 1000*single, 1000*drawn,
+        1000*batched, 1000*rendered))
+
+
+def benchAtlas(count, frames=60, seed=0):
+    """
+    Prints the texture switches and median render cost per frame of a wave of count
+    asteroids, with each image its own texture and with the texture atlas
+    """
+    from kivy.core.window import Window
+    results = []
+    for atlas in (False, True):
+        GameApp.TEXTURE_CACHE.clear()
+        if atlas:
+            GameApp.load_atlas(ATLAS_IMAGES)
+        else:
+            GameApp.unload_atlas()
+        view = GView()
+        Window.add_widget(view)
+        wave = Wave(openWave(count, seed))
+        rng = random.Random(seed)
+        pilot = TurretPilot()
+        binds = []
+        render = []
+        for frame in range(frames):
+            step(wave, pilot(wave, frame, rng))
+            view.clear()
+            wave.draw(view)
+            view.commit()
+            binds.append(textureBinds(view.canvas))
+            start = time.perf_counter()
+            Window.dispatch('on_draw')
+            render.append(time.perf_counter()-start)
+        Window.remove_widget(view)
+        results.append((np.mean(binds), np.median(render)))
+    GameApp.unload_atlas()
+    ((binds, render), (packed, rendered)) = results
+    print('%4d asteroids: %.1f texture switches per frame, render %.2f ms; with the '
+        'atlas %.1f switches, render %.2f ms' % (count, binds, 1000*render, packed,
+        1000*rendered))
+
+
+def benchCull(count, spread=4, frames=60, seed=0):
+    """
+    Prints the median drawing costs of a still wave of count asteroids spread over
+    an area spread windows across, with and without culling, and how many asteroids
+    were culled per frame.
+    """
+    from kivy.core.window import Window
+    wave = Wave(openWave(count, seed, spread))
+    results = []
+    for culling in (False, True):
+        view = GView()
+        view.culling = culling
+        Window.add_widget(view)
+        submit = []
+        render = []
+        for frame in range(frames):
+            start = time.perf_counter()
+            view.clear()
+            wave.draw(view)
+            view.commit()
+            submit.append(time.perf_counter()-start)
+            start = time.perf_counter()
+            Window.dispatch('on_draw')
+            render.append(time.perf_counter()-start)
+        culled = view.culled
+        Window.remove_widget(view)
+        results.append((np.median(submit), np.median(render)))
+    ((submit, render), (cullSubmit, cullRender)) = results
+    print('%4d asteroids over %dx%d windows: submit %.2f ms render %.2f ms; culling '
+        '%d of them, submit %.2f ms render %.2f ms' % (count, spread, spread,
+        1000*submit, 1000*render, culled, 1000*cullSubmit, 1000*cullRender))
+
+
+def benchLabels(frames=120):
+    """
+    Prints the median drawing costs of a score and a lives label whose text changes
+    every frame, as GLabels and as GBitmapLabels
+    """
+    from kivy.core.window import Window
+    results = []
+    for kind in (GLabel, GBitmapLabel):
+        view = GView()
+        Window.add_widget(view)
+        score = kind(text='Score: 0', font_size=MESSAGE_SIZE, font_name=MESSAGE_FONT)
+        score.top = Window.height
+        score.right = Window.width
+        lives = kind(text='Lives: 3', font_size=MESSAGE_SIZE, font_name=MESSAGE_FONT)
+        lives.top = Window.height
+        lives.left = 0
+        submit = []
+        render = []
+        for frame in range(frames):
+            start = time.perf_counter()
+            view.clear()
+            score.text = 'Score: ' + str(frame*10)
+            lives.text = 'Lives: ' + str(3-frame*3//frames)
+            score.draw(view)
+            lives.draw(view)
+            view.commit()
+            submit.append(time.perf_counter()-start)
+            start = time.perf_counter()
+            Window.dispatch('on_draw')
+            render.append(time.perf_counter()-start)
+        Window.remove_widget(view)
+        results.append((np.median(submit), np.median(render)))
+    ((label, drawn), (bitmap, rendered)) = results
+    print('score and lives: labels submit %.2f ms render %.2f ms; bitmap labels submit '
+        '%.2f ms render %.2f ms' % (1000*label, 1000*drawn, 1000*bitmap, 1000*rendered))
+
+
+if __name__ == '__main__':
+    bootstrap()
+    for count in (10, 100, 1000):
+        bench(count)
+    for count in (100, 1000, 5000):
+        benchBatch(count)
+    for count in (10, 100, 1000):
+        benchAtlas(count)
+    for count in (100, 1000, 5000):
+        benchCull(count)
+    benchLabels()
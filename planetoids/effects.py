@@ -0,0 +1,151 @@
+"""
+Particle effects for Planetoids
+
+This module contains the Effects class, which owns the particle systems of a wave:
+the debris of destroyed asteroids and the flame behind the ship while it thrusts.
+The particles are only for show. They never collide with anything, so they are not
+part of the wave state, and Wave.copy leaves them out. A wave without effects (as
+in the headless tools) plays exactly as one with them.
+
+Every effect is a GParticleSystem, so each one is drawn as a single mesh however
+many particles it has. To compare the cost of moving particles in arrays with one
+GEllipse per particle (as samples/pyro.py does), run
+
+    python planetoids/effects.py
+
+from the root folder.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from consts import *
+from game2d import *
+import math
+import random
+import time
+
+# The particles thrown out per asteroid size, in multiples of EXPLOSION_PARTICLES
+EXPLOSION_SCALE = {SMALL_ASTEROID: 1, MEDIUM_ASTEROID: 2, LARGE_ASTEROID: 4}
+
+
+class Effects(object):
+    """
+    The particle effects of a wave, drawn on the effects layer of the view.
+    """
+    # Attribute _debris: the particles of destroyed asteroids and ships
+    # Invariant: _debris is a GParticleSystem
+    #
+    # Attribute _flame: the particles of the ship thrust
+    # Invariant: _flame is a GParticleSystem
+
+    def __init__(self, seed=None):
+        self._debris = GParticleSystem(source=EXPLOSION_IMAGE, format=EXPLOSION_FORMAT,
+            width=EXPLOSION_SIZE, height=EXPLOSION_SIZE, drag=0.03,
+            capacity=EFFECT_CAPACITY, seed=seed, layer='effects')
+        self._flame = GParticleSystem(source=EXPLOSION_IMAGE, format=EXPLOSION_FORMAT,
+            width=EXPLOSION_SIZE/2, height=EXPLOSION_SIZE/2,
+            capacity=EFFECT_CAPACITY, seed=seed, layer='effects')
+
+    def getCount(self):
+        """
+        Returns the number of particles alive
+        """
+        return self._debris.count+self._flame.count
+
+    def explode(self, x, y, size):
+        """
+        Throws out the debris of an asteroid of the given size at (x, y)
+
+        Parameter size: The size of the asteroid destroyed
+        Precondition: size is a key of EXPLOSION_SCALE
+        """
+        scale = EXPLOSION_SCALE[size]
+        self._debris.emit(x, y, EXPLOSION_PARTICLES*scale, speed=EXPLOSION_SPEED,
+            life=EXPLOSION_LIFE, scale=(0.5*scale**0.5, 1.5*scale**0.5), spin=(-4, 4))
+
+    def thrust(self, ship):
+        """
+        Adds the flame behind ship for one frame of thrust
+
+        Parameter ship: The ship thrusting
+        Precondition: ship is a Ship object
+        """
+        facing = ship.getFacing()
+        velocity = ship.getVelocity()
+        self._flame.emit(ship.x-facing.x*SHIP_RADIUS, ship.y-facing.y*SHIP_RADIUS,
+            THRUST_PARTICLES, angle=math.degrees(math.atan2(-facing.y, -facing.x)),
+            spread=30, speed=THRUST_SPEED, life=THRUST_LIFE, scale=(0.5, 1.0),
+            velocity=(velocity.x, velocity.y))
+
+    def update(self):
+        """
+        Moves every particle forward one frame
+        """
+        self._debris.update()
+        self._flame.update()
+
+    def clear(self):
+        """
+        Removes every particle
+        """
+        self._debris.clear()
+        self._flame.clear()
+
+    def draw(self, view):
+        """
+        Draws the particles to view
+        """
+        self._flame.draw(view)
+        self._debris.draw(view)
+
+
+class Spark(GEllipse):
+    """
+    A particle as its own GEllipse, moved one at a time as in samples/pyro.py
+    """
+    # Attribute _vx, _vy: the velocity of the spark
+    # Invariant: _vx and _vy are floats
+
+    def __init__(self, x, y, vx, vy):
+        super().__init__(x=x, y=y, width=4, height=4, fillcolor='white')
+        self._vx = vx
+        self._vy = vy
+
+    def move(self):
+        """
+        Moves the spark one frame, pulled down by gravity
+        """
+        self._vy -= 0.05
+        self.x += self._vx
+        self.y += self._vy
+
+
+def bench(count, frames=60, seed=0):
+    """
+    Prints the cost per frame of moving count particles as a GParticleSystem and
+    as a list of Sparks
+    """
+    rng = random.Random(seed)
+    system = GParticleSystem(width=4, height=4, gravity=(0, -0.05), capacity=count,
+        seed=seed)
+    system.emit(GAME_WIDTH/2, GAME_HEIGHT/2, count, speed=(0, 3), life=frames+1)
+    start = time.perf_counter()
+    for frame in range(frames):
+        system.update()
+    arrays = time.perf_counter()-start
+
+    sparks = [Spark(GAME_WIDTH/2, GAME_HEIGHT/2, rng.uniform(-3, 3), rng.uniform(-3, 3))
+        for _ in range(count)]
+    start = time.perf_counter()
+    for frame in range(frames):
+        for spark in sparks:
+            spark.move()
+    objects = time.perf_counter()-start
+
+    print('%6d particles: arrays %.3f ms per frame, one GEllipse each %.3f ms per frame'
+        % (count, 1000*arrays/frames, 1000*objects/frames))
+
+
+if __name__ == '__main__':
+    for count in (100, 1000, 10000):
+        bench(count)
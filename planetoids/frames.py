@@ -0,0 +1,277 @@
+"""
+Software-rendered frames for Planetoids
+
+This module draws waves without the Kivy window, into NumPy arrays, with the
+GRasterView of game2d. It needs no display or GPU, so it runs anywhere the headless
+tools do. It has three uses.
+
+Golden frames check that changes to the drawing code (or to anything drawn) leave
+the picture unchanged. The golden traces of golden.py are replayed with particle
+effects, and the frames in FRAME_GOLDEN are compared with the PNG images in the
+Frames folder. A frame matches if fewer than FRAME_TOLERANCE of its pixels differ
+from the image by more than FRAME_THRESHOLD.
+
+Captures turn a golden trace (or any trace with the same inputs) into a folder of
+PNG images, one per frame, to watch a replay or make a video from it offline.
+
+The benchmark measures the cost of rasterizing a frame against the number of
+asteroids in the wave.
+
+To check the golden frames, run
+
+    python planetoids/frames.py
+
+from the root folder. Add --record to (re)record them, --capture TRACE to capture a
+replay, or --bench to run the benchmark. Use --help to see all of the options. On a
+machine without a display, set SDL_VIDEODRIVER=dummy and KIVY_WINDOW=sdl2 first, so
+that Kivy does not look for one.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from headless import *
+from effects import Effects
+from game2d.graster import write_png, read_png
+from golden import TRACE_PILOTS, tracePath
+import argparse
+import sys
+import numpy as np
+
+
+def makeView(scale=FRAME_SCALE, samples=1):
+    """
+    Returns a new raster view of the game window
+
+    Parameter scale: The size of the frames, as a fraction of the game window
+    Precondition: scale is a number > 0
+
+    Parameter samples: The samples across each pixel, for antialiasing
+    Precondition: samples is an int > 0
+    """
+    return GRasterView(GAME_WIDTH, GAME_HEIGHT, scale, samples)
+
+
+def replay(trace, frames, view, seed=FRAME_SEED):
+    """
+    Replays trace with particle effects, calling frames(frame, pixels) after each frame
+
+    The function frames is only called for the frames it wants drawn; its attribute
+    wanted (if any) is a set of frame numbers, and others are stepped without drawing.
+
+    Parameter trace: The trace to replay
+    Precondition: trace is a dictionary with a wave and inputs, as in golden.py
+
+    Parameter frames: The per-frame callback
+    Precondition: frames is a function frames(frame, pixels)
+
+    Parameter view: The view to draw to
+    Precondition: view is a GRasterView
+
+    Parameter seed: The seed for the particle effects
+    Precondition: seed is an int
+    """
+    wave = Wave(loadWave(trace['wave']))
+    wave.setEffects(Effects(seed))
+    masks = [int(c, 16) for c in trace['inputs']]
+    wanted = getattr(frames, 'wanted', None)
+
+    def observer(wave, frame):
+        if wanted is None or frame in wanted:
+            view.clear()
+            wave.draw(view)
+            view.commit()
+            frames(frame, view.pixels)
+
+    run(wave, ReplayPilot(masks), len(masks), observer=observer)
+
+
+def renderFrames(trace, wanted, scale=FRAME_SCALE):
+    """
+    Returns a dictionary of the pixels of the frames in wanted of the replay of trace
+
+    Frames past the end of the replay are left out.
+
+    Parameter trace: The trace to replay
+    Precondition: trace is a dictionary with a wave and inputs, as in golden.py
+
+    Parameter wanted: The frames to draw
+    Precondition: wanted is a collection of int >= 0
+    """
+    result = {}
+
+    def keep(frame, pixels):
+        result[frame] = pixels.copy()
+    keep.wanted = set(wanted)
+
+    replay(trace, keep, makeView(scale))
+    return result
+
+
+def loadTrace(name, pilot):
+    """
+    Returns the golden trace of wave file name and the given pilot, or None
+    """
+    path = tracePath(name, pilot)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def framePath(name, pilot, frame):
+    """
+    Returns the path of the golden image of a frame of wave file name and pilot name
+    """
+    folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), FRAME_FOLDER)
+    return os.path.join(folder, '%s-%s-%04d.png' % (name[:-5], pilot, frame))
+
+
+def difference(actual, expect):
+    """
+    Returns the fraction of pixels of actual that differ from expect by more than
+    FRAME_THRESHOLD in some channel
+
+    Parameter actual: The pixels drawn
+    Precondition: actual is a uint8 RGBA array
+
+    Parameter expect: The pixels of the golden image
+    Precondition: expect is a uint8 RGBA array
+    """
+    if actual.shape != expect.shape:
+        return 1.0
+    delta = np.abs(actual.astype(np.int16)-expect.astype(np.int16)).max(axis=2)
+    return float(np.mean(delta > FRAME_THRESHOLD))
+
+
+def record(names):
+    """
+    Renders and saves the golden frames for the given wave file names
+    """
+    for name in names:
+        for pilot in TRACE_PILOTS:
+            trace = loadTrace(name, pilot)
+            if trace is None:
+                print('%s: no golden trace' % os.path.basename(tracePath(name, pilot)))
+                continue
+            frames = renderFrames(trace, FRAME_GOLDEN)
+            for frame in sorted(frames):
+                path = framePath(name, pilot, frame)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                write_png(path, frames[frame])
+                print('%s: recorded' % os.path.basename(path))
+
+
+def check(names):
+    """
+    Returns True if the golden frames for the given wave file names all match.
+
+    This prints the result for each frame, along with the time to replay and draw
+    the frames of each trace.
+    """
+    passed = True
+    for name in names:
+        for pilot in TRACE_PILOTS:
+            trace = loadTrace(name, pilot)
+            if trace is None:
+                print('%s: no golden trace' % os.path.basename(tracePath(name, pilot)))
+                passed = False
+                continue
+            start = time.perf_counter()
+            frames = renderFrames(trace, FRAME_GOLDEN)
+            elapsed = time.perf_counter()-start
+            for frame in sorted(frames):
+                path = framePath(name, pilot, frame)
+                if not os.path.exists(path):
+                    print('%s: no golden image' % os.path.basename(path))
+                    passed = False
+                    continue
+                diff = difference(frames[frame], read_png(path))
+                if diff <= FRAME_TOLERANCE:
+                    print('%s: ok (%.2f%% of pixels differ, %.1f s to replay)'
+                        % (os.path.basename(path), 100*diff, elapsed))
+                else:
+                    print('%s: DIFFERS in %.2f%% of pixels'
+                        % (os.path.basename(path), 100*diff))
+                    passed = False
+    return passed
+
+
+def capture(path, folder, every=1, scale=FRAME_SCALE, samples=1):
+    """
+    Saves every every-th frame of the replay of the trace file path to folder
+
+    The images are named by frame number. Returns the number of images saved.
+
+    Parameter path: The trace file
+    Precondition: path is a string naming a JSON trace, as in golden.py
+
+    Parameter folder: The folder to save the images in
+    Precondition: folder is a string
+
+    Parameter every: The frames between saved images
+    Precondition: every is an int > 0
+    """
+    with open(path) as f:
+        trace = json.load(f)
+    os.makedirs(folder, exist_ok=True)
+    saved = []
+
+    def save(frame, pixels):
+        write_png(os.path.join(folder, 'frame%05d.png' % frame), pixels)
+        saved.append(frame)
+    save.wanted = set(range(0, len(trace['inputs']), every))
+
+    replay(trace, save, makeView(scale, samples))
+    return len(saved)
+
+
+def bench(count, frames=10, seed=0, samples=1):
+    """
+    Prints the median cost of rasterizing a frame of a wave of count asteroids
+    """
+    from drawing import openWave
+    wave = Wave(openWave(count, seed))
+    view = makeView(1, samples)
+    rng = random.Random(seed)
+    pilot = TurretPilot()
+    costs = []
+    for frame in range(frames):
+        step(wave, pilot(wave, frame, rng))
+        start = time.perf_counter()
+        view.clear()
+        wave.draw(view)
+        view.commit()
+        view.pixels
+        costs.append(time.perf_counter()-start)
+    print('%4d asteroids, %d sample(s) per pixel: %.1f ms per frame (%dx%d)' % (count,
+        samples**2, 1000*np.median(costs), view.pixels.shape[1], view.pixels.shape[0]))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Draw waves without a window.')
+    parser.add_argument('waves', nargs='*', help='wave files in Data (default: all)')
+    parser.add_argument('--record', action='store_true', help='(re)record the golden frames')
+    parser.add_argument('--capture', metavar='TRACE', help='save the frames of a trace file')
+    parser.add_argument('--output', default='frames', help='the folder for captured frames')
+    parser.add_argument('--every', type=int, default=1, help='the frames between captures')
+    parser.add_argument('--scale', type=float, default=FRAME_SCALE,
+        help='the size of captured frames, as a fraction of the window')
+    parser.add_argument('--samples', type=int, default=1,
+        help='the samples across each pixel of captured frames, for antialiasing')
+    parser.add_argument('--bench', action='store_true', help='time drawing bigger waves')
+    args = parser.parse_args()
+
+    bootstrap()
+    if args.capture:
+        start = time.perf_counter()
+        count = capture(args.capture, args.output, args.every, args.scale, args.samples)
+        print('saved %d frames to %s in %.1f s' % (count, args.output,
+            time.perf_counter()-start))
+    elif args.bench:
+        for count in (10, 100, 1000):
+            bench(count)
+        bench(100, samples=2)
+    elif args.record:
+        record(args.waves or waveNames())
+    else:
+        sys.exit(0 if check(args.waves or waveNames()) else 1)
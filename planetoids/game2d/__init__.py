@@ -10,7 +10,12 @@ Date:   August 1, 2017 (Python 3 version)
 from .gobject import GObject, GScene
 from .grectangle import GRectangle, GEllipse, GImage, GLabel
 from .gsprite import GSprite
+from .gbatch import GSpriteBatch
+from .gparticles import GParticleSystem
+from .gatlas import GAtlas
+from .gfont import GFont, GBitmapLabel
+from .graster import GRasterLayer, GRasterView
 from .gpath import GPath, GTriangle, GPolygon
-from .gview import GInput, GView
+from .gview import GInput, GLayer, GView
 from .sound import Sound, SoundLibrary
 from .app import GameApp
\ No newline at end of file
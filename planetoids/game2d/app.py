@@ -23,6 +23,7 @@ import traceback
 import os.path
 import json
 import sys
+from collections import OrderedDict
 
 # Pull off the band aid
 import numpy as np
@@ -49,6 +50,18 @@ class GameApp(kivy.app.App):
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
     
+    # Class attribute for the texture atlas, if there is one
+    ATLAS = None
+    
+    # Class attribute for the rendered label textures, least recently used first
+    LABEL_CACHE = OrderedDict()
+    
+    # Class attribute for the most bytes of label textures to keep in LABEL_CACHE
+    LABEL_BUDGET = 16*1024*1024
+    
+    # Class attribute for the bytes of label textures in LABEL_CACHE
+    LABEL_BYTES = 0
+    
     
     # MUTABLE ATTRIBUTES
     @property
@@ -197,8 +210,9 @@ class GameApp(kivy.app.App):
         Returns: The texture for the given file name, or None if it cannot be loaded
         
         The ``name`` must refer to the file in the **Images** folder.  If the texture
-        has already been loaded, it will return the cached texture.  Otherwise, it will
-        load the texture and cache it before returning it.
+        has already been loaded, it will return the cached texture.  If the image is in
+        the texture atlas (see :meth:`load_atlas`), it will return its atlas region.
+        Otherwise, it will load the texture and cache it before returning it.
         
         This method will crash if name is not a valid file.
         
@@ -209,6 +223,11 @@ class GameApp(kivy.app.App):
         if name in cls.TEXTURE_CACHE:
             return cls.TEXTURE_CACHE[name]
         
+        if not cls.ATLAS is None and name in cls.ATLAS:
+            texture = cls.ATLAS.region(name)
+            cls.TEXTURE_CACHE[name] = texture
+            return texture
+        
         try:
             from kivy.core.image import Image
             texture = Image(name).texture
@@ -238,6 +257,102 @@ class GameApp(kivy.app.App):
         
         return None
     
+    @classmethod
+    def load_label(cls,text,options):
+        """
+        Returns: The texture of text rendered with the given label options
+        
+        Labels with the same text and options (font, size, bold, color, alignment and 
+        so on) share one texture.  If the texture has already been rendered, it will 
+        return the cached texture.  Otherwise, it will render the text and cache the
+        texture before returning it.  The cache forgets the least recently used textures 
+        once they take up more than ``LABEL_BUDGET`` bytes.  Labels still showing a
+        forgotten texture keep it.
+        
+        :param text: The text of the label
+        :type text:  ``str``
+        
+        :param options: The options of a Kivy core label
+        :type options:  ``dict``
+        """
+        options = dict(options)
+        options['text'] = text
+        key = repr(sorted(options.items()))
+        if key in cls.LABEL_CACHE:
+            cls.LABEL_CACHE.move_to_end(key)
+            return cls.LABEL_CACHE[key]
+        
+        # A label of its own, as a label reuses its texture when it renders again
+        from kivy.core.text import Label as CoreLabel
+        core = CoreLabel(**options)
+        core.refresh()
+        texture = core.texture
+        if texture.width > 1 and texture.height > 1:
+            cls.LABEL_CACHE[key] = texture
+            cls.LABEL_BYTES += 4*texture.width*texture.height
+            while cls.LABEL_BYTES > cls.LABEL_BUDGET and len(cls.LABEL_CACHE) > 1:
+                (old, dropped) = cls.LABEL_CACHE.popitem(last=False)
+                cls.LABEL_BYTES -= 4*dropped.width*dropped.height
+        return texture
+    
+    @classmethod
+    def unload_labels(cls):
+        """
+        Empties the cache of label textures.
+        
+        Labels still showing a texture keep it.
+        """
+        cls.LABEL_CACHE.clear()
+        cls.LABEL_BYTES = 0
+    
+    @classmethod
+    def load_atlas(cls,names=None,cache=True):
+        """
+        Returns: The texture atlas of the given images
+        
+        The images are packed into a few large textures (see :class:`GAtlas`), and from
+        then on :meth:`load_texture` returns their regions of the atlas.  Objects drawn 
+        before the atlas is made keep their own textures.  Images too large for an atlas
+        page are still loaded on their own.
+        
+        The layout of the atlas is cached in the file ``.atlas.json`` of the **Images** 
+        folder, so it only needs to be worked out again when the images change.
+        
+        :param names: The image file names, or None for every image in the **Images** folder
+        :type names:  ``list`` of ``str`` or ``None``
+        
+        :param cache: Whether to cache the layout of the atlas
+        :type cache:  ``bool``
+        """
+        from .gatlas import GAtlas
+        if names is None:
+            names = [name for name in os.listdir(cls.images) if not name.startswith('.')]
+        for name in names:
+            assert cls.is_image(name), '%s is not an image file' % repr(name)
+        
+        cls.unload_atlas()
+        path = os.path.join(cls.images,'.atlas.json') if cache else None
+        cls.ATLAS = GAtlas(cls.images,names,cache=path)
+        for name in cls.ATLAS.names:
+            cls.TEXTURE_CACHE.pop(name,None)
+        return cls.ATLAS
+    
+    @classmethod
+    def unload_atlas(cls):
+        """
+        Returns: The texture atlas, or None if there is none
+        
+        The atlas regions are removed from the texture cache, so the images are loaded on
+        their own again the next time they are needed.
+        """
+        atlas = cls.ATLAS
+        if not atlas is None:
+            for name in atlas.names:
+                if cls.TEXTURE_CACHE.get(name) is atlas.region(name):
+                    del cls.TEXTURE_CACHE[name]
+        cls.ATLAS = None
+        return atlas
+    
     @classmethod
     def load_json(cls,name):
         """
@@ -425,7 +540,8 @@ class GameApp(kivy.app.App):
         Processes a single animation frame.
         
         This method a callback-proxy for the methods `update` and `draw`.  It handles
-        important issues behind the scenes, particularly with clearing the window.
+        important issues behind the scenes, particularly with clearing the window
+        and committing the frame to it.
         
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
@@ -433,6 +549,7 @@ class GameApp(kivy.app.App):
         self.view.clear()
         self.update(dt)
         self.draw()
+        self.view.commit()
     
     def _setpaths(self):
         """
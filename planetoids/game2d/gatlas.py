@@ -0,0 +1,272 @@
+"""
+A module to support texture atlases.
+
+Every image file is normally its own texture, so drawing a ship, then an asteroid,
+then another ship switches textures each time.  An atlas packs many images into one
+large texture (a page), and hands out each image as a region of that page.  Drawing
+any mix of images from the same page then needs a single texture.
+
+The atlas is built when the game starts, from the image files themselves.  Working out
+where each image goes (the layout) is saved to a cache file, and reused on the next run
+as long as the images have not changed, so the pages always come out the same.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from kivy.graphics.texture import Texture
+import numpy as np
+import json
+import os
+
+# The largest width and height of an atlas page
+ATLAS_SIZE = 4096
+
+# The pixels copied around each image, so that filtering never mixes in its neighbors
+ATLAS_PADDING = 2
+
+# The version of the layout cache files
+ATLAS_VERSION = 1
+
+
+def pack_skyline(sizes,width,height):
+    """
+    Returns the position of each rectangle packed into pages of the given size.
+
+    This is bottom-left skyline packing.  The rectangles are placed tallest first, each
+    as low as it will go (and then as far left), on the outline of those placed before.
+    A rectangle that fits nowhere on a page starts a new page.
+
+    :param sizes: the (width, height) of each rectangle
+    :type sizes:  ``list`` of pairs of ints > 0
+
+    :param width: the page width
+    :type width:  ``int`` > 0
+
+    :param height: the page height
+    :type height:  ``int`` > 0
+
+    :return: the (page, x, y) of each rectangle, or None for those larger than a page
+    :rtype:  ``list``
+    """
+    order = sorted(range(len(sizes)),key=lambda k: (-sizes[k][1],-sizes[k][0]))
+    result = [None]*len(sizes)
+    pages = []
+    for k in order:
+        (w, h) = sizes[k]
+        if w > width or h > height:
+            continue
+        placed = False
+        for page in range(len(pages)+1):
+            if page == len(pages):
+                pages.append([[0,0,width]])
+            spot = _skyline_spot(pages[page],w,h,width,height)
+            if not spot is None:
+                (index, x, y) = spot
+                _skyline_add(pages[page],index,x,y+h,w)
+                result[k] = (page,x,y)
+                placed = True
+                break
+        assert placed, 'rectangle %s fits no empty page' % repr((w,h))
+    return result
+
+
+def _skyline_spot(skyline,w,h,width,height):
+    """
+    Returns the lowest (index, x, y) on skyline for a w x h rectangle, or None.
+
+    :param skyline: the segments (x, y, width) of the outline, left to right
+    :type skyline:  ``list`` of 3-element lists of ints
+    """
+    best = None
+    for index in range(len(skyline)):
+        x = skyline[index][0]
+        if x+w > width:
+            break
+        # The rectangle rests on the highest segment beneath it
+        y = 0
+        covered = 0
+        j = index
+        while covered < w:
+            y = max(y,skyline[j][1])
+            covered += skyline[j][2]
+            j += 1
+        if y+h <= height and (best is None or (y,x) < (best[2],best[1])):
+            best = (index,x,y)
+    return best
+
+
+def _skyline_add(skyline,index,x,top,w):
+    """
+    Raises skyline to top over [x, x+w), starting at the segment index.
+    """
+    skyline.insert(index,[x,top,w])
+    j = index+1
+    while j < len(skyline) and skyline[j][0] < x+w:
+        end = skyline[j][0]+skyline[j][2]
+        if end <= x+w:
+            del skyline[j]
+        else:
+            skyline[j][2] = end-(x+w)
+            skyline[j][0] = x+w
+            break
+    # Merge neighbors at the same height
+    j = 0
+    while j < len(skyline)-1:
+        if skyline[j][1] == skyline[j+1][1]:
+            skyline[j][2] += skyline[j+1][2]
+            del skyline[j+1]
+        else:
+            j += 1
+
+
+# #mark -
+class GAtlas(object):
+    """
+    A class representing images packed into a few large textures.
+
+    An atlas is made from a list of image file names.  Images too large for a page are
+    left out, and should be loaded as textures of their own.  Use :meth:`region` to get
+    the texture of an image in the atlas; it can be used anywhere the texture of the
+    image file could, including with ``get_region`` to cut it into frames.
+
+    Kivy must have a window before an atlas can be made.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def pages(self):
+        """
+        The textures holding the images.
+
+        **Invariant**: Value is a list of ``Texture``
+        """
+        return list(self._pages)
+
+    @property
+    def names(self):
+        """
+        The file names of the images in the atlas.
+
+        **Invariant**: Value is a list of ``str``
+        """
+        return list(self._regions)
+
+    # BUILT-IN METHODS
+    def __init__(self,folder,names,size=ATLAS_SIZE,padding=ATLAS_PADDING,cache=None):
+        """
+        Creates an atlas of the given images.
+
+        If ``cache`` names a file, the layout is read from it when it matches the images,
+        and written to it otherwise.  A cache that cannot be read or written is ignored.
+
+        :param folder: the folder holding the images
+        :type folder:  ``str``
+
+        :param names: the file names of the images, in folder
+        :type names:  ``list`` of ``str``
+
+        :param size: the largest width and height of a page
+        :type size:  ``int`` > 0
+
+        :param padding: the pixels copied around each image
+        :type padding:  ``int`` >= 0
+
+        :param cache: the file to keep the layout in
+        :type cache:  ``str`` or ``None``
+        """
+        from kivy.core.image import Image
+        from kivy.graphics.opengl import glGetIntegerv, GL_MAX_TEXTURE_SIZE
+        size = min(size,glGetIntegerv(GL_MAX_TEXTURE_SIZE)[0])
+        names = sorted(set(names))
+        stamps = {}
+        for name in names:
+            info = os.stat(os.path.join(folder,name))
+            stamps[name] = [info.st_size,int(info.st_mtime)]
+
+        layout = self._read(cache,size,padding,stamps)
+        images = {}
+        if layout is None:
+            sizes = []
+            for name in names:
+                images[name] = Image(os.path.join(folder,name)).texture
+                sizes.append((images[name].width+2*padding,images[name].height+2*padding))
+            spots = pack_skyline(sizes,size,size)
+            layout = {}
+            for k in range(len(names)):
+                if not spots[k] is None:
+                    (page, x, y) = spots[k]
+                    layout[names[k]] = [page,x+padding,y+padding,sizes[k][0]-2*padding,
+                                        sizes[k][1]-2*padding]
+            self._write(cache,size,padding,stamps,layout)
+
+        # Pages are only as tall as they need to be
+        heights = {}
+        for (page, x, y, w, h) in layout.values():
+            heights[page] = max(heights.get(page,0),y+h+padding)
+        self._pages = []
+        for page in range(len(heights)):
+            texture = Texture.create(size=(size,heights[page]),colorfmt='rgba')
+            self._pages.append(texture)
+
+        self._regions = {}
+        for name in sorted(layout):
+            (page, x, y, w, h) = layout[name]
+            texture = images[name] if name in images else Image(os.path.join(folder,name)).texture
+            pixels = np.frombuffer(texture.pixels,dtype=np.uint8).reshape(h,w,4)
+            if padding:
+                pixels = np.pad(pixels,((padding,padding),(padding,padding),(0,0)),mode='edge')
+            self._pages[page].blit_buffer(np.ascontiguousarray(pixels).tobytes(),
+                size=(w+2*padding,h+2*padding),colorfmt='rgba',pos=(x-padding,y-padding))
+            region = self._pages[page].get_region(x,y,w,h)
+            # The pixels keep the row order of the image texture, and so must its region
+            if texture.tex_coords[1] > texture.tex_coords[5]:
+                region.flip_vertical()
+            self._regions[name] = region
+
+    def __contains__(self,name):
+        return name in self._regions
+
+    def __len__(self):
+        return len(self._regions)
+
+    # PUBLIC METHODS
+    def region(self,name):
+        """
+        Returns the texture of the image name, or None if it is not in the atlas.
+
+        :param name: the file name of the image
+        :type name:  ``str``
+        """
+        return self._regions.get(name)
+
+    # HIDDEN METHODS
+    def _read(self,cache,size,padding,stamps):
+        """
+        Returns the layout in cache if it was made for these images, or None.
+        """
+        if cache is None or not os.path.exists(cache):
+            return None
+        try:
+            with open(cache) as file:
+                data = json.load(file)
+        except (OSError,ValueError):
+            return None
+        if data.get('version') != ATLAS_VERSION or data.get('size') != size:
+            return None
+        if data.get('padding') != padding or data.get('images') != stamps:
+            return None
+        return data['layout']
+
+    def _write(self,cache,size,padding,stamps,layout):
+        """
+        Saves the layout to cache, if it can be written.
+        """
+        if cache is None:
+            return
+        data = {'version':ATLAS_VERSION,'size':size,'padding':padding,
+                'images':stamps,'layout':layout}
+        try:
+            with open(cache,'w') as file:
+                json.dump(data,file,indent=1,sort_keys=True)
+        except OSError:
+            pass
@@ -0,0 +1,362 @@
+"""
+A module to support drawing many copies of one image at once.
+
+Drawing a :class:`GImage` takes about seven Kivy instructions (a matrix push, three
+transforms, a color, the rectangle and a matrix pop), so thousands of images cost
+thousands of instructions every frame.  A sprite batch draws any number of copies of
+one image, or of the frames of one filmstrip, as the quads of a single textured Mesh.
+The positions, angles, scales and frames of the copies are NumPy arrays, and the
+vertices are written straight into a NumPy buffer that the Mesh draws from.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+from .app import GameApp
+import numpy as np
+
+# The most quads in one Mesh, as Kivy indices are unsigned shorts
+MESH_QUADS = 16383
+
+
+def write_quads(out,x,y,sx,sy,angle,uvs):
+    """
+    Writes the vertices of a batch of quads into a buffer.
+
+    Each quad is a rectangle of size (sx, sy) centered at (x, y), turned by angle
+    degrees counter-clockwise.  Its four vertices (bottom left, bottom right, top
+    right, top left) are written as (x, y, u, v) rows, with the texture coordinates
+    taken from uvs.
+
+    :param out: the buffer to write to; only its first four columns are written
+    :type out:  float32 array of shape (n, 4, k) with k >= 4
+
+    :param x: the horizontal centers of the quads
+    :type x:  float array of length n
+
+    :param y: the vertical centers of the quads
+    :type y:  float array of length n
+
+    :param sx: the widths of the quads
+    :type sx:  float array of length n, or a number
+
+    :param sy: the heights of the quads
+    :type sy:  float array of length n, or a number
+
+    :param angle: the angles of the quads in degrees, or None for no rotation
+    :type angle:  float array of length n, or a number, or ``None``
+
+    :param uvs: the texture coordinates of each quad, in the order of Kivy tex_coords
+    :type uvs:  float array of shape (n, 8), or of shape (8,) for all quads
+    """
+    hx = np.multiply(sx,0.5)
+    hy = np.multiply(sy,0.5)
+    # Corner offsets before rotation, in vertex order
+    cx = (-hx,hx,hx,-hx)
+    cy = (-hy,-hy,hy,hy)
+    if angle is None:
+        for k in range(4):
+            out[:,k,0] = x+cx[k]
+            out[:,k,1] = y+cy[k]
+    else:
+        rad = np.radians(angle)
+        cos = np.cos(rad)
+        sin = np.sin(rad)
+        for k in range(4):
+            out[:,k,0] = x+cx[k]*cos-cy[k]*sin
+            out[:,k,1] = y+cx[k]*sin+cy[k]*cos
+    uvs = np.asarray(uvs,dtype=np.float32)
+    if uvs.ndim == 1:
+        out[:,:,2:4] = uvs.reshape(4,2)
+    else:
+        out[:,:,2:4] = uvs.reshape(-1,4,2)
+
+
+def quad_indices(count):
+    """
+    Returns the triangle indices of count quads of four vertices each.
+
+    :param count: the number of quads
+    :type count:  ``int`` in 0..MESH_QUADS
+
+    :return: the indices, six per quad
+    :rtype:  uint16 array
+    """
+    base = np.arange(count,dtype=np.uint16)*4
+    return (base[:,np.newaxis]+np.array([0,1,2,2,3,0],dtype=np.uint16)).ravel()
+
+
+# #mark -
+class GQuadMesh(object):
+    """
+    A class representing a growable set of textured quads, drawn as Kivy Meshes.
+
+    This is the drawing half of :class:`GSpriteBatch`, shared with other batched
+    primitives.  It owns a float32 buffer of quad vertices.  Call :meth:`resize` with
+    the number of quads, write the vertices into :attr:`buffer`, and then call
+    :meth:`flush`.  The buffer is reused from frame to frame; it is only reallocated
+    when the number of quads outgrows it.  Past MESH_QUADS quads, the quads are split
+    over several Meshes.
+    """
+
+    # IMMUTABLE ATTRIBUTES
+    @property
+    def count(self):
+        """
+        The number of quads drawn.
+
+        **Invariant**: Must be an int >= 0
+        """
+        return self._count
+
+    @property
+    def buffer(self):
+        """
+        The vertices of the quads, as :func:`write_quads` writes them.
+
+        **Invariant**: Must be a float32 array of shape (count, 4, stride), where the
+        stride is the number of floats in a vertex
+        """
+        return self._vertices[:self._count]
+
+    # BUILT-IN METHODS
+    def __init__(self,texture=None,fmt=None):
+        """
+        Creates a new, empty set of quads.
+
+        :param texture: the texture of every quad
+        :type texture:  ``Texture`` or ``None``
+
+        :param fmt: the Kivy vertex format, starting with vPosition and vTexCoords0
+        :type fmt:  ``list`` of (name, size, 'float') tuples, or ``None`` for the default
+        """
+        self._texture = texture
+        self._fmt = fmt
+        stride = 4 if fmt is None else sum(attr[1] for attr in fmt)
+        self._vertices = np.zeros((0,4,stride),dtype=np.float32)
+        self._count = 0
+        self._group = InstructionGroup()
+        self._meshes = []
+
+    # PUBLIC METHODS
+    def group(self):
+        """
+        Returns the instruction group holding the Meshes.
+
+        :return: the instruction group holding the Meshes
+        :rtype:  ``InstructionGroup``
+        """
+        return self._group
+
+    def resize(self,count):
+        """
+        Sets the number of quads, growing the buffer if needed.
+
+        The contents of the buffer are kept up to the smaller of the old and new count.
+
+        :param count: the number of quads
+        :type count:  ``int`` >= 0
+        """
+        if count > len(self._vertices):
+            shape = (max(count,2*len(self._vertices)),)+self._vertices.shape[1:]
+            vertices = np.zeros(shape,dtype=np.float32)
+            vertices[:self._count] = self._vertices[:self._count]
+            self._vertices = vertices
+        self._count = count
+
+    def flush(self):
+        """
+        Hands the buffer to the Meshes, after its vertices have been written.
+        """
+        chunks = (self._count+MESH_QUADS-1)//MESH_QUADS
+        while len(self._meshes) < chunks:
+            if self._fmt is None:
+                mesh = Mesh(mode='triangles',texture=self._texture)
+            else:
+                mesh = Mesh(mode='triangles',texture=self._texture,fmt=self._fmt)
+            self._meshes.append(mesh)
+            self._group.add(mesh)
+        while len(self._meshes) > max(chunks,1):
+            self._group.remove(self._meshes.pop())
+        for k in range(len(self._meshes)):
+            first = k*MESH_QUADS
+            size = min(self._count-first,MESH_QUADS)
+            mesh = self._meshes[k]
+            if size <= 0:
+                mesh.indices = []
+                mesh.vertices = []
+                continue
+            if len(mesh.indices) != 6*size:
+                mesh.indices = quad_indices(size)
+            # The Mesh reads the buffer itself; assigning it marks the Mesh as changed
+            mesh.vertices = self._vertices[first:first+size].reshape(-1)
+
+
+# #mark -
+class GSpriteBatch(GObject):
+    """
+    A class representing many copies of one image, drawn together.
+
+    The image is given by a JPEG, PNG, or GIF file whose name is stored in the attribute
+    ``source``.  As with :class:`GSprite`, the image may be a filmstrip of frames in a
+    grid given by ``format``, and each copy shows one frame.  Every copy is ``width``
+    wide and ``height`` tall before its own scale.
+
+    The copies are set all at once with :meth:`set`, from NumPy arrays of positions,
+    angles, scales and frames.  This rewrites the vertex buffer in place, so it is
+    cheap to call every animation frame.  The position, angle and scale of the batch
+    itself move all of the copies together, as with any :class:`GObject`.  If you
+    define ``fillcolor``, it tints every copy.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def source(self):
+        """
+        The source file for the image of the copies.
+
+        **invariant**. Value is a string refering to a valid file.
+        """
+        return self._source
+
+    @source.setter
+    def source(self,value):
+        assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        self._source = value
+        if self._defined and not self._cache is None:
+            self._reset()
+
+    @property
+    def format(self):
+        """
+        The grid size of the filmstrip, as (rows, columns).
+
+        Frames are numbered left-to-right, top-to-bottom, as in :class:`GSprite`.
+
+        **Invariant**: Value is a 2-element tuple of ints > 0
+        """
+        return self._format
+
+    @format.setter
+    def format(self,value):
+        assert type(value) in [tuple,list] and len(value) == 2, '%s does is not a tuple pair' % repr(value)
+        assert type(value[0]) == int and type(value[1]) == int, '%s does not have int values' % repr(value)
+        assert value[0] > 0 and value[1] > 0, '%s does not have valid values' % repr(value)
+        self._format = tuple(value)
+        if self._defined and not self._cache is None:
+            self._reset()
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def count(self):
+        """
+        The number of copies drawn.
+
+        **Invariant**: Value is an int >= 0
+        """
+        return self._quads.count
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty sprite batch.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes. For example, to draw
+        copies of ``asteroid1.png`` that are 128 pixels wide, use the constructor::
+
+            GSpriteBatch(width=128,height=128,source='asteroid1.png')
+
+        This class supports the same keywords as :class:`GObject`, plus ``source`` and
+        ``format`` (which defaults to (1,1)).  The copies are added with :meth:`set`.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self.source = keywords['source'] if 'source' in keywords else None
+        self.format = keywords['format'] if 'format' in keywords else (1,1)
+        self._quads = GQuadMesh()
+        self._regions = np.zeros((1,8),dtype=np.float32)
+        self._cache = None
+        GObject.__init__(self,**keywords)
+        self._defined = True
+
+    # PUBLIC METHODS
+    def set(self,positions,angles=None,scales=None,frames=None):
+        """
+        Replaces the copies with the ones given by the arrays.
+
+        :param positions: the centers of the copies
+        :type positions:  float array of shape (n, 2)
+
+        :param angles: the angle of each copy, in degrees counter-clockwise
+        :type angles:  float array of length n, or ``None`` for no rotation
+
+        :param scales: the scale of each copy, or its (width, height) scales
+        :type scales:  float array of shape (n,) or (n, 2), or ``None`` for 1
+
+        :param frames: the filmstrip frame of each copy
+        :type frames:  int array of length n in 0..rows*columns-1, or ``None`` for 0
+        """
+        if self._cache is None:
+            self._reset()
+        positions = np.asarray(positions)
+        count = len(positions)
+        self._quads.resize(count)
+        if count:
+            sx = self.width
+            sy = self.height
+            if not scales is None:
+                scales = np.asarray(scales)
+                if scales.ndim == 2:
+                    sx = sx*scales[:,0]
+                    sy = sy*scales[:,1]
+                else:
+                    sx = sx*scales
+                    sy = sy*scales
+            uvs = self._regions[0] if frames is None else self._regions[frames]
+            write_quads(self._quads.buffer,positions[:,0],positions[:,1],sx,sy,angles,uvs)
+        self._quads.flush()
+
+    # HIDDEN METHODS
+    def _extent(self):
+        """
+        Returns None, as the size of this object is that of each of its copies.
+        """
+        return None
+
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        texture = None if self._source is None else GameApp.load_texture(self._source)
+        (rows, cols) = self._format
+        self._regions = np.zeros((rows*cols,8),dtype=np.float32)
+        if texture:
+            width  = texture.width/cols
+            height = texture.height/rows
+            for row in range(rows):
+                for col in range(cols):
+                    region = texture.get_region(int(col*width),
+                        texture.height-int((row+1)*height),int(width),int(height))
+                    self._regions[row*cols+col] = region.tex_coords
+        elif not self._source is None:
+            print('Failed to load',repr(self._source))
+
+        count = 0 if self._cache is None else self._quads.count
+        old = self._quads
+        self._quads = GQuadMesh(texture)
+        self._quads.resize(count)
+        self._quads.buffer[:] = old.buffer[:count]
+        self._quads.flush()
+
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+        else:
+            self._cache.add(Color(1,1,1))
+        self._cache.add(self._quads.group())
+        self._cache.add(PopMatrix())
@@ -0,0 +1,606 @@
+"""
+A module to support text drawn from pre-rendered glyphs.
+
+A :class:`GLabel` is a Kivy label, and a Kivy label renders its whole text into a new
+texture every time the text changes.  That is fine for a title, but not for a score
+or a frame counter that changes every frame.  A :class:`GFont` renders each glyph of a
+font once, into a single page of pixels, and a :class:`GBitmapLabel` draws its text as
+one textured quad per glyph, batched in a Mesh.  Changing the text only rewrites the
+vertices of those quads.
+
+The glyphs are rendered by Kivy one at a time, so the text looks as Kivy would draw
+it, except that there is no kerning between glyphs.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from kivy.graphics.texture import Texture
+from .gobject import GObject
+from .gatlas import pack_skyline
+from .gbatch import GQuadMesh, write_quads
+import numpy as np
+
+# The glyphs rendered into a font by default (printable ASCII)
+FONT_GLYPHS = ''.join(chr(code) for code in range(32,127))
+
+# The width of the page of glyphs of a font
+FONT_PAGE_WIDTH = 1024
+
+# The empty pixels around each glyph, so that filtering never mixes in its neighbors
+FONT_PADDING = 1
+
+# The glyph to draw in place of one that the font has not rendered
+FONT_MISSING = '?'
+
+# The fonts loaded so far, by (name, size, bold)
+FONT_CACHE = {}
+
+
+def load_font(name=None,size=15,bold=False):
+    """
+    Returns the font of the given name, size and style, rendering it if needed.
+
+    Fonts are cached, so every label of the same font shares one page of glyphs.
+
+    :param name: the file name of the font, or None for the default Kivy font
+    :type name:  ``str`` or ``None``
+
+    :param size: the size of the font in points
+    :type size:  ``int`` or ``float`` > 0
+
+    :param bold: whether the font is bold (the default Kivy font only)
+    :type bold:  ``bool``
+
+    :return: the font
+    :rtype:  :class:`GFont`
+    """
+    key = (name,size,bold)
+    if not key in FONT_CACHE:
+        FONT_CACHE[key] = GFont(name,size,bold)
+    return FONT_CACHE[key]
+
+
+# #mark -
+class GFont(object):
+    """
+    A class representing the glyphs of a font, rendered once into a page of pixels.
+
+    Every glyph is as tall as a line of text, and as wide as the distance to the next
+    glyph on the line, so text is laid out by adding up the widths of its glyphs.  The
+    page only holds glyphs that draw something; a space has a width but no pixels.
+
+    The glyphs are rendered without a window.  The page only becomes a texture when
+    :attr:`texture` is first used, which needs a window.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def name(self):
+        """
+        The file name of the font, or None for the default Kivy font.
+
+        **Invariant**: Value is a ``str`` or ``None``
+        """
+        return self._name
+
+    @property
+    def size(self):
+        """
+        The size of the font in points.
+
+        **Invariant**: Value is an ``int`` or ``float`` > 0
+        """
+        return self._size
+
+    @property
+    def bold(self):
+        """
+        Whether the font is bold.
+
+        **Invariant**: Value is a ``bool``
+        """
+        return self._bold
+
+    @property
+    def height(self):
+        """
+        The height of a line of text.
+
+        **Invariant**: Value is an ``int`` >= 0
+        """
+        return self._height
+
+    @property
+    def pixels(self):
+        """
+        The page of glyphs, top row first, with values 0 to 1.
+
+        The glyphs are white, to be tinted when they are drawn.
+
+        **Invariant**: Value is a float32 array of shape (height, width, 4)
+        """
+        return self._pixels
+
+    @property
+    def texture(self):
+        """
+        The page of glyphs as a texture.
+
+        **Invariant**: Value is a ``Texture``
+        """
+        if self._texture is None:
+            (height, width) = self._pixels.shape[:2]
+            pixels = np.round(self._pixels[::-1]*255).astype(np.uint8)
+            self._texture = Texture.create(size=(width,height),colorfmt='rgba')
+            self._texture.blit_buffer(np.ascontiguousarray(pixels).tobytes(),
+                colorfmt='rgba',bufferfmt='ubyte')
+        return self._texture
+
+    # BUILT-IN METHODS
+    def __init__(self,name=None,size=15,bold=False,glyphs=FONT_GLYPHS):
+        """
+        Renders the glyphs of a font.
+
+        Use :func:`load_font` rather than this constructor to share fonts.  Text may only
+        use the characters in glyphs; others are drawn as FONT_MISSING.
+
+        :param name: the file name of the font, or None for the default Kivy font
+        :type name:  ``str`` or ``None``
+
+        :param size: the size of the font in points
+        :type size:  ``int`` or ``float`` > 0
+
+        :param bold: whether the font is bold (the default Kivy font only)
+        :type bold:  ``bool``
+
+        :param glyphs: the characters to render
+        :type glyphs:  ``str``
+        """
+        from .graster import render_text
+        assert type(size) in [int,float] and size > 0, '%s is not a valid size' % repr(size)
+        self._name = name
+        self._size = size
+        self._bold = bold
+        self._texture = None
+
+        options = {'font_size':size,'bold':bold}
+        if not name is None:
+            options['font_name'] = name
+        chars = []
+        images = []
+        for char in sorted(set(glyphs) | set(FONT_MISSING)):
+            options['text'] = char
+            pixels = render_text(options)
+            if not pixels is None:
+                chars.append(char)
+                images.append(pixels)
+        self._height = max([image.shape[0] for image in images]+[0])
+
+        # Blank glyphs (spaces) take no room on the page
+        inked = [k for k in range(len(images)) if images[k][...,3].max() > 0]
+        pad = FONT_PADDING
+        sizes = [(images[k].shape[1]+2*pad,images[k].shape[0]+2*pad) for k in inked]
+        width = max([FONT_PAGE_WIDTH]+[w for (w, h) in sizes])
+        spots = pack_skyline(sizes,width,max(sum(h for (w, h) in sizes),1))
+        rows = max([y+h for ((page, x, y), (w, h)) in zip(spots,sizes)]+[1])
+        self._pixels = np.zeros((rows,width,4),dtype=np.float32)
+        # Transparent white, so that filtering at glyph edges does not darken them
+        self._pixels[...,:3] = 1
+
+        # Each glyph is (width, box, texture coordinates)
+        self._glyphs = {}
+        for k in range(len(chars)):
+            self._glyphs[chars[k]] = (images[k].shape[1],None,None)
+        for (k, (page, x, y)) in zip(inked,spots):
+            (h, w) = images[k].shape[:2]
+            (x, y) = (x+pad, y+pad)
+            self._pixels[y:y+h,x:x+w] = images[k]
+            # The texture is the page flipped, as its rows go bottom to top
+            (u0, u1) = (x/width, (x+w)/width)
+            (v0, v1) = ((rows-y-h)/rows, (rows-y)/rows)
+            uvs = np.array([u0,v0,u1,v0,u1,v1,u0,v1],dtype=np.float32)
+            self._glyphs[chars[k]] = (w,(x,y,w,h),uvs)
+
+    def __contains__(self,char):
+        return char in self._glyphs
+
+    # PUBLIC METHODS
+    def glyph(self,char):
+        """
+        Returns the (width, box, texture coordinates) of the glyph of char.
+
+        The box is the (left, top, width, height) of the glyph on the page, and the
+        texture coordinates are in the order of Kivy tex_coords.  Both are None for a
+        glyph that draws nothing.
+
+        :param char: the character
+        :type char:  ``str`` of length 1
+        """
+        if char in self._glyphs:
+            return self._glyphs[char]
+        return self._glyphs.get(FONT_MISSING,(0,None,None))
+
+    def measure(self,line):
+        """
+        Returns the width of a line of text in this font.
+
+        :param line: the text, without line breaks
+        :type line:  ``str``
+        """
+        return sum(self.glyph(char)[0] for char in line)
+
+
+# #mark -
+class GBitmapLabel(GObject):
+    """
+    A class representing an (uneditable) text label, drawn from pre-rendered glyphs.
+
+    This object is drawn like a :class:`GLabel`, but it is meant for text that changes
+    often, such as a score.  Its glyphs come from a :class:`GFont`, rendered once and
+    shared by every label in the same font.  Setting ``text`` lays the glyphs out again
+    and rewrites the vertices of their quads; nothing is rendered, and the drawing
+    cache is kept.  Setting ``text`` to the text it already has costs nothing.
+
+    As with :class:`GLabel`, ``linecolor`` is the color of the text and ``fillcolor``
+    is the background.  Uses of the escape character '\\n' result in a label that spans
+    multiple lines, aligned by ``halign``.  The ``width`` and ``height`` of this label
+    are always those of its text.  When the text changes, the label stays anchored by
+    the last position attribute set: a label placed by ``right`` keeps its right edge,
+    and so on.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def text(self):
+        """
+        The text for this label.
+
+        **Invariant**: Must be a string"""
+        return self._text
+
+    @text.setter
+    def text(self,value):
+        assert type(value) == str, 'value %s is not a string' % repr(value)
+        if value == self._text:
+            return
+        self._text = value
+        self._layout()
+        if self._defined:
+            self._anchor()
+        if not self._cache is None:
+            self._write()
+
+    @property
+    def font_size(self):
+        """
+        The size of the text font in points.
+
+        Changing this value loads (and may render) another font.
+
+        **Invariant**: Must be a positive number (int or float)"""
+        return self._font.size
+
+    @font_size.setter
+    def font_size(self,value):
+        assert type(value) in [int,float] and value > 0, 'value %s is not a positive number' % repr(value)
+        self._load(self._font.name,value,self._font.bold)
+
+    @property
+    def font_name(self):
+        """
+        The file name for the .ttf file to use as a font
+
+        Changing this value loads (and may render) another font.
+
+        **Invariant**: Must be a string referring to a .ttf file in folder Fonts, or None
+        for the default Kivy font"""
+        return self._font.name
+
+    @font_name.setter
+    def font_name(self,value):
+        from .app import GameApp
+        assert value is None or GameApp.is_font(value), 'value %s is not a font name' % repr(value)
+        self._load(value,self._font.size,self._font.bold)
+
+    @property
+    def bold(self):
+        """
+        A boolean indicating whether or not the text should be bold.
+
+        This value only works on the default Kivy font, as with :class:`GLabel`.
+
+        **Invariant**: Must be a boolean"""
+        return self._font.bold
+
+    @bold.setter
+    def bold(self,value):
+        assert type(value) == bool, repr(value)+' is not a bool'
+        self._load(self._font.name,self._font.size,value)
+
+    @property
+    def halign(self):
+        """
+        The horizontal alignment of the lines of this label.
+
+        This only matters for text of several lines, as the label is as wide as its
+        widest line.
+
+        **Invariant**: Must be one of 'left', 'right', or 'center'"""
+        return self._halign
+
+    @halign.setter
+    def halign(self,value):
+        assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
+        self._halign = value
+        self._layout()
+        if not self._cache is None:
+            self._write()
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def width(self):
+        """
+        The width of the text of this label.
+
+        **Immutable**: This value is set by the text and font.
+
+        **Invariant**: Value is a ``float`` > 0
+        """
+        return self._width
+
+    @property
+    def height(self):
+        """
+        The height of the text of this label.
+
+        **Immutable**: This value is set by the text and font.
+
+        **Invariant**: Value is a ``float`` > 0
+        """
+        return self._height
+
+    @property
+    def font(self):
+        """
+        The glyphs of the font of this label.
+
+        **Invariant**: Value is a :class:`GFont`
+        """
+        return self._font
+
+    # REDEFINED PROPERTIES
+    @property
+    def x(self):
+        """
+        The horizontal coordinate of the object center.
+
+        **Invariant**: Must be an int or float."""
+        return self._trans.x
+
+    @x.setter
+    def x(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        self._trans.x = float(value)
+        self._mtrue = False
+        self._hanchor = 'center'
+
+    @property
+    def y(self):
+        """
+        The vertical coordinate of the object center.
+
+        **Invariant**: Must be an int or float."""
+        return self._trans.y
+
+    @y.setter
+    def y(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        self._trans.y = float(value)
+        self._mtrue = False
+        self._vanchor = 'center'
+
+    @property
+    def left(self):
+        """
+        The left edge of this shape.
+
+        Setting this value anchors the label by its left edge.
+
+        **Invariant**: Must be an int or float."""
+        return GObject.left.fget(self)
+
+    @left.setter
+    def left(self,value):
+        GObject.left.fset(self,value)
+        self._hanchor = 'left'
+        self._ha = value
+
+    @property
+    def right(self):
+        """
+        The right edge of this shape.
+
+        Setting this value anchors the label by its right edge.
+
+        **Invariant**: Must be an int or float."""
+        return GObject.right.fget(self)
+
+    @right.setter
+    def right(self,value):
+        GObject.right.fset(self,value)
+        self._hanchor = 'right'
+        self._ha = value
+
+    @property
+    def top(self):
+        """
+        The vertical coordinate of the top edge.
+
+        Setting this value anchors the label by its top edge.
+
+        **Invariant**: Must be an int or float."""
+        return GObject.top.fget(self)
+
+    @top.setter
+    def top(self,value):
+        GObject.top.fset(self,value)
+        self._vanchor = 'top'
+        self._hv = value
+
+    @property
+    def bottom(self):
+        """
+        The vertical coordinate of the bottom edge.
+
+        Setting this value anchors the label by its bottom edge.
+
+        **Invariant**: Must be an int or float."""
+        return GObject.bottom.fget(self)
+
+    @bottom.setter
+    def bottom(self,value):
+        GObject.bottom.fset(self,value)
+        self._vanchor = 'bottom'
+        self._hv = value
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new text label.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  For example, to create a
+        score label in the top right corner, use the constructor call::
+
+            GBitmapLabel(text='0',font_name='Redline.ttf',font_size=60,right=800,top=700)
+
+        This class supports the same keywords as :class:`GObject` (except for ``width``
+        and ``height``), as well as ``text``, ``font_name``, ``font_size``, ``bold`` and
+        ``halign``.
+        """
+        self._defined = False
+        self._cache = None
+        self._hanchor = 'center'
+        self._vanchor = 'center'
+        self._text = keywords['text'] if 'text' in keywords else ''
+        assert type(self._text) == str, 'value %s is not a string' % repr(self._text)
+        self._halign = 'center'
+        self._font = load_font(keywords.get('font_name'),keywords.get('font_size',15),
+                               keywords.get('bold',False))
+        self._quads = None
+        self._fill = None
+        if 'halign' in keywords:
+            self.halign = keywords['halign']
+        self._layout()
+
+        GObject.__init__(self,**keywords)
+        if not self.linecolor:
+            self.linecolor = (0,0,0,1)
+        self._defined = True
+
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,text=%s,center=(%s,%s),angle=%s]' \
+                % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
+
+    # HIDDEN METHODS
+    def _load(self,name,size,bold):
+        """
+        Switches to the font of the given name, size and style.
+        """
+        self._font = load_font(name,size,bold)
+        self._layout()
+        if self._defined:
+            self._anchor()
+            if not self._cache is None:
+                self._reset()
+
+    def _layout(self):
+        """
+        Lays out the glyphs of the text, and sizes the label to fit them.
+
+        The glyphs are kept as the arrays of their centers, widths, heights and texture
+        coordinates, with the origin at the center of the label.
+        """
+        font = self._font
+        lines = self._text.split('\n')
+        widths = [font.measure(line) for line in lines]
+        self._width = float(max(max(widths),1))
+        self._height = float(max(font.height*len(lines),1))
+
+        (xs, ys, ws, boxes, uvs) = ([], [], [], [], [])
+        for k in range(len(lines)):
+            if self._halign == 'left':
+                pen = -self._width/2.0
+            elif self._halign == 'right':
+                pen = self._width/2.0-widths[k]
+            else:
+                pen = -widths[k]/2.0
+            y = self._height/2.0-(k+0.5)*font.height
+            for char in lines[k]:
+                (width, box, coords) = font.glyph(char)
+                if not box is None:
+                    xs.append(pen+width/2.0)
+                    ys.append(y)
+                    ws.append(width)
+                    boxes.append(box)
+                    uvs.append(coords)
+                pen += width
+        self._glyphx = np.array(xs,dtype=np.float32)
+        self._glyphy = np.array(ys,dtype=np.float32)
+        self._glyphw = np.array(ws,dtype=np.float32)
+        self._boxes = boxes
+        self._uvs = np.array(uvs,dtype=np.float32).reshape(-1,8)
+
+    def _anchor(self):
+        """
+        Moves the label so that the edges it is anchored by stay put.
+        """
+        if self._hanchor == 'left':
+            self._trans.x = self._ha+self._width/2.0
+        elif self._hanchor == 'right':
+            self._trans.x = self._ha-self._width/2.0
+        if self._vanchor == 'top':
+            self._trans.y = self._hv-self._height/2.0
+        elif self._vanchor == 'bottom':
+            self._trans.y = self._hv+self._height/2.0
+        self._mtrue = False
+
+    def _write(self):
+        """
+        Writes the laid out glyphs into the vertices of the quads.
+        """
+        count = len(self._glyphx)
+        self._quads.resize(count)
+        if count:
+            write_quads(self._quads.buffer,self._glyphx,self._glyphy,self._glyphw,
+                        self._font.height,None,self._uvs)
+        self._quads.flush()
+        if not self._fill is None:
+            self._fill.pos = (-self._width/2.0,-self._height/2.0)
+            self._fill.size = (self._width,self._height)
+
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._fill = None
+        if self.fillcolor:
+            self._fill = Rectangle(pos=(0,0),size=(1,1))
+            self._cache.add(self._fillcolor)
+            self._cache.add(self._fill)
+        self._quads = GQuadMesh(self._font.texture)
+        self._write()
+        self._cache.add(self._linecolor)
+        self._cache.add(self._quads.group())
+        self._cache.add(PopMatrix())
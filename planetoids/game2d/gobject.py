@@ -12,6 +12,7 @@ from kivy.graphics import *
 from kivy.graphics.instructions import *
 from introcs.geom import Point2, Matrix
 import introcs
+import math
 
 def is_color(c):
     """
@@ -138,7 +139,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._width = float(value)
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
 
     @property
@@ -157,7 +158,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value > 0, '%s is not positive' % repr(value)
         self._height = float(value)
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
 
     @property
@@ -244,7 +245,7 @@ class GObject(object):
                 value = introcs.RGB.CreateName(value).glColor()
 
         self._linecolor = None if value is None else Color(value[0],value[1],value[2],value[3])
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
 
     @property
@@ -282,7 +283,7 @@ class GObject(object):
                 value = introcs.RGB.CreateName(value).glColor()
 
         self._fillcolor = None if value is None else Color(value[0],value[1],value[2],value[3])
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
 
     @property
@@ -303,6 +304,24 @@ class GObject(object):
         assert value is None or type(value) == str, '%s is not a valid name' % repr(value)
         self._name = value
 
+    @property
+    def layer(self):
+        """
+        The name of the view layer this object is drawn to.
+
+        Layers are drawn in the order of :attr:`GView.LAYERS`, whatever the order of
+        the ``draw`` calls.  If this value is None, the object is drawn to the layer
+        :attr:`GView.DEFAULT_LAYER`.
+
+        **invariant**: Value must be a name in :attr:`GView.LAYERS` or ``None``
+        """
+        return self._layer
+
+    @layer.setter
+    def layer(self,value):
+        assert value is None or type(value) == str, '%s is not a valid layer' % repr(value)
+        self._layer = value
+
     # DERIVED PROPERTIES
     @property
     def left(self):
@@ -511,6 +530,8 @@ class GObject(object):
         self._trans  = Translate(0,0,0)
         self._rotate = Rotate(angle=0,axis=(0,0,1))
         self._scale  = Scale(1,1,1)
+        # The cached half-size of the bounding box (see _extent)
+        self._extents = None
 
         # Now update these with the keywords; size first
         try:
@@ -544,6 +565,7 @@ class GObject(object):
 
         # Add a name for debugging
         self.name = keywords['name'] if 'name' in keywords else None
+        self.layer = keywords['layer'] if 'layer' in keywords else None
 
     def __str__(self):
         """
@@ -612,17 +634,54 @@ class GObject(object):
             p = self.inverse._transform(point[0],point[2])
             return Point2(p[0],p[1])
 
+    def copy(self):
+        """
+        Creates a copy of this object.
+
+        The copy has its own position, angle and scale, so moving it does not move the
+        original.  It does not build a drawing cache until the first time it is drawn.
+        That makes copying much cheaper than constructing a new object, which matters
+        for games that copy their state many times a frame (e.g. to search ahead).
+
+        Subclasses that add mutable attributes of their own must override this method
+        to copy those attributes as well.
+
+        :return: A copy of this object
+        :rtype:  same class as this object
+        """
+        copy = object.__new__(self.__class__)
+        copy.__dict__.update(self.__dict__)
+        # Positional arguments are noticeably faster than keywords here
+        copy._trans  = Translate(self._trans.x,self._trans.y)
+        copy._rotate = Rotate(self._rotate.angle,0,0,1)
+        copy._scale  = Scale(self._scale.x,self._scale.y,1)
+        copy._mtrue  = False
+        copy._cache  = None
+        return copy
+
     def draw(self, view):
         """
         Draws this shape in the provide view.
 
         Ideally, the view should be the one provided by :class:`GameApp`.
 
+        An object entirely outside of the view is culled: it is not drawn at all (see
+        :meth:`GView.cull`).  A view that rasterizes objects itself (see
+        :class:`GRasterView`) is given this object rather than its drawing cache, so the
+        cache is never built.
+
         :param view: view to draw to
-        :type view:  :class:`GView`
-        """
+        :type view:  :class:`GView` or :class:`GRasterView`
+        """
+        if view.cull(self):
+            return
+        if getattr(view,'rasterizes',False):
+            view.draw(self,self._layer)
+            return
+        if self._defined and self._cache is None:
+            self._reset()
         try:
-            view.draw(self._cache)
+            view.draw(self._cache,self._layer)
         except:
             raise IOError('Cannot draw %s since it was not initialized properly' % repr(self))
 
@@ -637,6 +696,50 @@ class GObject(object):
         self._cache.add(self._rotate)
         self._cache.add(self._scale)
 
+    def _extent(self):
+        """
+        Returns the half-width and half-height of the bounding box of this object.
+
+        The box is centered at (x,y), and holds the shape at its current angle and
+        scale, along with any border.  It is cached, and only recomputed when the angle,
+        scale or size changes, so moving an object does not touch it.  The result is
+        None if the size of this object does not bound what it draws.
+
+        :return: the half-width and half-height of the bounding box, or None
+        :rtype:  ``tuple`` of two ``float`` or ``None``
+        """
+        # Borders are centered on the edge, so they reach linewidth past it
+        border = getattr(self,'_linewidth',0)
+        key = (self._rotate.angle,self._scale.x,self._scale.y,self._width,self._height,border)
+        if self._extents is None or self._extents[0] != key:
+            w = abs(self._scale.x)*self._width/2.0+border
+            h = abs(self._scale.y)*self._height/2.0+border
+            if self._rotate.angle % 180 == 0:
+                half = (w,h)
+            elif self._rotate.angle % 90 == 0:
+                half = (h,w)
+            else:
+                rad = math.radians(self._rotate.angle)
+                (cos, sin) = (abs(math.cos(rad)), abs(math.sin(rad)))
+                half = (cos*w+sin*h,sin*w+cos*h)
+            self._extents = (key,half)
+        return self._extents[1]
+
+    def _outside(self,viewport):
+        """
+        Returns True if the bounding box of this object misses the viewport entirely.
+
+        :param viewport: the (left, bottom, right, top) of the visible area
+        :type viewport:  4-element ``tuple`` of numbers
+        """
+        half = self._extent()
+        if half is None:
+            return False
+        x = self._trans.x
+        y = self._trans.y
+        return (x+half[0] < viewport[0] or x-half[0] > viewport[2] or
+                y+half[1] < viewport[1] or y-half[1] > viewport[3])
+
     def _build_matrix(self):
         """
         Builds the transform matrices after a settings change.
@@ -688,7 +791,7 @@ class GScene(GObject):
     def children(self,value):
         assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
         self._children = list(value)
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
 
 
@@ -748,7 +851,7 @@ class GScene(GObject):
         self._defined = False
         self.children = keywords['children'] if 'children' in keywords else []
         GObject.__init__(self,**keywords)
-        self._reset()
+        self._cache = None
         self._defined = True
 
 
@@ -783,11 +886,19 @@ class GScene(GObject):
 
 
     # HIDDEN METHODS
+    def _extent(self):
+        """
+        Returns None, as the size of a scene does not bound its turned children.
+        """
+        return None
+
     def _reset(self):
         """
         Resets the drawing cache
         """
         GObject._reset(self)
         for x in self.children:
+            if x._cache is None:
+                x._reset()
             self._cache.add(x._cache)
         self._cache.add(PopMatrix())
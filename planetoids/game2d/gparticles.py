@@ -0,0 +1,414 @@
+"""
+A module to support particle effects.
+
+A particle system is a swarm of short-lived sprites, like sparks, smoke or flames.
+Making each particle a :class:`GEllipse` or :class:`GImage` with its own ``move`` is
+fine for a few dozen particles, but an explosion wants hundreds, and a game wants
+several explosions at once.  A :class:`GParticleSystem` keeps the state of every
+particle in NumPy arrays and moves them all with a handful of array operations per
+frame.  It then writes them into a single Mesh, as :class:`GSpriteBatch` does.
+
+Particles have their own color, which fades out over their lifetime.  Kivy's default
+shader has no per-vertex color, so the Mesh is drawn in a render context with a shader
+that multiplies the texture by a color attribute of each vertex.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+from .gbatch import GQuadMesh, write_quads
+from .app import GameApp
+import numpy as np
+
+# The vertex format of particles: position, texture coordinates and color
+PARTICLE_FORMAT = [(b'vPosition',2,'float'),(b'vTexCoords0',2,'float'),(b'vColor',4,'float')]
+
+# The shaders for particles; the same as Kivy's default, but with vertex colors
+PARTICLE_VERTEX_SHADER = """
+#ifdef GL_ES
+    precision highp float;
+#endif
+varying vec4 frag_color;
+varying vec2 tex_coord0;
+attribute vec2 vPosition;
+attribute vec2 vTexCoords0;
+attribute vec4 vColor;
+uniform mat4 modelview_mat;
+uniform mat4 projection_mat;
+uniform vec4 color;
+uniform float opacity;
+
+void main (void) {
+  frag_color = vColor * color * vec4(1.0, 1.0, 1.0, opacity);
+  tex_coord0 = vTexCoords0;
+  gl_Position = projection_mat * modelview_mat * vec4(vPosition.xy, 0.0, 1.0);
+}
+"""
+
+PARTICLE_FRAGMENT_SHADER = """
+#ifdef GL_ES
+    precision highp float;
+#endif
+varying vec4 frag_color;
+varying vec2 tex_coord0;
+uniform sampler2D texture0;
+
+void main (void){
+    gl_FragColor = frag_color * texture2D(texture0, tex_coord0);
+}
+"""
+
+
+def _sample(rng,value,count):
+    """
+    Returns count samples of value, which is a number or a (low, high) range.
+
+    :param rng: the random generator
+    :type rng:  ``numpy.random.Generator``
+
+    :param value: the value to sample
+    :type value:  ``int`` or ``float``, or a pair of them
+
+    :param count: the number of samples
+    :type count:  ``int`` >= 0
+    """
+    if type(value) in [tuple,list]:
+        return rng.uniform(value[0],value[1],count)
+    return np.full(count,float(value))
+
+
+# #mark -
+class GParticleSystem(GObject):
+    """
+    A class representing a swarm of particles.
+
+    Each particle is a copy of an image (or a plain square if there is no ``source``)
+    that is ``width`` wide and ``height`` tall before its own scale.  New particles are
+    added with :meth:`emit`, and :meth:`update` moves them all one step, pulling them by
+    ``gravity`` and slowing them by ``drag``.  A particle lives for a fixed time, after
+    which it is removed.  If ``fade`` is True, it becomes more transparent as it ages.
+    If the image is a filmstrip with a grid given by ``format``, each particle plays
+    through the frames over its lifetime.
+
+    Time is measured in whatever unit is given to :meth:`update`; speeds, gravity and
+    lifetimes are all per that unit.  A game that updates once per animation frame
+    can simply count in frames.
+
+    The particles are in the coordinates of the system, so moving the system moves them
+    all.  Most of the time you will leave the system at the origin, and emit particles
+    at their place on the screen.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def source(self):
+        """
+        The source file for the image of the particles.
+
+        **invariant**. Value is a string refering to a valid file, or ``None`` for
+        plain squares.
+        """
+        return self._source
+
+    @source.setter
+    def source(self,value):
+        assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        self._source = value
+        if self._defined and not self._cache is None:
+            self._reset()
+
+    @property
+    def format(self):
+        """
+        The grid size of the filmstrip, as (rows, columns).
+
+        **Invariant**: Value is a 2-element tuple of ints > 0
+        """
+        return self._format
+
+    @format.setter
+    def format(self,value):
+        assert type(value) in [tuple,list] and len(value) == 2, '%s does is not a tuple pair' % repr(value)
+        assert type(value[0]) == int and type(value[1]) == int, '%s does not have int values' % repr(value)
+        assert value[0] > 0 and value[1] > 0, '%s does not have valid values' % repr(value)
+        self._format = tuple(value)
+        if self._defined and not self._cache is None:
+            self._reset()
+
+    @property
+    def gravity(self):
+        """
+        The acceleration of every particle, as (x, y).
+
+        **Invariant**: Value is a 2-element tuple of numbers
+        """
+        return tuple(self._gravity)
+
+    @gravity.setter
+    def gravity(self,value):
+        assert type(value) in [tuple,list] and len(value) == 2, '%s does is not a tuple pair' % repr(value)
+        self._gravity = np.array(value,dtype=float)
+
+    @property
+    def drag(self):
+        """
+        The fraction of its speed that a particle loses per unit of time.
+
+        **Invariant**: Value is a number in 0..1
+        """
+        return self._drag
+
+    @drag.setter
+    def drag(self,value):
+        assert type(value) in [int,float] and 0 <= value <= 1, '%s is not a valid drag' % repr(value)
+        self._drag = value
+
+    @property
+    def fade(self):
+        """
+        Whether the particles fade out as they age.
+
+        **Invariant**: Value is a ``bool``
+        """
+        return self._fade
+
+    @fade.setter
+    def fade(self,value):
+        assert type(value) == bool, '%s is not a bool' % repr(value)
+        self._fade = value
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The most particles alive at once.
+
+        Particles emitted past the capacity are dropped.
+
+        **Invariant**: Value is an int > 0
+        """
+        return len(self._age)
+
+    @property
+    def count(self):
+        """
+        The number of particles alive.
+
+        **Invariant**: Value is an int in 0..capacity
+        """
+        return self._count
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new particle system with no particles.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes. For example, for sparks
+        that fall and fade, use the constructor::
+
+            GParticleSystem(width=4,height=4,gravity=(0,-0.2),fade=True)
+
+        This class supports the same keywords as :class:`GObject`, plus ``source``,
+        ``format``, ``gravity``, ``drag``, ``fade`` and ``capacity`` (which defaults
+        to 4096).  The ``seed`` keyword seeds the random choices of :meth:`emit`.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self.source  = keywords['source'] if 'source' in keywords else None
+        self.format  = keywords['format'] if 'format' in keywords else (1,1)
+        self.gravity = keywords['gravity'] if 'gravity' in keywords else (0,0)
+        self.drag    = keywords['drag'] if 'drag' in keywords else 0
+        self.fade    = keywords['fade'] if 'fade' in keywords else True
+        capacity = keywords['capacity'] if 'capacity' in keywords else 4096
+        assert type(capacity) == int and capacity > 0, '%s is not a valid capacity' % repr(capacity)
+        self._rng = np.random.default_rng(keywords['seed'] if 'seed' in keywords else None)
+
+        self._count = 0
+        self._pos   = np.zeros((capacity,2))
+        self._vel   = np.zeros((capacity,2))
+        self._angle = np.zeros(capacity)
+        self._spin  = np.zeros(capacity)
+        self._sizes = np.zeros(capacity)
+        self._age   = np.zeros(capacity)
+        self._life  = np.ones(capacity)
+        self._color = np.zeros((capacity,4))
+
+        self._quads = GQuadMesh(None,PARTICLE_FORMAT)
+        self._regions = np.zeros((1,8),dtype=np.float32)
+        self._cache = None
+        GObject.__init__(self,**keywords)
+        self._defined = True
+
+    # PUBLIC METHODS
+    def emit(self,x,y,count,angle=0,spread=360,speed=1,life=1,scale=1,spin=0,
+             color=(1,1,1,1),velocity=(0,0)):
+        """
+        Adds count particles at the point (x, y).
+
+        Each particle heads off in a random direction within ``spread`` degrees of
+        ``angle``.  The arguments ``speed``, ``life``, ``scale`` and ``spin`` may each
+        be a number, or a (low, high) pair to pick from at random for every particle.
+        Every particle also starts at a random rotation, turning by ``spin`` degrees
+        per unit of time.
+
+        :param x: the horizontal coordinate of the emitter
+        :type x:  ``int`` or ``float``
+
+        :param y: the vertical coordinate of the emitter
+        :type y:  ``int`` or ``float``
+
+        :param count: the number of particles to add
+        :type count:  ``int`` >= 0
+
+        :param angle: the direction of the particles, in degrees counter-clockwise
+        :type angle:  ``int`` or ``float``
+
+        :param spread: the width of the cone of directions, in degrees
+        :type spread:  ``int`` or ``float``
+
+        :param speed: the speed of the particles
+        :type speed:  number or a pair of numbers
+
+        :param life: the lifetime of the particles
+        :type life:  number or a pair of numbers > 0
+
+        :param scale: the scale of the particles
+        :type scale:  number or a pair of numbers
+
+        :param spin: the turning rate of the particles, in degrees
+        :type spin:  number or a pair of numbers
+
+        :param color: the color of the particles, as RGBA values in 0..1
+        :type color:  4-element tuple of numbers
+
+        :param velocity: a velocity added to every particle, as that of the emitter
+        :type velocity:  2-element tuple of numbers
+        """
+        count = max(0,min(count,self.capacity-self._count))
+        if count == 0:
+            return
+        rng = self._rng
+        new = slice(self._count,self._count+count)
+        heading = np.radians(angle+rng.uniform(-spread/2,spread/2,count))
+        speeds  = _sample(rng,speed,count)
+        self._pos[new] = (x,y)
+        self._vel[new,0] = speeds*np.cos(heading)+velocity[0]
+        self._vel[new,1] = speeds*np.sin(heading)+velocity[1]
+        self._angle[new] = rng.uniform(0,360,count)
+        self._spin[new]  = _sample(rng,spin,count)
+        self._sizes[new] = _sample(rng,scale,count)
+        self._age[new]   = 0
+        self._life[new]  = _sample(rng,life,count)
+        self._color[new] = color
+        self._count += count
+
+    def update(self,dt=1):
+        """
+        Moves every particle forward by dt, and removes those past their lifetime.
+
+        :param dt: the time since the last update
+        :type dt:  ``int`` or ``float`` >= 0
+        """
+        n = self._count
+        if n == 0:
+            return
+        vel = self._vel[:n]
+        vel += self._gravity*dt
+        if self._drag:
+            vel *= (1-self._drag)**dt
+        self._pos[:n] += vel*dt
+        self._angle[:n] += self._spin[:n]*dt
+        self._age[:n] += dt
+        alive = np.flatnonzero(self._age[:n] < self._life[:n])
+        if len(alive) < n:
+            for array in (self._pos,self._vel,self._angle,self._spin,self._sizes,
+                          self._age,self._life,self._color):
+                array[:len(alive)] = array[alive]
+            self._count = len(alive)
+
+    def clear(self):
+        """
+        Removes every particle.
+        """
+        self._count = 0
+
+    def draw(self, view):
+        """
+        Draws the particles in the provide view.
+
+        :param view: view to draw to
+        :type view:  :class:`GView` or :class:`GRasterView`
+        """
+        if getattr(view,'rasterizes',False):
+            view.draw(self,self._layer)
+            return
+        if self._defined and self._cache is None:
+            self._reset()
+        self._write()
+        GObject.draw(self,view)
+
+    # HIDDEN METHODS
+    def _extent(self):
+        """
+        Returns None, as the size of this object is that of each of its particles.
+        """
+        return None
+
+    def _write(self):
+        """
+        Writes the particles into the vertex buffer.
+        """
+        n = self._count
+        self._quads.resize(n)
+        if n:
+            out = self._quads.buffer
+            frames = len(self._regions)
+            ages = self._age[:n]/self._life[:n]
+            uvs = self._regions[0] if frames == 1 else self._regions[
+                np.minimum((ages*frames).astype(int),frames-1)]
+            scale = self._sizes[:n]
+            write_quads(out,self._pos[:n,0],self._pos[:n,1],self.width*scale,
+                self.height*scale,self._angle[:n],uvs)
+            out[:,:,4:] = self._color[:n,np.newaxis,:]
+            if self._fade:
+                out[:,:,7] *= (1-ages)[:,np.newaxis]
+        self._quads.flush()
+
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        texture = None if self._source is None else GameApp.load_texture(self._source)
+        (rows, cols) = self._format
+        self._regions = np.zeros((rows*cols,8),dtype=np.float32)
+        if texture:
+            width  = texture.width/cols
+            height = texture.height/rows
+            for row in range(rows):
+                for col in range(cols):
+                    region = texture.get_region(int(col*width),
+                        texture.height-int((row+1)*height),int(width),int(height))
+                    self._regions[row*cols+col] = region.tex_coords
+        else:
+            if not self._source is None:
+                print('Failed to load',repr(self._source))
+            self._regions[:] = (0,0,1,0,1,1,0,1)
+
+        self._quads = GQuadMesh(texture,PARTICLE_FORMAT)
+        context = RenderContext(use_parent_projection=True,use_parent_modelview=True,
+                                use_parent_frag_modelview=True)
+        context.shader.vs = PARTICLE_VERTEX_SHADER
+        context.shader.fs = PARTICLE_FRAGMENT_SHADER
+        if not self._fillcolor is None:
+            context.add(self._fillcolor)
+        else:
+            context.add(Color(1,1,1))
+        context.add(self._quads.group())
+        self._cache.add(context)
+        self._cache.add(PopMatrix())
@@ -102,6 +102,13 @@ class GPath(GObject):
     On the other hand, the attributes ``x`` and ``y`` are used.  By default, these values
     are 0.  However, if they are nonzero, then Python will add them to all of the points
     in the path, shifting the path accordingly.
+    
+    Setting ``points`` rebuilds the line from scratch.  To grow a path a point at a time,
+    as with a stroke that follows the mouse, use :meth:`append` (or :meth:`extend`) and 
+    :meth:`truncate` instead.  They change the points of the Kivy line in place, so the
+    cost of a change does not depend on the length of the path.  If ``capacity`` is set,
+    appending past that many points drops the oldest ones, which makes a trail of fixed 
+    length.
     """
     
     # MUTABLE PROPERTIES
@@ -113,15 +120,38 @@ class GPath(GObject):
         **Invariant**: Must be a sequence (list or tuple) of int or float. 
         The length of this sequence must be even with length at least 4.
         """
-        return self._points
+        return tuple(self._points)
     
     @points.setter
     def points(self,value):
         assert is_point_tuple(value,2),'value %s is not a valid list of points' %  repr(value)
-        self._points = tuple(value)
-        if self._defined:
+        self._points = list(value)
+        if not self._capacity is None and len(self._points) > 2*self._capacity:
+            del self._points[:len(self._points)-2*self._capacity]
+        self._bound()
+        if self._defined and not self._cache is None:
             self._reset()
     
+    @property
+    def capacity(self):
+        """
+        The most points this path keeps, or None for no limit.
+        
+        When :meth:`append` or :meth:`extend` takes the path past this many points, the 
+        oldest points are dropped.
+        
+        **Invariant**: Must be None or an int >= 2.
+        """
+        return self._capacity
+    
+    @capacity.setter
+    def capacity(self,value):
+        assert value is None or type(value) == int, 'value %s is not an int' % repr(value)
+        assert value is None or value >= 2, 'value %s is less than 2' % repr(value)
+        self._capacity = value
+        if not value is None and self._defined and len(self._points) > 2*value:
+            self._drop(len(self._points)//2-value)
+    
     @property
     def linewidth(self):
         """
@@ -138,7 +168,7 @@ class GPath(GObject):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         assert value >= 0, 'value %s is negative' % repr(value)
         self._linewidth = value
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
     
     
@@ -153,8 +183,7 @@ class GPath(GObject):
         
         **Invariant**: Must be an int or float > 0.
         """ 
-        px = self.points[::2]+(0,0)
-        return 2*max(max(px),-min(px))
+        return self._width
     
     @property
     def height(self):
@@ -166,8 +195,7 @@ class GPath(GObject):
         
         **Invariant**: Must be an int or float > 0.
         """ 
-        py = self.points[1::2]+(0,0)
-        return 2*max(max(py),-min(py))
+        return self._height
     
     
     # BUILT-IN METHODS
@@ -183,22 +211,99 @@ class GPath(GObject):
         
         This class supports the same keywords as :class:`GObject`, though some of them 
         are unused, as the ``width`` and ``height`` attributes are now immutable. The 
-        primary keywords for this class are ``points``, ``linecolor``, and ``linewidth``.
+        primary keywords for this class are ``points``, ``linecolor``, ``linewidth`` and
+        ``capacity``.
         
         :param keywords: dictionary of keyword arguments 
         :type keywords:  keys are attribute names
         """
         self._defined = False
+        self._line = None
+        self.capacity = keywords['capacity'] if 'capacity' in keywords else None
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 1.0
         self.points = keywords['points'] if 'points' in keywords else (0,0,10,10)
         if not 'linecolor' in keywords:
             keywords['linecolor'] = (1,1,1,1)
         GObject.__init__(self,**keywords)
-        self._reset()
+        self._cache = None
         self._defined = True
     
     
     # PUBLIC METHODS
+    def copy(self):
+        """
+        Creates a copy of this path.
+        
+        The copy has its own points, so appending to it does not change the original.
+        
+        :return: A copy of this path
+        :rtype:  same class as this object
+        """
+        copy = GObject.copy(self)
+        if type(self._points) == list:
+            copy._points = list(self._points)
+        copy._line = None
+        return copy
+    
+    def append(self,x,y):
+        """
+        Adds a point to the end of this path.
+        
+        The point is added to the Kivy line in place, and the oldest point is dropped if
+        the path is already at its ``capacity``.
+        
+        :param x: the horizontal coordinate of the point
+        :type x:  ``int`` or ``float``
+        
+        :param y: the vertical coordinate of the point
+        :type y:  ``int`` or ``float``
+        """
+        self.extend((x,y))
+    
+    def extend(self,points):
+        """
+        Adds points to the end of this path.
+        
+        The points are added to the Kivy line in place, and the oldest points are 
+        dropped if that takes the path past its ``capacity``.
+        
+        :param points: the points to add
+        :type points:  an even sequence (list or tuple) of int or float
+        """
+        assert is_point_tuple(points,0),'value %s is not a valid list of points' %  repr(points)
+        # Subclasses keep a fixed tuple of points, and must be rebuilt
+        if type(self._points) != list:
+            self.points = tuple(self._points)+tuple(points)
+            return
+        self._points.extend(points)
+        for k in range(0,len(points),2):
+            self._width  = max(self._width,2*abs(points[k]))
+            self._height = max(self._height,2*abs(points[k+1]))
+        if not self._capacity is None and len(self._points) > 2*self._capacity:
+            self._drop(len(self._points)//2-self._capacity)
+        elif not self._line is None:
+            self._line.flag_data_update()
+    
+    def truncate(self,count):
+        """
+        Removes all but the first count points of this path.
+        
+        The points are removed from the Kivy line in place.
+        
+        :param count: the number of points to keep
+        :type count:  ``int`` >= 2
+        """
+        assert type(count) == int and count >= 2, 'value %s is not an int >= 2' % repr(count)
+        if 2*count >= len(self._points):
+            return
+        if type(self._points) != list:
+            self.points = self._points[:2*count]
+            return
+        del self._points[2*count:]
+        self._bound()
+        if not self._line is None:
+            self._line.flag_data_update()
+    
     def contains(self,point):
         """
         Checks whether this shape contains the point
@@ -250,15 +355,36 @@ class GPath(GObject):
     
     
     # HIDDEN METHODS
+    def _bound(self):
+        """
+        Sets the width and height of this path from its points.
+        """
+        px = self._points[::2]
+        py = self._points[1::2]
+        self._width  = 2*max(max(px),-min(px),0)
+        self._height = 2*max(max(py),-min(py),0)
+    
+    def _drop(self,count):
+        """
+        Removes the first count points of this path.
+        """
+        del self._points[:2*count]
+        self._bound()
+        if not self._line is None:
+            self._line.flag_data_update()
+    
     def _reset(self):
         """
         Resets the drawing cache
         """
         GObject._reset(self)
+        self._line = None
         if not self._linecolor is None:
             self._cache.add(self._linecolor)
-            line = Line(points=self.points,cap='round',joint='round',width=self.linewidth)
-            self._cache.add(line)
+            self._line = Line(points=self._points,cap='round',joint='round',width=self.linewidth)
+            # Share the points of the line, so that they can change in place
+            self._points = self._line.points
+            self._cache.add(self._line)
         self._cache.add(PopMatrix())
 
 
@@ -297,7 +423,8 @@ class GTriangle(GPath):
         assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
         assert len(value) == 6, 'value %s does not have the right length'  %  repr(value)
         self._points = tuple(value)
-        if self._defined:
+        self._bound()
+        if self._defined and not self._cache is None:
             self._reset()
     
     
@@ -319,10 +446,12 @@ class GTriangle(GPath):
         :type keywords:  keys are attribute names
         """
         self._defined = False
+        self._line = None
+        self._capacity = None
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.points = keywords['points'] if 'points' in keywords else (-100,-58,0,116,100,-58)
         GObject.__init__(self,**keywords)
-        self._reset()
+        self._cache = None
         self._defined = True
     
     
@@ -416,7 +545,8 @@ class GPolygon(GPath):
     def points(self,value):
         assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
-        if self._defined:
+        self._bound()
+        if self._defined and not self._cache is None:
             self._reset()
     
     @property
@@ -433,7 +563,7 @@ class GPolygon(GPath):
         from .app import GameApp
         assert value is None or GameApp.is_image(value), 'value %s is not an image file' % repr(value)
         self._source = value
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
     
     @property
@@ -458,7 +588,7 @@ class GPolygon(GPath):
     def source_width(self,value):
         assert value is None or type(value) in [int,float], 'value %s is not a valid width' % repr(value)
         self._source_width = None
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
     
     @property
@@ -483,7 +613,7 @@ class GPolygon(GPath):
     def source_height(self,value):
         assert value is None or _is_num(value), 'value %s is not a valid width' % repr(value)
         self._source_height = None
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
     
     
@@ -505,13 +635,15 @@ class GPolygon(GPath):
         :type keywords:  keys are attribute names
         """
         self._defined = False
+        self._line = None
+        self._capacity = None
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.points = keywords['points'] if 'points' in keywords else (-100,-58,0,116,100,-58)
         self.source = keywords['source'] if 'source' in keywords else None
         self.source_width  = keywords['source_width']  if 'source_width'  in keywords else None
         self.source_height = keywords['source_height'] if 'source_height' in keywords else None
         GObject.__init__(self,**keywords)
-        self._reset()
+        self._cache = None
         self._defined = True
     
     
@@ -547,32 +679,44 @@ class GPolygon(GPath):
         """
         Creates the mesh for this polygon
         """
-        size = len(self.points)/2
-        try:
-            texture = Image(source=self.source).texture
-            texture.wrap = 'repeat'
-            tw = float(texture.width)  if self.source_width is None else self.source_width
-            th = float(texture.height) if self.source_height is None else self.source_height
-            
-            # Centroid at 0, with texture centered
-            verts = (0,0,0.5,0.5) 
-            
-            # Create the fan.
-            for x in range(size):
-                pt = self.points[2*x:2*x+2]
-                self._verts += pt+(pt[0]/tw+0.5,pt[1]/th+0.5)
-            
-            # Come back to the beginning
-            pt = self.points[0:2]
-            verts += pt+(pt[0]/tw+0.5,pt[1]/th+0.5)
-            self._mesh = Mesh(vertices=verts, indices=range(size+2), mode='triangle_fan', texture=texture)
-        except BaseException as e:
+        from .app import GameApp
+        size = len(self.points)//2
+        texture = None if self.source is None else GameApp.load_texture(self.source)
+        if texture is None:
             # Make all texture coordinates degnerate
-            verts = (0,0,0,0) 
+            verts = [0,0,0,0]
             for x in range(size):
-                verts += self.points[2*x:2*x+2]+(0,0)
-            verts += self.points[0:2]+(0,0)
+                verts += list(self.points[2*x:2*x+2])+[0,0]
+            verts += list(self.points[0:2])+[0,0]
             self._mesh = Mesh(vertices=verts, indices=range(size+2), mode='triangle_fan')
+            return
+        
+        tw = float(texture.width)  if self.source_width is None else self.source_width
+        th = float(texture.height) if self.source_height is None else self.source_height
+        
+        # Centroid at 0, with texture centered, in image coordinates (0 to 1 across)
+        coords = [(0.5,0.5)]
+        for x in range(size+1):
+            pt = self.points[2*(x % size):2*(x % size)+2]
+            coords.append((pt[0]/tw+0.5,pt[1]/th+0.5))
+        
+        inside = all(0 <= s <= 1 and 0 <= t <= 1 for (s,t) in coords)
+        if not inside and not GameApp.ATLAS is None and self.source in GameApp.ATLAS:
+            # An atlas region cannot repeat, so use the image on its own
+            from kivy.core.image import Image
+            texture = Image(GameApp.images+'/'+self.source).texture
+        if not inside:
+            texture.wrap = 'repeat'
+        
+        # Map image coordinates to the texture, which may be flipped or a region
+        (u0, v0) = texture.tex_coords[0:2]
+        (u1, v1) = texture.tex_coords[4:6]
+        verts = []
+        for x in range(size+2):
+            pt = (0,0) if x == 0 else self.points[2*((x-1) % size):2*((x-1) % size)+2]
+            (s, t) = coords[x]
+            verts += [pt[0],pt[1],u0+s*(u1-u0),v0+t*(v1-v0)]
+        self._mesh = Mesh(vertices=verts, indices=range(size+2), mode='triangle_fan', texture=texture)
     
     def _reset(self):
         """
@@ -0,0 +1,888 @@
+"""
+A module to support drawing without a GPU.
+
+A :class:`GView` hands Kivy instructions to OpenGL, so it needs a window, and a window
+needs a display and a GPU (or a software GL).  A :class:`GRasterView` draws the same
+objects into a NumPy array instead.  It takes the objects themselves rather than their
+Kivy drawing caches, since Kivy cannot make the vertex instructions in those caches
+without GL.  Each object is rasterized from its attributes: it is placed by its
+position, angle and scale (inside any :class:`GScene`), and every pixel of its bounding
+box is mapped back into the object to see whether it is covered, and by what color.
+
+This is much slower than a GPU, but it needs nothing but NumPy and the Kivy image and
+text loaders, so it runs on machines without a display.  That makes it useful to test
+what a game draws, and to turn recorded games into image files.
+
+Images are sampled bilinearly, like Kivy textures.  Shapes have hard edges unless the
+view is made with more than one sample per pixel, in which case they are antialiased.
+Particle systems are drawn a particle at a time, and bitmap labels a glyph at a time.
+Sprite batches are not drawn, as they only keep their copies as GL vertices.  Labels
+can be drawn, but Kivy cannot make them without a window in the first place.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from .gobject import GObject, GScene
+from .grectangle import GRectangle, GEllipse, GImage, GLabel
+from .gsprite import GSprite
+from .gpath import GPath, GTriangle, GPolygon
+from .gparticles import GParticleSystem
+from .gfont import GBitmapLabel
+from .gview import GView
+import numpy as np
+import struct
+import zlib
+
+# The pixels of each image file drawn so far, by file name
+PIXEL_CACHE = {}
+
+# The pixels of each label text drawn so far, by text and font
+TEXT_CACHE = {}
+
+# The most label texts to keep in TEXT_CACHE
+TEXT_CACHE_SIZE = 256
+
+
+def image_pixels(data):
+    """
+    Returns the pixels of a Kivy ``ImageData`` as an RGBA array.
+
+    The rows of the array go from the top of the image to the bottom.
+
+    :param data: the image data, as made by a Kivy image or text loader
+    :type data:  ``ImageData``
+
+    :return: the pixels, with values 0 to 1
+    :rtype:  float32 array of shape (height, width, 4)
+    """
+    fmt = data.fmt
+    depth = len(fmt)
+    rowlength = data.rowlength if data.rowlength else data.width*depth
+    raw = np.frombuffer(data.data,dtype=np.uint8)[:rowlength*data.height]
+    raw = raw.reshape(data.height,rowlength)[:,:data.width*depth].reshape(data.height,data.width,depth)
+    pixels = np.ones((data.height,data.width,4),dtype=np.float32)
+    for k in range(depth):
+        pixels[:,:,'rgba'.index(fmt[k])] = raw[:,:,k]/255.0
+    if not data.flip_vertical:
+        pixels = pixels[::-1]
+    return np.ascontiguousarray(pixels)
+
+
+def load_pixels(name):
+    """
+    Returns the pixels of the image file name, or None if it cannot be loaded.
+
+    The file is found the same way as :meth:`GameApp.load_texture` finds it, but it is
+    never made into a texture, so this works without a window.  The pixels are cached.
+
+    :param name: the file name
+    :type name:  ``str``
+
+    :return: the pixels, top row first, with values 0 to 1
+    :rtype:  float32 array of shape (height, width, 4), or ``None``
+    """
+    if name in PIXEL_CACHE:
+        return PIXEL_CACHE[name]
+    from kivy.core.image import ImageLoader
+    from kivy.resources import resource_find
+    path = resource_find(name)
+    try:
+        pixels = image_pixels(ImageLoader.load(path)._data[0])
+    except:
+        print('Failed to load',repr(name))
+        pixels = None
+    PIXEL_CACHE[name] = pixels
+    return pixels
+
+
+def text_pixels(label):
+    """
+    Returns the pixels of the text of a Kivy label, rendered without a window.
+
+    The text is rendered by :func:`render_text`.  It is white, as the label colors it
+    when it is drawn.  The pixels are cached.
+
+    :param label: the label to render
+    :type label:  ``kivy.uix.label.Label``
+
+    :return: the pixels, top row first, with values 0 to 1
+    :rtype:  float32 array of shape (height, width, 4), or ``None`` for no text
+    """
+    options = dict(label._label.options)
+    options['text'] = label.text
+    key = repr(sorted(options.items()))
+    if key in TEXT_CACHE:
+        return TEXT_CACHE[key]
+    pixels = render_text(options)
+    if len(TEXT_CACHE) >= TEXT_CACHE_SIZE:
+        TEXT_CACHE.clear()
+    TEXT_CACHE[key] = pixels
+    return pixels
+
+
+def render_text(options):
+    """
+    Returns the pixels of text rendered by Kivy without a window.
+
+    Kivy renders text straight into a texture.  Here the texture is replaced by an
+    object that keeps the image data it is given instead.  Unlike :func:`text_pixels`,
+    the result is not cached.
+
+    :param options: the options of a Kivy core label, including its text
+    :type options:  ``dict``
+
+    :return: the pixels, top row first, with values 0 to 1
+    :rtype:  float32 array of shape (height, width, 4), or ``None`` for no text
+    """
+    from kivy.core.text import Label as CoreLabel
+
+    class Capture(object):
+        def blit_data(self,data):
+            self.data = data
+
+    core = CoreLabel(**options)
+    core.resolve_font_name()
+    size = core.render()
+    if size[0] <= 0 or size[1] <= 0:
+        return None
+    core._size_texture = size
+    core._size = size
+    core.texture = Capture()
+    core.render(real=True)
+    return image_pixels(core.texture.data)
+
+
+def write_png(path,pixels):
+    """
+    Saves an RGBA array as a PNG file.
+
+    :param path: the file to write
+    :type path:  ``str``
+
+    :param pixels: the pixels, top row first
+    :type pixels:  uint8 array of shape (height, width, 4)
+    """
+    (height, width) = pixels.shape[:2]
+    rows = np.zeros((height,1+4*width),dtype=np.uint8)
+    rows[:,1:] = pixels.reshape(height,-1)
+
+    def chunk(kind,data):
+        return struct.pack('>I',len(data))+kind+data+struct.pack('>I',zlib.crc32(kind+data))
+
+    with open(path,'wb') as file:
+        file.write(b'\x89PNG\r\n\x1a\n')
+        file.write(chunk(b'IHDR',struct.pack('>IIBBBBB',width,height,8,6,0,0,0)))
+        file.write(chunk(b'IDAT',zlib.compress(rows.tobytes(),6)))
+        file.write(chunk(b'IEND',b''))
+
+
+def read_png(path):
+    """
+    Returns the pixels of a PNG file (or any image Kivy can load).
+
+    :param path: the file to read
+    :type path:  ``str``
+
+    :return: the pixels, top row first
+    :rtype:  uint8 array of shape (height, width, 4)
+    """
+    from kivy.core.image import ImageLoader
+    pixels = image_pixels(ImageLoader.load(path)._data[0])
+    return np.round(pixels*255).astype(np.uint8)
+
+
+def local_matrix(obj):
+    """
+    Returns the 3x3 affine matrix from the coordinates of obj to those of its parent.
+
+    This is the Translate, Rotate and Scale at the start of the drawing cache.
+
+    :param obj: the object to place
+    :type obj:  :class:`GObject`
+    """
+    rad = np.radians(obj._rotate.angle)
+    (cos, sin) = (np.cos(rad), np.sin(rad))
+    (sx, sy) = (obj._scale.x, obj._scale.y)
+    return np.array([[cos*sx,-sin*sy,obj._trans.x],
+                     [sin*sx, cos*sy,obj._trans.y],
+                     [0,0,1]])
+
+
+def _affine(x,y,angle=0,sx=1,sy=1):
+    """
+    Returns the 3x3 matrix that scales, then rotates by angle degrees, then moves.
+    """
+    rad = np.radians(angle)
+    (cos, sin) = (np.cos(rad), np.sin(rad))
+    return np.array([[cos*sx,-sin*sy,x],[sin*sx,cos*sy,y],[0,0,1]])
+
+
+def _rgba(color):
+    """
+    Returns the rgba of a Kivy Color instruction, or None.
+    """
+    return None if color is None else np.array(color.rgba,dtype=np.float32)
+
+
+def _segment_distance(px,py,ax,ay,bx,by):
+    """
+    Returns the distance of each point (px, py) from the segment from a to b.
+    """
+    (dx, dy) = (bx-ax, by-ay)
+    length = dx*dx+dy*dy
+    if length == 0:
+        return np.hypot(px-ax,py-ay)
+    t = np.clip(((px-ax)*dx+(py-ay)*dy)/length,0,1)
+    return np.hypot(px-ax-t*dx,py-ay-t*dy)
+
+
+def _in_triangle(px,py,a,b,c):
+    """
+    Returns whether each point (px, py) is in the triangle a, b, c (either winding).
+    """
+    d1 = (px-b[0])*(a[1]-b[1])-(a[0]-b[0])*(py-b[1])
+    d2 = (px-c[0])*(b[1]-c[1])-(b[0]-c[0])*(py-c[1])
+    d3 = (px-a[0])*(c[1]-a[1])-(c[0]-a[0])*(py-a[1])
+    negative = (d1 < 0) | (d2 < 0) | (d3 < 0)
+    positive = (d1 > 0) | (d2 > 0) | (d3 > 0)
+    return ~(negative & positive)
+
+
+def _sample(pixels,u,v,box=None,repeat=False):
+    """
+    Returns the bilinear samples of an image at the texture coordinates (u, v).
+
+    As with a Kivy texture, (0, 0) is the bottom left of the image and (1, 1) the top
+    right.  If box is given, the coordinates cover only that part of the image.
+
+    :param pixels: the image, top row first
+    :type pixels:  float32 array of shape (height, width, 4)
+
+    :param box: the (left, top, width, height) of the part of the image sampled
+    :type box:  4-element tuple of ints, or ``None`` for the whole image
+
+    :param repeat: whether coordinates outside [0, 1] wrap around, or are clamped
+    :type repeat:  ``bool``
+    """
+    if box is None:
+        box = (0,0,pixels.shape[1],pixels.shape[0])
+    (left, top, cols, rows) = box
+    tx = (u*cols-0.5).astype(np.float32)
+    ty = ((1-v)*rows-0.5).astype(np.float32)
+    x0 = np.floor(tx)
+    y0 = np.floor(ty)
+    fx = (tx-x0)[...,np.newaxis]
+    fy = (ty-y0)[...,np.newaxis]
+    x0 = x0.astype(np.intp)
+    y0 = y0.astype(np.intp)
+    if repeat:
+        (xa, xb) = (x0 % cols, (x0+1) % cols)
+        (ya, yb) = (y0 % rows, (y0+1) % rows)
+    else:
+        (xa, xb) = (np.clip(x0,0,cols-1), np.clip(x0+1,0,cols-1))
+        (ya, yb) = (np.clip(y0,0,rows-1), np.clip(y0+1,0,rows-1))
+    # Gathering from the flattened texels is much faster than indexing by row and column
+    texels = pixels.reshape(-1,4)
+    width = pixels.shape[1]
+    (ya, yb) = ((ya+top)*width+left, (yb+top)*width+left)
+    upper = texels.take(ya+xa,axis=0)*(1-fx)+texels.take(ya+xb,axis=0)*fx
+    lower = texels.take(yb+xa,axis=0)*(1-fx)+texels.take(yb+xb,axis=0)*fx
+    return upper*(1-fy)+lower*fy
+
+
+def _frame_box(pixels,format,frame):
+    """
+    Returns the (left, top, width, height) of a frame of a filmstrip image.
+
+    Frames are numbered left-to-right, top-to-bottom in a grid of (rows, columns).
+    """
+    (rows, cols) = format
+    width  = pixels.shape[1]/cols
+    height = pixels.shape[0]/rows
+    (row, col) = divmod(frame,cols)
+    return (int(col*width),int(row*height),int(width),int(height))
+
+
+# #mark -
+class GRasterLayer(object):
+    """
+    A class representing one named layer of a :class:`GRasterView`.
+
+    It works as a :class:`GLayer` does.  Objects drawn to the layer are rasterized at
+    the end of the frame, on top of the objects kept on it.  **You should never
+    construct an object of this class**.  Use the layers of the view, through
+    :meth:`GRasterView.layer`.
+    """
+    # Objects draw themselves to the layer, not their drawing caches
+    rasterizes = True
+
+    # MUTABLE ATTRIBUTES
+    @property
+    def visible(self):
+        """
+        Whether this layer is drawn.
+
+        **Invariant**: Must be a bool
+        """
+        return self._visible
+
+    @visible.setter
+    def visible(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._visible = value
+
+    # IMMUTABLE ATTRIBUTES
+    @property
+    def name(self):
+        """
+        The name of this layer.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a name in :attr:`GRasterView.LAYERS`
+        """
+        return self._name
+
+    # BUILT-IN METHODS
+    def __init__(self,name,view):
+        """
+        Creates a new, empty layer
+
+        :param name: the name of the layer
+        :type name:  ``str``
+
+        :param view: the view the layer belongs to
+        :type view:  :class:`GRasterView`
+        """
+        self._name = name
+        self._view = view
+        self._visible = True
+        self._kept = []
+        self._pending = []
+
+    # PUBLIC METHODS
+    def draw(self,obj,layer=None):
+        """
+        Draws the given object to this layer for this frame.
+
+        You should never call this method. Use the `draw` method in :class:`GObject`.
+
+        :param obj: the object to draw
+        :type obj:  :class:`GObject`
+
+        :param layer: ignored; the object always goes to this layer
+        :type layer:  ``str`` or ``None``
+        """
+        self._pending.append(obj)
+
+    def keep(self,obj):
+        """
+        Keeps the object on this layer until it is dropped.
+
+        :param obj: the object to keep
+        :type obj:  :class:`GObject`
+        """
+        if not obj in self._kept:
+            self._kept.append(obj)
+
+    def drop(self,obj):
+        """
+        Removes an object kept by :meth:`keep` from this layer.
+
+        :param obj: the object to drop
+        :type obj:  :class:`GObject`
+        """
+        if obj in self._kept:
+            self._kept.remove(obj)
+
+    def cull(self,obj):
+        """
+        Returns True if obj is entirely outside of the view, and so is not drawn.
+
+        :param obj: the object to check
+        :type obj:  :class:`GObject`
+        """
+        return self._view.cull(obj)
+
+    def rebuild(self):
+        """
+        Does nothing, as a raster layer is drawn from scratch every frame.
+        """
+        pass
+
+    # HIDDEN METHODS
+    def _objects(self):
+        """
+        Returns the objects to draw this frame, bottom to top.
+        """
+        drawn = self._pending
+        if self._kept:
+            self._pending = []
+            for obj in self._kept:
+                obj.draw(self)
+            drawn = self._pending+drawn
+        self._pending = []
+        return drawn
+
+
+# #mark -
+class GRasterView(object):
+    """
+    A class representing a drawing surface in memory.
+
+    This is a stand-in for :class:`GView` that works without a window.  Objects are
+    drawn to it with their ``draw`` method, between calls to :meth:`clear` and
+    :meth:`commit`, exactly as with the view of a :class:`GameApp`.  It has the same
+    layers, which are drawn in the same order.  When the frame is committed, the
+    objects are rasterized onto a white background, and the result is stored in the
+    attribute ``pixels``.
+
+    Unlike a :class:`GView`, this view is made directly, with the size of the game
+    window.  The image can be made smaller or larger than the window with ``scale``.
+    """
+    # The names of the layers, bottom to top
+    LAYERS = GView.LAYERS
+    # The layer of objects that do not name one
+    DEFAULT_LAYER = GView.DEFAULT_LAYER
+    # Objects draw themselves to this view, not their drawing caches
+    rasterizes = True
+
+    # MUTABLE ATTRIBUTES
+    @property
+    def culling(self):
+        """
+        Whether objects entirely outside of the game window are skipped.
+
+        **Invariant**: Must be a bool
+        """
+        return self._culling
+
+    @culling.setter
+    def culling(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._culling = value
+
+    # IMMUTABLE ATTRIBUTES
+    @property
+    def culled(self):
+        """
+        The number of objects culled since the last :meth:`clear`.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0
+        """
+        return self._culled
+
+    @property
+    def width(self):
+        """
+        The width of the game window drawn.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int > 0
+        """
+        return self._width
+
+    @property
+    def height(self):
+        """
+        The height of the game window drawn.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int > 0
+        """
+        return self._height
+
+    @property
+    def scale(self):
+        """
+        The pixels of the image for each unit of the game window.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a number > 0
+        """
+        return self._pixel_scale
+
+    @property
+    def pixels(self):
+        """
+        The image made by the last :meth:`commit`, top row first.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a uint8 RGBA array of shape (height*scale, width*scale, 4)
+        """
+        if self._pixels is None:
+            (rows, cols) = (self._buffer.shape[0]//self._samples, self._buffer.shape[1]//self._samples)
+            shape = (rows,self._samples,cols,self._samples,3)
+            rgb = self._buffer.reshape(shape).mean(axis=(1,3))
+            self._pixels = np.full((rows,cols,4),255,dtype=np.uint8)
+            self._pixels[:,:,:3] = np.round(np.clip(rgb,0,1)*255)
+        return self._pixels
+
+    # BUILT-IN METHODS
+    def __init__(self,width,height,scale=1,samples=1):
+        """
+        Creates a new view of a game window of the given size.
+
+        :param width: the width of the game window
+        :type width:  ``int`` > 0
+
+        :param height: the height of the game window
+        :type height:  ``int`` > 0
+
+        :param scale: the pixels of the image for each unit of the game window
+        :type scale:  ``int`` or ``float`` > 0
+
+        :param samples: the samples across (and down) each pixel, for antialiasing
+        :type samples:  ``int`` > 0
+        """
+        assert type(samples) == int and samples > 0, '%s is not a valid sample count' % repr(samples)
+        self._width = width
+        self._height = height
+        self._pixel_scale = scale
+        self._samples = samples
+        rows = int(round(height*scale))
+        cols = int(round(width*scale))
+        self._buffer = np.ones((rows*samples,cols*samples,3),dtype=np.float32)
+        self._pixels = None
+        self._layers = {}
+        for name in self.LAYERS:
+            self._layers[name] = GRasterLayer(name,self)
+        self._default = self._layers[self.DEFAULT_LAYER]
+        self._culling = True
+        self._culled = 0
+        # From the game window to sample positions, with the rows running down
+        unit = scale*samples
+        self._view = np.array([[unit,0,0],[0,-unit,rows*samples],[0,0,1]])
+
+    # PUBLIC METHODS
+    def draw(self,obj,layer=None):
+        """
+        Draws the given object to this view.
+
+        You should never call this method.  Use the `draw` method in :class:`GObject`.
+
+        :param obj: the object to draw
+        :type obj:  :class:`GObject`
+
+        :param layer: the name of the layer to draw to (None for :attr:`DEFAULT_LAYER`)
+        :type layer:  ``str`` or ``None``
+        """
+        if layer is None:
+            self._default._pending.append(obj)
+        else:
+            self._layers[layer]._pending.append(obj)
+
+    def layer(self,name):
+        """
+        Returns the layer of the given name.
+
+        :param name: the name of the layer
+        :type name:  ``str`` in :attr:`LAYERS`
+
+        :return: the layer of the given name
+        :rtype:  :class:`GRasterLayer`
+        """
+        return self._layers[name]
+
+    def cull(self,obj):
+        """
+        Returns True if obj is entirely outside of the game window, and so is not drawn.
+
+        This works as :meth:`GView.cull` does.
+
+        :param obj: the object to check
+        :type obj:  :class:`GObject`
+        """
+        if self._culling and obj._outside((0,0,self._width,self._height)):
+            self._culled += 1
+            return True
+        return False
+
+    def clear(self):
+        """
+        Clears the objects drawn since the last call to this method.
+
+        Objects kept on a layer (see :meth:`GRasterLayer.keep`) are not cleared.
+        """
+        for layer in self._layers.values():
+            layer._pending = []
+        self._culled = 0
+
+    def commit(self):
+        """
+        Rasterizes the objects drawn since the last :meth:`clear` into ``pixels``.
+        """
+        self._buffer[:] = 1
+        self._pixels = None
+        for name in self.LAYERS:
+            layer = self._layers[name]
+            if layer._visible:
+                for obj in layer._objects():
+                    self._paint(obj,self._view)
+            else:
+                layer._pending = []
+
+    # HIDDEN METHODS
+    def _paint(self,obj,matrix):
+        """
+        Rasterizes obj, whose parent coordinates map to samples by matrix.
+        """
+        if not obj._defined:
+            return
+        if isinstance(obj,GParticleSystem):
+            self._paint_particles(obj,matrix)
+            return
+        matrix = matrix @ local_matrix(obj)
+        if isinstance(obj,GScene):
+            for child in obj._children:
+                self._paint(child,matrix)
+        elif isinstance(obj,GLabel):
+            self._paint_label(obj,matrix)
+        elif isinstance(obj,GBitmapLabel):
+            self._paint_bitmap_label(obj,matrix)
+        elif isinstance(obj,GImage) or isinstance(obj,GSprite):
+            pixels = None if obj.source is None else load_pixels(obj.source)
+            tint = _rgba(obj._fillcolor)
+            if not pixels is None:
+                box = None
+                if isinstance(obj,GSprite):
+                    box = _frame_box(pixels,obj._format,obj._frame)
+                self._image(matrix,obj.width,obj.height,pixels,box,tint)
+            if obj.linewidth > 0:
+                self._rectangle(matrix,obj.width,obj.height,None,_rgba(obj._linecolor),obj.linewidth)
+        elif isinstance(obj,GEllipse):
+            self._ellipse(matrix,obj.width,obj.height,_rgba(obj._fillcolor),
+                _rgba(obj._linecolor),obj.linewidth)
+        elif isinstance(obj,GRectangle):
+            self._rectangle(matrix,obj.width,obj.height,_rgba(obj._fillcolor),
+                _rgba(obj._linecolor),obj.linewidth)
+        elif isinstance(obj,GPolygon) or isinstance(obj,GTriangle):
+            self._paint_polygon(obj,matrix)
+        elif isinstance(obj,GPath):
+            if not obj._linecolor is None:
+                self._polyline(matrix,obj.points,False,obj.linewidth,_rgba(obj._linecolor))
+
+    def _area(self,matrix,left,bottom,right,top):
+        """
+        Returns the samples covered by a box in local coordinates, mapped back to them.
+
+        The result is (rows, cols, x, y), where rows and cols are the slices of the
+        buffer under the box, and x and y are the local coordinates of the centers of
+        those samples.  It is None if the box is off the buffer.
+        """
+        corners = matrix @ np.array([[left,right,right,left],[bottom,bottom,top,top],[1,1,1,1]])
+        (rows, cols) = self._buffer.shape[:2]
+        c0 = max(int(np.floor(corners[0].min())),0)
+        c1 = min(int(np.ceil(corners[0].max())),cols)
+        r0 = max(int(np.floor(corners[1].min())),0)
+        r1 = min(int(np.ceil(corners[1].max())),rows)
+        if c0 >= c1 or r0 >= r1:
+            return None
+        try:
+            inverse = np.linalg.inv(matrix)
+        except np.linalg.LinAlgError:
+            return None
+        px = np.arange(c0,c1)+0.5
+        py = (np.arange(r0,r1)+0.5)[:,np.newaxis]
+        x = inverse[0,0]*px+inverse[0,1]*py+inverse[0,2]
+        y = inverse[1,0]*px+inverse[1,1]*py+inverse[1,2]
+        return (slice(r0,r1),slice(c0,c1),x,y)
+
+    def _blend(self,rows,cols,color,alpha):
+        """
+        Draws color over the samples in (rows, cols), where alpha is positive.
+
+        :param color: the color of each sample, or one color for all of them
+        :type color:  float array of shape (h, w, 3) or (3,)
+
+        :param alpha: the opacity of each sample
+        :type alpha:  float array of shape (h, w)
+        """
+        target = self._buffer[rows,cols]
+        target += (color-target)*alpha[...,np.newaxis]
+
+    def _fill(self,area,mask,rgba):
+        """
+        Draws a solid color over the samples of area where mask is True.
+        """
+        (rows, cols) = area[:2]
+        self._blend(rows,cols,rgba[:3],mask*rgba[3])
+
+    def _rectangle(self,matrix,width,height,fill,line,linewidth):
+        """
+        Draws a rectangle centered at the origin, with an optional border.
+        """
+        (w, h) = (width/2.0, height/2.0)
+        if not fill is None:
+            area = self._area(matrix,-w,-h,w,h)
+            if area:
+                (x, y) = area[2:]
+                self._fill(area,(np.abs(x) <= w) & (np.abs(y) <= h),fill)
+        if not line is None and linewidth > 0:
+            lw = linewidth
+            area = self._area(matrix,-w-lw,-h-lw,w+lw,h+lw)
+            if area:
+                (x, y) = (np.abs(area[2]), np.abs(area[3]))
+                outer = (x <= w+lw) & (y <= h+lw)
+                inner = (x < w-lw) & (y < h-lw)
+                self._fill(area,outer & ~inner,line)
+
+    def _ellipse(self,matrix,width,height,fill,line,linewidth):
+        """
+        Draws an ellipse centered at the origin, with an optional border.
+        """
+        (a, b) = (width/2.0, height/2.0)
+        if a <= 0 or b <= 0:
+            return
+        if not fill is None:
+            area = self._area(matrix,-a,-b,a,b)
+            if area:
+                (x, y) = area[2:]
+                self._fill(area,(x/a)**2+(y/b)**2 <= 1,fill)
+        if not line is None and linewidth > 0:
+            lw = linewidth
+            area = self._area(matrix,-a-lw,-b-lw,a+lw,b+lw)
+            if area:
+                (x, y) = area[2:]
+                q = np.sqrt((x/a)**2+(y/b)**2)
+                # The distance from the ellipse, to first order
+                grad = np.sqrt((x/a**2)**2+(y/b**2)**2)/np.maximum(q,1e-9)
+                self._fill(area,np.abs(q-1) <= lw*grad,line)
+
+    def _image(self,matrix,width,height,pixels,box,tint):
+        """
+        Draws an image stretched over a rectangle centered at the origin.
+        """
+        (w, h) = (width/2.0, height/2.0)
+        area = self._area(matrix,-w,-h,w,h)
+        if area is None:
+            return
+        (x, y) = area[2:]
+        inside = (np.abs(x) <= w) & (np.abs(y) <= h)
+        # Only sample under the image, as a turned image covers part of its box
+        color = np.zeros(inside.shape+(4,),dtype=np.float32)
+        color[inside] = _sample(pixels,(x[inside]+w)/width,(y[inside]+h)/height,box)
+        if not tint is None:
+            color *= tint
+        self._blend(area[0],area[1],color[...,:3],color[...,3])
+
+    def _polyline(self,matrix,points,closed,width,rgba):
+        """
+        Draws the line through points, with round ends and joints, width to each side.
+        """
+        xs = points[0::2]
+        ys = points[1::2]
+        area = self._area(matrix,min(xs)-width,min(ys)-width,max(xs)+width,max(ys)+width)
+        if area is None:
+            return
+        (x, y) = area[2:]
+        mask = np.zeros(x.shape,dtype=bool)
+        count = len(xs)
+        for k in range(count if closed else count-1):
+            j = (k+1) % count
+            mask |= _segment_distance(x,y,xs[k],ys[k],xs[j],ys[j]) <= width
+        self._fill(area,mask,rgba)
+
+    def _paint_polygon(self,obj,matrix):
+        """
+        Draws a GTriangle or GPolygon, as the triangle fan of its points.
+        """
+        points = obj.points
+        xs = points[0::2]
+        ys = points[1::2]
+        fan = isinstance(obj,GPolygon)
+        if fan:
+            # The fan starts from the origin
+            box = (min(xs+(0,)),min(ys+(0,)),max(xs+(0,)),max(ys+(0,)))
+        else:
+            box = (min(xs),min(ys),max(xs),max(ys))
+        fill = _rgba(obj._fillcolor)
+        pixels = None
+        if fan and not obj.source is None:
+            pixels = load_pixels(obj.source)
+        area = self._area(matrix,*box)
+        if area and (not fill is None or not pixels is None):
+            (x, y) = area[2:]
+            if fan:
+                mask = np.zeros(x.shape,dtype=bool)
+                count = len(xs)
+                for k in range(count):
+                    j = (k+1) % count
+                    mask |= _in_triangle(x,y,(0,0),(xs[k],ys[k]),(xs[j],ys[j]))
+            else:
+                mask = _in_triangle(x,y,points[0:2],points[2:4],points[4:6])
+            if pixels is None:
+                self._fill(area,mask,fill)
+            else:
+                tw = pixels.shape[1] if obj.source_width is None else obj.source_width
+                th = pixels.shape[0] if obj.source_height is None else obj.source_height
+                color = _sample(pixels,x/tw+0.5,y/th+0.5,repeat=True)
+                if not fill is None:
+                    color = color*fill
+                self._blend(area[0],area[1],color[...,:3],color[...,3]*mask)
+        if obj.linewidth > 0 and not obj._linecolor is None:
+            self._polyline(matrix,points,True,obj.linewidth,_rgba(obj._linecolor))
+
+    def _paint_label(self,obj,matrix):
+        """
+        Draws a GLabel: its fill, then its text, then its border.
+        """
+        if obj.fillcolor:
+            self._rectangle(matrix,obj.width,obj.height,_rgba(obj._fillcolor),None,0)
+        label = obj._label
+        pixels = text_pixels(label)
+        if not pixels is None:
+            (tw, th) = (pixels.shape[1], pixels.shape[0])
+            # Where the label widget puts its texture
+            left = int(label.center_x-tw/2.0)
+            bottom = int(label.center_y-th/2.0)
+            place = matrix @ _affine(left+tw/2.0,bottom+th/2.0)
+            self._image(place,tw,th,pixels,None,np.array(label.color,dtype=np.float32))
+        if obj.linewidth > 0:
+            self._rectangle(matrix,obj.width,obj.height,None,_rgba(obj._linecolor),obj.linewidth)
+
+    def _paint_bitmap_label(self,obj,matrix):
+        """
+        Draws a GBitmapLabel: its fill, then its glyphs, one at a time.
+        """
+        if obj.fillcolor:
+            self._rectangle(matrix,obj.width,obj.height,_rgba(obj._fillcolor),None,0)
+        pixels = obj.font.pixels
+        tint = _rgba(obj._linecolor)
+        for k in range(len(obj._boxes)):
+            box = obj._boxes[k]
+            place = matrix @ _affine(obj._glyphx[k],obj._glyphy[k])
+            self._image(place,box[2],box[3],pixels,box,tint)
+
+    def _paint_particles(self,obj,matrix):
+        """
+        Draws the particles of a GParticleSystem, one at a time, oldest first.
+        """
+        count = obj._count
+        pixels = None if obj.source is None else load_pixels(obj.source)
+        if count == 0:
+            return
+        matrix = matrix @ local_matrix(obj)
+        tint = _rgba(obj._fillcolor)
+        frames = obj._format[0]*obj._format[1]
+        ages = obj._age[:count]/obj._life[:count]
+        colors = obj._color[:count].astype(np.float32)
+        if obj._fade:
+            colors[:,3] *= 1-ages
+        if not tint is None:
+            colors *= tint
+        for k in range(count):
+            size = obj._sizes[k]
+            place = matrix @ _affine(obj._pos[k,0],obj._pos[k,1],obj._angle[k])
+            if pixels is None:
+                self._rectangle(place,obj.width*size,obj.height*size,colors[k],None,0)
+            else:
+                frame = min(int(ages[k]*frames),frames-1)
+                box = _frame_box(pixels,obj._format,frame)
+                self._image(place,obj.width*size,obj.height*size,pixels,box,colors[k])
@@ -46,7 +46,7 @@ class GRectangle(GObject):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         assert value >= 0, '%s is negative' % repr(value)
         self._linewidth = value
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
     
     
@@ -71,7 +71,8 @@ class GRectangle(GObject):
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         # Always delay the call to parent class, to avoid reset
         GObject.__init__(self,**keywords)
-        self._reset()
+        # The drawing cache is built the first time the shape is drawn
+        self._cache = None
         self._defined = True
     
     
@@ -219,7 +220,7 @@ class GImage(GRectangle):
     def source(self,value):
         assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
         self._source = value
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
     
     
@@ -273,6 +274,29 @@ class GImage(GRectangle):
         self._cache.add(PopMatrix())
 
 
+# #mark -
+class _CachedLabel(Label):
+    """
+    A Kivy label whose texture comes from the label cache of :class:`GameApp`.
+    
+    Labels with the same text and options share a texture, rendered only once.
+    """
+    
+    def texture_update(self,*largs):
+        """
+        Sets the texture to that of the current text and options.
+        """
+        # Markup, shortening and empty text are left to Kivy
+        text = self._label.text
+        if self.markup or self.shorten or not text or (self.strip and not text.strip()):
+            Label.texture_update(self,*largs)
+            return
+        texture = GameApp.load_label(text,self._label.options)
+        self.texture = texture
+        self.texture_size = list(texture.size)
+        self.is_shortened = False
+
+
 # #mark -
 class GLabel(GRectangle):
     """
@@ -296,7 +320,10 @@ class GLabel(GRectangle):
     to the font by filename, including the .ttf. If you give no name, it will use the 
     default Kivy font.  The `bold` attribute only works for the default Kivy font; for 
     other fonts you will need the .ttf file for the bold version of that font.  See the
-    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example."""
+    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
+    
+    Labels with the same text, font and color share one texture, so making a new label
+    for text already on screen does not render it again (see :meth:`GameApp.load_label`)."""
     
     # MUTABLE PROPERTIES
     @property
@@ -386,7 +413,7 @@ class GLabel(GRectangle):
         assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
         self._halign = value
         self._label.halign = value
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
     
     @property
@@ -410,7 +437,7 @@ class GLabel(GRectangle):
         assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
         self._valign = value
         self._label.valign = value
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
     
     
@@ -595,12 +622,13 @@ class GLabel(GRectangle):
         self._vanchor = 'center'
         
         sanitized = {}
-        excludes  = ['linewidth','linecolor','fillcolor','halign','valign','left','bottom']
+        excludes  = ['linewidth','linecolor','fillcolor','halign','valign','left','bottom',
+                     'layer']
         for key in keywords:
             if not key in excludes:
                 sanitized[key] = keywords[key]
         
-        self._label = Label(**sanitized)
+        self._label = _CachedLabel(**sanitized)
         self._label.size_hint = (None,None)
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
@@ -631,7 +659,7 @@ class GLabel(GRectangle):
         """
         A workaround to deal with parameter requirements for callbacks
         """
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
     
     def _reset(self):
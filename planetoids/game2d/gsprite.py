@@ -49,7 +49,7 @@ class GSprite(GRectangle):
     def source(self,value):
         assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
         self._source = value
-        if self._defined:
+        if self._defined and not self._cache is None:
             self._reset()
     
     @property
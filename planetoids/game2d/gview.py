@@ -15,6 +15,8 @@ from kivy.uix.floatlayout import FloatLayout
 from kivy.metrics import dp
 
 from introcs.geom import Point2
+from bisect import bisect_left
+import operator
 
 
 class GInput(object):
@@ -311,6 +313,236 @@ class GInput(object):
 
 
 # #mark -
+def _steady(seq):
+    """
+    Returns the set of values in a longest increasing subsequence of seq.
+
+    The layers use this to find the commands that can stay where they are on the
+    canvas when the commands of a frame are reordered.
+
+    :param seq: the sequence to search
+    :type seq:  ``list`` of distinct ``int``
+
+    :return: the values of a longest increasing subsequence of seq
+    :rtype:  ``set``
+    """
+    tails = []      # The last value of the best subsequence of each length
+    ends  = []      # The position in seq of each of those values
+    links = [-1]*len(seq)
+    for pos in range(len(seq)):
+        size = bisect_left(tails,seq[pos])
+        if size:
+            links[pos] = ends[size-1]
+        if size == len(tails):
+            tails.append(seq[pos])
+            ends.append(pos)
+        else:
+            tails[size] = seq[pos]
+            ends[size] = pos
+    result = set()
+    pos = ends[-1] if ends else -1
+    while pos != -1:
+        result.add(seq[pos])
+        pos = links[pos]
+    return result
+
+
+class GLayer(object):
+    """
+    A class representing one named layer of a :class:`GView`.
+
+    Every layer has its own Kivy instruction group, and the layers are stacked in the
+    order of :attr:`GView.LAYERS`.  Objects are drawn to a layer in one of two ways.
+    A :class:`GObject` whose ``layer`` attribute names the layer goes to it whenever it
+    is drawn, as usual.  An object passed to :meth:`keep` stays on the layer, below
+    the objects drawn that frame, until it is passed to :meth:`drop`; it does not need
+    to be drawn every frame.
+
+    A layer can be hidden without touching the others, and rebuilt from scratch on its
+    own.  **You should never construct an object of this class**.  Use the layers of
+    the view, through :meth:`GView.layer`.
+    """
+
+    # MUTABLE ATTRIBUTES
+    @property
+    def visible(self):
+        """
+        Whether this layer is shown.
+
+        A hidden layer stays out of the canvas, and is not updated at the end of a
+        frame, until it is shown again.
+
+        **Invariant**: Must be a bool
+        """
+        return self._visible
+
+    @visible.setter
+    def visible(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        if value != self._visible:
+            self._visible = value
+            self._view._restack()
+
+    # IMMUTABLE ATTRIBUTES
+    @property
+    def name(self):
+        """
+        The name of this layer.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a name in :attr:`GView.LAYERS`
+        """
+        return self._name
+
+    # BUILT-IN METHODS
+    def __init__(self,name,view):
+        """
+        Creates a new, empty layer
+
+        :param name: the name of the layer
+        :type name:  ``str``
+
+        :param view: the view the layer belongs to
+        :type view:  :class:`GView`
+        """
+        self._name = name
+        self._view = view
+        self._visible = True
+        self._group = InstructionGroup()
+        self._kept = []
+        self._drawn = []
+        self._pending = []
+        # The number of commands last committed for kept objects
+        self._keptsize = 0
+        # The length of the start of this frame that matches the last one
+        self._match = 0
+
+    # PUBLIC METHODS
+    def draw(self,cmd,layer=None):
+        """
+        Draws the given Kivy graphics command to this layer for this frame.
+
+        You should never call this method. Use the `draw` method in :class:`GObject`.
+
+        :param cmd: the command to draw
+        :type cmd:  A Kivy graphics command
+
+        :param layer: ignored; the command always goes to this layer
+        :type layer:  ``str`` or ``None``
+        """
+        pos = len(self._pending)
+        if pos == self._match:
+            pos += self._keptsize
+            if pos < len(self._drawn) and self._drawn[pos] is cmd:
+                self._match += 1
+        self._pending.append(cmd)
+
+    def keep(self,obj):
+        """
+        Keeps the object on this layer until it is dropped.
+
+        Kept objects are drawn below the objects drawn each frame, in the order they
+        were kept.  Changes to a kept object show up at the end of the frame.
+
+        :param obj: the object to keep
+        :type obj:  :class:`GObject`
+        """
+        if not obj in self._kept:
+            self._kept.append(obj)
+
+    def drop(self,obj):
+        """
+        Removes an object kept by :meth:`keep` from this layer.
+
+        :param obj: the object to drop
+        :type obj:  :class:`GObject`
+        """
+        if obj in self._kept:
+            self._kept.remove(obj)
+
+    def cull(self,obj):
+        """
+        Returns True if obj is entirely outside of the view, and so is not drawn.
+
+        See :meth:`GView.cull`.
+
+        :param obj: the object to check
+        :type obj:  :class:`GObject`
+        """
+        return self._view.cull(obj)
+
+    def rebuild(self):
+        """
+        Empties the canvas of this layer, to be filled again at the end of the frame.
+
+        Only this layer is rebuilt.  This is never needed for drawing, but can be
+        used after changing Kivy instructions behind the back of the view.
+        """
+        self._group.clear()
+        self._drawn = []
+        self._keptsize = 0
+        self._match = 0
+
+    # HIDDEN METHODS
+    def _clear(self):
+        """
+        Forgets the commands drawn this frame.
+        """
+        self._pending = []
+        self._match = 0
+
+    def _commit(self):
+        """
+        Updates the canvas of this layer to show the commands of this frame.
+
+        Each :meth:`draw` checks its command against the one at the same place last
+        frame, so a frame that draws the same commands in the same order is spotted
+        without comparing the frames.  Otherwise, the commands are matched with those
+        of the last frame by identity.  The commands that are gone are removed, the new
+        ones are inserted, and of those on both frames, only the ones that moved out of
+        order are taken out and put back.  So the canvas changes made follow what
+        changed, wherever it is in the frame.  A command drawn twice is only on the
+        canvas once.
+
+        :return: the number of commands added to or removed from the canvas
+        :rtype:  ``int``
+        """
+        frame = self._pending
+        match = self._match
+        kept = []
+        if self._kept:
+            self._clear()
+            for obj in self._kept:
+                obj.draw(self)
+            kept = self._pending
+        self._clear()
+        old = self._drawn
+        if (match == len(frame) and len(kept) == self._keptsize and
+            len(kept)+len(frame) == len(old) and all(map(operator.is_,kept,old))):
+            return 0
+        new = list(dict.fromkeys(kept+frame))
+        where = {}
+        for pos in range(len(old)):
+            where[old[pos]] = pos
+        seq = [where[cmd] for cmd in new if cmd in where]
+        stay = set(seq)
+        if any(map(int.__gt__,seq,seq[1:])):
+            stay = _steady(seq)
+        changes = 0
+        for pos in range(len(old)):
+            if not pos in stay:
+                self._group.remove(old[pos])
+                changes += 1
+        for pos in range(len(new)):
+            if where.get(new[pos],-1) not in stay:
+                self._group.insert(pos,new[pos])
+                changes += 1
+        self._drawn = new
+        self._keptsize = len(kept)
+        return changes
+
+
 class GView(FloatLayout):
     """
     A class representing a drawing window for a :class:`GameApp` application.
@@ -319,11 +551,68 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    The view is retained behind the scenes.  Drawing only records what is on screen
+    this frame.  At the end of the frame (see :meth:`commit`), the view compares that
+    with the previous frame and only adds, removes or moves the commands that changed.
+    A frame that draws the same objects in the same order as the last one does not
+    touch the canvas at all, so the cost of a frame follows what changed, not what is
+    on screen.
+
+    Objects entirely outside of the window are culled: they never reach the canvas,
+    so objects off screen cost nothing to render.  See :meth:`cull`.
+
+    The view is split into the layers of :attr:`LAYERS`, drawn bottom to top.  Each
+    object goes to the layer named by its ``layer`` attribute, so the order of the
+    layers does not depend on the order of the ``draw`` calls.  See :class:`GLayer`
+    for how to keep objects on a layer, hide a layer, or rebuild it.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
     See the documentation of that class for more information.
     """
+    # The names of the layers, bottom to top
+    LAYERS = ('background','entities','effects','hud','debug')
+    # The layer of objects that do not name one
+    DEFAULT_LAYER = 'entities'
+
+    # MUTABLE ATTRIBUTES
+    @property
+    def culling(self):
+        """
+        Whether objects entirely outside of the window are left out of the canvas.
+
+        **Invariant**: Must be a bool
+        """
+        return self._culling
+
+    @culling.setter
+    def culling(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._culling = value
+
+    # IMMUTABLE ATTRIBUTES
+    @property
+    def culled(self):
+        """
+        The number of objects culled since the last :meth:`clear`.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0
+        """
+        return self._culled
+
+    @property
+    def changes(self):
+        """
+        The number of commands added to or removed from the canvas by the last commit.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0
+        """
+        return self._changes
 
     # BUILT-IN METHODS
     def __init__(self):
@@ -337,14 +626,22 @@ class GView(FloatLayout):
         """
         FloatLayout.__init__(self)
         self._frame = InstructionGroup()
+        self._layers = {}
+        for name in self.LAYERS:
+            self._layers[name] = GLayer(name,self)
+        self._default = self._layers[self.DEFAULT_LAYER]
+        self._culling = True
+        self._culled = 0
+        self._viewport = (0,0,0,0)
+        self._restack()
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
-        self._contents = set()
+        self._changes = 0
 
 
     # PUBLIC METHODS
-    def draw(self,cmd):
+    def draw(self,cmd,layer=None):
         """
         Draws the given Kivy graphics command to this view.
 
@@ -353,20 +650,75 @@ class GView(FloatLayout):
 
         :param cmd: the command to draw
         :type cmd:  A Kivy graphics command
+
+        :param layer: the name of the layer to draw to (None for :attr:`DEFAULT_LAYER`)
+        :type layer:  ``str`` or ``None``
+        """
+        if layer is None:
+            self._default.draw(cmd)
+        else:
+            self._layers[layer].draw(cmd)
+
+    def layer(self,name):
+        """
+        Returns the layer of the given name.
+
+        :param name: the name of the layer
+        :type name:  ``str`` in :attr:`LAYERS`
+
+        :return: the layer of the given name
+        :rtype:  :class:`GLayer`
+        """
+        return self._layers[name]
+
+    def cull(self,obj):
         """
-        if not cmd in self._contents:
-            self._frame.add(cmd)
-            self._contents.add(cmd)
+        Returns True if obj is entirely outside of the window, and so is not drawn.
+
+        This is checked with the bounding box of the object, cached by the object, so
+        it only costs a few comparisons.  Objects without a bounding box, such as
+        scenes and particle systems, are never culled.  Nothing is culled if the
+        attribute ``culling`` is False.
+
+        You should never call this method.  The `draw` method in :class:`GObject` calls
+        it for you.
+
+        :param obj: the object to check
+        :type obj:  :class:`GObject`
+        """
+        if self._culling and obj._outside(self._viewport):
+            self._culled += 1
+            return True
+        return False
 
     def clear(self):
         """
         Clears the contents of the view.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  The
+        canvas keeps showing the last frame until the next call to :meth:`commit`.
+        Objects kept on a layer (see :meth:`GLayer.keep`) are not cleared.
         """
-        self._frame.clear()
-        self._contents.clear()
+        for layer in self._layers.values():
+            layer._clear()
+        self._culled = 0
+
+    def commit(self):
+        """
+        Updates the canvas to show the commands drawn since the last :meth:`clear`.
+
+        This method is called for you automatically at the end of the animation frame.
+        Only the commands that were added, removed or moved since the last commit
+        change the canvas, and hidden layers are left alone.  The number of canvas
+        changes made is stored in the attribute ``changes``.
+        """
+        self._changes = 0
+        for layer in self._layers.values():
+            if layer._visible:
+                self._changes += layer._commit()
+            else:
+                layer._clear()
 
     # HIDDEN METHODS
     def _reset(self,obj=None,value=None):
@@ -376,6 +728,17 @@ class GView(FloatLayout):
         self.canvas.clear()
         self.canvas.add(Color(1,1,1))
         self.canvas.add(Rectangle(pos=self.pos,size=self.size))
+        # The window in game coordinates
+        self._viewport = (0,0,self.width/dp(1),self.height/dp(1))
         # Work-around for Retina Macs
         self.canvas.add(Scale(dp(1),dp(1),dp(1)))
         self.canvas.add(self._frame)
+
+    def _restack(self):
+        """
+        Puts the groups of the visible layers in the canvas, in order
+        """
+        self._frame.clear()
+        for name in self.LAYERS:
+            if self._layers[name]._visible:
+                self._frame.add(self._layers[name]._group)
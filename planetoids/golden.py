@@ -0,0 +1,187 @@
+"""
+Golden state-hash traces for Planetoids
+
+This module checks that changes to Wave or models.py leave the simulation unchanged.
+A golden trace is a JSON file in the Traces folder. It stores the input masks used by
+a pilot to play a wave headless, and for every frame, a short hash of each entity in
+the state returned by Wave.getState. Checking a trace replays the inputs and compares
+the hashes frame by frame, reporting the first frame and entity that diverge.
+
+Positions and velocities are quantized to 1/TRACE_QUANTUM of a pixel before they are
+hashed. That way a reordering of floating point operations does not count as a change
+in behavior, but anything a player could see does.
+
+To check every golden trace, run
+
+    python planetoids/golden.py
+
+from the root folder. Add --record to (re)record the traces for all waves in Data,
+or name the waves to record after --record.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from headless import *
+import struct
+import zlib
+import time
+import sys
+
+# The number assigned to each entity kind in the hash
+KIND_CODES = {'wave': 0, 'ship': 1, 'asteroid': 2, 'bullet': 3}
+
+# The pilots used to script the inputs of recorded traces (one trace per wave each)
+TRACE_PILOTS = ('turret', 'random')
+# The seed for the pilots of recorded traces
+TRACE_SEED   = 1110
+
+
+def hashEntity(entity):
+    """
+    Returns the 32-bit hash of one entity tuple from Wave.getState
+
+    Parameter entity: The entity to hash
+    Precondition: entity is a tuple of a kind name followed by numbers
+    """
+    values = [KIND_CODES[entity[0]]]
+    for v in entity[1:]:
+        values.append(round(v*TRACE_QUANTUM))
+    return zlib.crc32(struct.pack('<%dq' % len(values), *values))
+
+
+def hashState(wave):
+    """
+    Returns the hash string of the current state of wave.
+
+    The string has 8 hex digits for each entity in Wave.getState, in that order.
+
+    Parameter wave: The wave to hash
+    Precondition: wave is a Wave object
+    """
+    return ''.join('%08x' % hashEntity(e) for e in wave.getState())
+
+
+def entityName(state, index):
+    """
+    Returns a readable name for the entity at position index of state
+
+    Parameter state: The state from Wave.getState
+    Precondition: state is a list of entity tuples
+
+    Parameter index: The position of the entity
+    Precondition: index is an int >= 0
+    """
+    if index >= len(state):
+        return 'missing entity %d' % index
+    kind = state[index][0]
+    count = 0
+    for e in state[:index]:
+        if e[0] == kind:
+            count += 1
+    return '%s[%d] %s' % (kind, count, repr(state[index][1:]))
+
+
+def recordTrace(name, masks):
+    """
+    Returns a golden trace for the wave file name played with the given masks
+
+    Parameter name: The wave file name
+    Precondition: name is a string naming a JSON file in Data
+
+    Parameter masks: The input masks to play
+    Precondition: masks is a list of int
+    """
+    wave = Wave(loadWave(name))
+    hashes = []
+    run(wave, ReplayPilot(masks), len(masks),
+        observer=lambda w, frame: hashes.append(hashState(w)))
+    return {'wave': name, 'inputs': ''.join('%x' % m for m in masks[:len(hashes)]),
+        'hashes': hashes}
+
+
+def checkTrace(trace):
+    """
+    Returns None if trace still matches the simulation, or a message otherwise.
+
+    The message names the first divergent frame and entity.
+
+    Parameter trace: The golden trace
+    Precondition: trace is a dictionary returned by recordTrace
+    """
+    wave = Wave(loadWave(trace['wave']))
+    masks = [int(c, 16) for c in trace['inputs']]
+    hashes = trace['hashes']
+    for frame in range(len(hashes)):
+        if wave.endCheck():
+            return 'frame %d: wave ended early' % frame
+        step(wave, masks[frame])
+        actual = hashState(wave)
+        if actual != hashes[frame]:
+            expect = hashes[frame]
+            index = 0
+            while actual[index*8:index*8+8] == expect[index*8:index*8+8]:
+                index += 1
+            name = entityName(wave.getState(), index)
+            if len(actual) != len(expect):
+                name += ' (%d entities, expected %d)' % (len(actual)//8, len(expect)//8)
+            return 'frame %d: %s' % (frame, name)
+    return None
+
+
+def tracePath(name, pilot):
+    """
+    Returns the path of the golden trace for the wave file name and pilot name
+    """
+    folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), TRACE_FOLDER)
+    return os.path.join(folder, name[:-5]+'-'+pilot+'.json')
+
+
+def record(names):
+    """
+    Records and saves the golden traces for the given wave file names
+    """
+    for name in names:
+        for pilot in TRACE_PILOTS:
+            masks = run(Wave(loadWave(name)), PILOTS[pilot](), TRACE_FRAMES, TRACE_SEED)
+            trace = recordTrace(name, masks)
+            path = tracePath(name, pilot)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(trace, f, indent=0)
+            print('%s: recorded %d frames' % (os.path.basename(path), len(trace['hashes'])))
+
+
+def check(names):
+    """
+    Returns True if the golden traces for the given wave file names all match.
+
+    This prints the result for each trace, along with the replay speed.
+    """
+    passed = True
+    for name in names:
+        for pilot in TRACE_PILOTS:
+            path = tracePath(name, pilot)
+            if not os.path.exists(path):
+                print('%s: no golden trace' % os.path.basename(path))
+                passed = False
+                continue
+            with open(path) as f:
+                trace = json.load(f)
+            start = time.perf_counter()
+            result = checkTrace(trace)
+            fps = len(trace['hashes'])/max(time.perf_counter()-start, 1e-9)
+            if result is None:
+                print('%s: ok (%d frames, %.0f fps)' % (os.path.basename(path),
+                    len(trace['hashes']), fps))
+            else:
+                print('%s: DIVERGED at %s' % (os.path.basename(path), result))
+                passed = False
+    return passed
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['--record']:
+        record(args[1:] or waveNames())
+    else:
+        sys.exit(0 if check(args or waveNames()) else 1)
@@ -0,0 +1,204 @@
+"""
+Headless simulation module for Planetoids
+
+This module lets us run a wave without the Kivy game loop. Instead of a GInput
+attached to the keyboard, a wave is driven by input masks: ints whose bits say which
+of the keys in INPUT_KEYS are held down that frame. Nothing is drawn, so a wave can
+be stepped thousands of times a second. The command line tools (such as golden.py)
+are built on top of this module. The input masks themselves, and step, are in the
+inputs module, which the game uses as well.
+
+Input masks come from pilots. A pilot is a callable object pilot(wave, frame, rng)
+that returns the mask for the given frame. The rng is a random.Random owned by the run,
+so a pilot that needs randomness must use it (and not the random module) for the
+run to be reproducible from its seed.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+import os
+# Headless tools have their own options; keep Kivy from parsing the command line
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from consts import *
+from game2d import *
+from wave import *
+from inputs import *
+import json
+import random
+import time
+
+
+def bootstrap():
+    """
+    Points GameApp at the resource folders of this game.
+
+    GameApp normally does this when the application is constructed. Headless runs
+    never construct a GameApp, so this must be called before any wave is created.
+    It is safe to call this more than once.
+    """
+    path = os.path.dirname(os.path.abspath(__file__))
+    GameApp.json   = os.path.join(path, 'Data')
+    GameApp.fonts  = os.path.join(path, 'Fonts')
+    GameApp.sounds = os.path.join(path, 'Sounds')
+    GameApp.images = os.path.join(path, 'Images')
+
+    import kivy.resources
+    kivy.resources.resource_add_path(GameApp.fonts)
+    kivy.resources.resource_add_path(GameApp.images)
+
+
+def waveNames():
+    """
+    Returns the sorted list of wave files in the Data folder
+    """
+    bootstrap()
+    return sorted(f for f in os.listdir(GameApp.json) if f.lower().endswith('.json'))
+
+
+def loadWave(name):
+    """
+    Returns the JSON dictionary for the wave file name in the Data folder
+
+    Parameter name: The wave file name
+    Precondition: name is a string naming a JSON file in Data
+    """
+    bootstrap()
+    with open(os.path.join(GameApp.json, name)) as f:
+        return json.load(f)
+
+
+class InputRecorder(object):
+    """
+    A wrapper around a GInput that records the input mask of every frame.
+
+    Pass the recorder to Wave.update in place of the real input and call endFrame
+    once per frame. The recorded masks can be replayed with ReplayPilot.
+    """
+    # Attribute _input: the wrapped input
+    # Invariant: _input has a method is_key_down
+    #
+    # Attribute _mask: the keys seen held down in the current frame
+    # Invariant: _mask is an int >= 0
+    #
+    # Attribute masks: the masks of all finished frames
+    # Invariant: masks is a list of int
+
+    def __init__(self, input):
+        self._input = input
+        self._mask = 0
+        self.masks = []
+
+    def is_key_down(self, key):
+        """
+        Returns True if key is held down, recording it if it is an input key
+        """
+        down = self._input.is_key_down(key)
+        if down and key in INPUT_KEYS:
+            self._mask |= 1 << INPUT_KEYS.index(key)
+        return down
+
+    def endFrame(self):
+        """
+        Finishes the current frame, storing its mask
+        """
+        self.masks.append(self._mask)
+        self._mask = 0
+
+
+def run(wave, pilot, frames, seed=0, observer=None, costs=None):
+    """
+    Returns the list of input masks used to play wave for up to frames frames.
+
+    The run stops early once the wave is complete (won or lost). If observer is
+    not None, it is called as observer(wave, frame) after every frame. If costs is
+    not None, the time in seconds taken to step each frame is appended to it.
+
+    Parameter wave: The wave to play
+    Precondition: wave is a Wave object
+
+    Parameter pilot: The pilot that chooses the inputs
+    Precondition: pilot is a callable pilot(wave, frame, rng) returning a mask
+
+    Parameter frames: The maximum number of frames to play
+    Precondition: frames is an int >= 0
+
+    Parameter seed: The seed for the pilot random number generator
+    Precondition: seed is an int
+
+    Parameter observer: The per-frame callback
+    Precondition: observer is None or a function observer(wave, frame)
+
+    Parameter costs: The list to record step times in
+    Precondition: costs is None or a list
+    """
+    rng = random.Random(seed)
+    masks = []
+    for frame in range(frames):
+        if wave.endCheck():
+            break
+        mask = pilot(wave, frame, rng)
+        if costs is None:
+            step(wave, mask)
+        else:
+            start = time.perf_counter()
+            step(wave, mask)
+            costs.append(time.perf_counter()-start)
+        masks.append(mask)
+        if not observer is None:
+            observer(wave, frame)
+    return masks
+
+
+### PILOTS ###
+
+class IdlePilot(object):
+    """
+    A pilot that never touches the controls
+    """
+
+    def __call__(self, wave, frame, rng):
+        return 0
+
+
+class TurretPilot(object):
+    """
+    A pilot that spins in place, firing whenever it can
+    """
+
+    def __call__(self, wave, frame, rng):
+        return toMask(('left', 'spacebar'))
+
+
+class RandomPilot(object):
+    """
+    A pilot that holds a random combination of keys for a random number of frames
+    """
+    # Attribute _held: the mask currently held down
+    # Invariant: _held is an int in 0..2**len(INPUT_KEYS)-1
+
+    def __init__(self):
+        self._held = 0
+
+    def __call__(self, wave, frame, rng):
+        if frame == 0 or rng.random() < 1/15:
+            self._held = rng.randrange(1 << len(INPUT_KEYS))
+        return self._held
+
+
+class ReplayPilot(object):
+    """
+    A pilot that replays a list of recorded masks, then idles
+    """
+    # Attribute _masks: the recorded input masks
+    # Invariant: _masks is a sequence of int
+
+    def __init__(self, masks):
+        self._masks = masks
+
+    def __call__(self, wave, frame, rng):
+        return self._masks[frame] if frame < len(self._masks) else 0
+
+
+# The pilot classes available by name to the command line tools
+PILOTS = {'idle': IdlePilot, 'turret': TurretPilot, 'random': RandomPilot}
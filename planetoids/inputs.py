@@ -0,0 +1,92 @@
+"""
+Input masks for Planetoids
+
+An input mask is an int whose bits say which of the keys in INPUT_KEYS are held
+down in a frame. Masks are what the headless tools, the rewind history and the
+versus link record and replay, since the mask of a frame is all it takes to step a
+wave (which is deterministic) from that frame to the next. This module turns held
+keys into masks and back, for the game as well as for the tools.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from consts import *
+
+
+def toMask(keys):
+    """
+    Returns the input mask for the given collection of key names
+
+    Parameter keys: The keys held down
+    Precondition: keys is a collection of strings
+    """
+    mask = 0
+    for bit in range(len(INPUT_KEYS)):
+        if INPUT_KEYS[bit] in keys:
+            mask |= 1 << bit
+    return mask
+
+
+def readMask(input):
+    """
+    Returns the input mask of the keys held down in input
+
+    Parameter input: The input to read
+    Precondition: input has a method is_key_down, such as a GInput
+    """
+    return toMask([k for k in INPUT_KEYS if input.is_key_down(k)])
+
+
+class KeyInput(object):
+    """
+    A stand-in for GInput that reports a fixed set of held keys.
+
+    Wave.update only ever calls is_key_down on its input, so this is all that a
+    headless run needs. Use forMask to get the shared instance for a mask rather
+    than constructing a new one every frame.
+    """
+    # Attribute _keys: the names of the keys held down
+    # Invariant: _keys is a frozenset of strings in INPUT_KEYS
+
+    # Class attribute caching one instance per mask
+    _INSTANCES = {}
+
+    @classmethod
+    def forMask(cls, mask):
+        """
+        Returns the shared KeyInput for the input mask
+
+        Parameter mask: The input mask
+        Precondition: mask is an int in 0..2**len(INPUT_KEYS)-1
+        """
+        if not mask in cls._INSTANCES:
+            cls._INSTANCES[mask] = cls(mask)
+        return cls._INSTANCES[mask]
+
+    def __init__(self, mask):
+        self._keys = frozenset(INPUT_KEYS[bit] for bit in range(len(INPUT_KEYS))
+            if mask & (1 << bit))
+
+    def is_key_down(self, key):
+        """
+        Returns True if key is held down in this input
+        """
+        return key in self._keys
+
+
+def step(wave, mask):
+    """
+    Advances the wave a single frame with the given input mask.
+
+    If the ship was destroyed and lives remain, the ship is restored first. This is
+    what Planetoids does in STATE_CONTINUE, without waiting for a key press.
+
+    Parameter wave: The wave to advance
+    Precondition: wave is a Wave object
+
+    Parameter mask: The input mask for this frame
+    Precondition: mask is an int in 0..2**len(INPUT_KEYS)-1
+    """
+    if wave.pauseCheck() and wave.getLives() > 0:
+        wave.resetShip()
+    wave.update(KeyInput.forMask(mask))
@@ -0,0 +1,176 @@
+"""
+Collision layers for Planetoids
+
+Every entity is on one collision layer, a single bit, and every layer has a mask of
+the layers it collides with. Both are declared in consts.py (LAYER_MASKS and
+KIND_LAYERS), and Wave.collide uses them to skip tests that cannot hit. This module
+does the same for the array-based fields, where many kinds share one array.
+
+contacts finds the touching pairs among a set of entities. It only asks the grid
+for candidates on the layer pairs that collide, so adding a layer (say pickups,
+which only touch the ship) adds no work for the pairs that ignore it. It also
+reports the candidates and hits of each layer pair, for tuning the masks and the
+grid.
+
+To compare candidate counts with testing every layer against every other, run
+
+    python planetoids/layers.py
+
+from the root folder.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from consts import *
+from field import gridPairs, FIELD_CELL
+import numpy as np
+import time
+
+# The name of each layer bit, for reports
+LAYER_NAMES = {LAYER_SHIP: 'ship', LAYER_BULLET: 'bullet', LAYER_ASTEROID: 'asteroid',
+    LAYER_PICKUP: 'pickup', LAYER_ENEMY: 'enemy', LAYER_ENEMY_BULLET: 'enemy bullet'}
+
+
+def collides(first, second):
+    """
+    Returns True if the layers first and second collide
+
+    Parameter first, second: The layers
+    Precondition: first and second are layer bits in LAYER_MASKS
+    """
+    return bool(LAYER_MASKS[first] & second)
+
+
+def layerPairs():
+    """
+    Returns the list of the layer pairs (first, second) that collide, first <= second.
+
+    This raises a ValueError if LAYER_MASKS disagrees with itself, that is if a
+    layer collides with another that does not collide with it.
+    """
+    result = []
+    for first in sorted(LAYER_MASKS):
+        for second in sorted(LAYER_MASKS):
+            if collides(first, second) != collides(second, first):
+                raise ValueError('the masks of %s and %s disagree' %
+                    (LAYER_NAMES[first], LAYER_NAMES[second]))
+            if first <= second and collides(first, second):
+                result.append((first, second))
+    return result
+
+
+def kindLayers(kinds):
+    """
+    Returns the int64 array of the layers of entities of the given kind names
+
+    Parameter kinds: The kinds, as named by Wave.getEntities
+    Precondition: kinds is a sequence of keys of KIND_LAYERS
+    """
+    return np.array([KIND_LAYERS[k] for k in kinds], dtype=np.int64)
+
+
+def contacts(x, y, radius, layers, cell=FIELD_CELL, counts=None):
+    """
+    Returns the pairs (i, j) of entities on colliding layers that touch.
+
+    Each pair comes once, with i on the lower layer bit (or i < j on the same
+    layer). The result is two int64 arrays of the same length.
+
+    Parameter x, y, radius: The entity positions and radii
+    Precondition: x, y and radius are float arrays of the same length, and no two
+    radii add up to more than cell
+
+    Parameter layers: The layer of each entity
+    Precondition: layers is an int array of layer bits in LAYER_MASKS
+
+    Parameter cell: The size of a broad-phase grid cell
+    Precondition: cell is a number > 0
+
+    Parameter counts: Where to add the candidates and hits of each layer pair
+    Precondition: counts is None or a dict from layer pairs to [candidates, hits]
+    """
+    firsts = []
+    seconds = []
+    members = {}
+    for layer in np.unique(layers):
+        members[int(layer)] = np.flatnonzero(layers == layer)
+    for (first, second) in layerPairs():
+        if not first in members or not second in members:
+            continue
+        a = members[first]
+        b = members[second]
+        i, j = gridPairs(x[a], y[a], x[b], y[b], cell)
+        i = a[i]
+        j = b[j]
+        if first == second:
+            keep = i < j
+            i, j = i[keep], j[keep]
+        dx = x[i]-x[j]
+        dy = y[i]-y[j]
+        reach = radius[i]+radius[j]
+        hit = dx*dx+dy*dy < reach*reach
+        if not counts is None:
+            total = counts.setdefault((first, second), [0, 0])
+            total[0] += len(i)
+            total[1] += int(hit.sum())
+        firsts.append(i[hit])
+        seconds.append(j[hit])
+    if not firsts:
+        empty = np.zeros(0, dtype=np.int64)
+        return (empty, empty)
+    return (np.concatenate(firsts), np.concatenate(seconds))
+
+
+def report(counts):
+    """
+    Prints the candidates and hits of each layer pair in counts, most candidates first
+    """
+    for (pair, (candidates, hits)) in sorted(counts.items(), key=lambda c: -c[1][0]):
+        print('  %-12s x %-12s %9d candidates %7d hits' % (LAYER_NAMES[pair[0]],
+            LAYER_NAMES[pair[1]], candidates, hits))
+
+
+def bench(count, repeats=5, seed=0):
+    """
+    Prints the broad-phase cost of count entities spread over all layers, with the
+    layer masks and with every layer colliding with every other
+    """
+    rng = np.random.default_rng(seed)
+    scale = np.sqrt(count/PARTITION_DENSITY)
+    # A mix of what a busy wave with enemies and pickups might hold
+    mix = {LAYER_SHIP: 0.002, LAYER_BULLET: 0.25, LAYER_ASTEROID: 0.35,
+        LAYER_PICKUP: 0.05, LAYER_ENEMY: 0.05, LAYER_ENEMY_BULLET: 0.298}
+    sizes = {LAYER_SHIP: SHIP_RADIUS, LAYER_BULLET: BULLET_RADIUS,
+        LAYER_ASTEROID: MEDIUM_RADIUS, LAYER_PICKUP: BULLET_RADIUS*2,
+        LAYER_ENEMY: SHIP_RADIUS, LAYER_ENEMY_BULLET: BULLET_RADIUS}
+    layers = rng.choice(list(mix), count, p=list(mix.values()))
+    radius = np.array([sizes[l] for l in layers], dtype=float)
+    x = rng.uniform(0, GAME_WIDTH*scale, count)
+    y = rng.uniform(0, GAME_HEIGHT*scale, count)
+
+    layered = flat = np.inf
+    for _ in range(repeats):
+        counts = {}
+        start = time.perf_counter()
+        i, j = contacts(x, y, radius, layers, counts=counts)
+        layered = min(layered, time.perf_counter()-start)
+
+        start = time.perf_counter()
+        a, b = gridPairs(x, y, x, y, FIELD_CELL)
+        keep = a < b
+        dx = x[a[keep]]-x[b[keep]]
+        dy = y[a[keep]]-y[b[keep]]
+        reach = radius[a[keep]]+radius[b[keep]]
+        touching = (dx*dx+dy*dy < reach*reach).sum()
+        flat = min(flat, time.perf_counter()-start)
+
+    print('%d entities: %d candidates, %d contacts in %.1f ms with layers; '
+        '%d candidates, %d contacts in %.1f ms testing every layer' % (count,
+        sum(c[0] for c in counts.values()), len(i), 1000*layered, keep.sum(),
+        touching, 1000*flat))
+    report(counts)
+
+
+if __name__ == '__main__':
+    for count in (1000, 100000):
+        bench(count)
@@ -37,7 +37,32 @@ def degToRad(deg):
     return math.pi*deg/180
 
 
-class Bullet(GEllipse):
+class Entity(object):
+    """
+    A mixin for the models that Wave keeps track of by id number.
+    
+    Wave gives every ship, asteroid and bullet a unique id when it is created, so
+    that code outside of the wave (such as the state sync protocol) can tell which
+    entity is which from one frame to the next. Copies keep the id of the original.
+    """
+    #Attribute _ident: the id number of this entity
+    #Invariant: _ident is an int >= 0, or None if Wave has not assigned one yet
+    _ident = None
+    
+    def getIdent(self):
+        """ 
+        returns the id number of the entity
+        """
+        return self._ident
+    
+    def setIdent(self, ident):
+        """ 
+        sets the id number of the entity, which must be unique in its Wave
+        """
+        self._ident = ident
+
+
+class Bullet(Entity, GEllipse):
     """
     A class representing a bullet from the ship
     
@@ -68,6 +93,34 @@ class Bullet(GEllipse):
         if self.x > GAME_WIDTH + DEAD_ZONE or self.y > GAME_HEIGHT + DEAD_ZONE:
             return True
         return False
+
+    def getLifetime(self):
+        """
+        Returns: the number of moves after which the bullet has gone too far (see
+        isOut), or None if it never will
+        """
+        vx = self._velocity.x
+        vy = self._velocity.y
+        # Only moving right or up ever takes a bullet too far
+        moves = []
+        if vx > 0:
+            moves.append((GAME_WIDTH + DEAD_ZONE - self.x)/vx)
+        if vy > 0:
+            moves.append((GAME_HEIGHT + DEAD_ZONE - self.y)/vy)
+        if not moves:
+            return None
+        guess = max(int(min(moves)), 0)
+        if guess > 1024:
+            return guess+1
+        # Replay the moves, as rounding can put the bullet out a move early or late
+        x = self.x
+        y = self.y
+        count = 0
+        while not (x > GAME_WIDTH + DEAD_ZONE or y > GAME_HEIGHT + DEAD_ZONE):
+            x = vx + x
+            y = vy + y
+            count += 1
+        return count
     
     def getVelocity(self):
         """ 
@@ -94,7 +147,7 @@ class Bullet(GEllipse):
         self.y = self._velocity.y +self.y
 
 
-class Ship(GImage):
+class Ship(Entity, GImage):
     """
     A class to represent the game ship.
     
@@ -145,6 +198,16 @@ class Ship(GImage):
         self._velocity = Vector(0,0)
         rad = degToRad(self.angle)
         self._facing = Vector(math.cos(rad), math.sin(rad))
+
+    def copy(self):
+        """ 
+        Returns a copy of the Ship with its own velocity and facing.
+        The copy only builds its image when it is first drawn.
+        """
+        copy = super().copy()
+        copy._velocity = self._velocity.copy()
+        copy._facing = self._facing.copy()
+        return copy
     
     def addAngle(self, angle):
         """ 
@@ -180,7 +243,7 @@ class Ship(GImage):
             self.y = -abs(DEAD_ZONE)
 
 
-class Asteroid(GImage):
+class Asteroid(Entity, GImage):
     """
     A class to represent a single asteroid.
     
@@ -207,6 +270,9 @@ class Asteroid(GImage):
 
     #Attribute _velocity: stores the velocity vector of the asteroid
     #Invariant: Must be a Vector object
+
+    #Attribute _explosive: whether the asteroid blasts its surroundings when destroyed
+    #Invariant: _explosive is a bool
     
     def getSize(self):
         """ 
@@ -220,6 +286,28 @@ class Asteroid(GImage):
         """
         return self.width/2
 
+    def isExplosive(self):
+        """ 
+        returns True if the Asteroid explodes when it is destroyed
+        """
+        return self._explosive
+
+    def copyAt(self, position, direction):
+        """ 
+        returns a copy of the Asteroid at position, heading in direction at the
+        speed of its size. This is much cheaper than creating a new Asteroid
+        from JSON data, so Wave uses it to add many pieces at once.
+        """
+        copy = self.copy()
+        copy.x = position[0]
+        copy.y = position[1]
+        temp = Vector2(direction[0], direction[1])
+        try:
+            copy._velocity = temp.normal() * self._velocity.length()
+        except:
+            copy._velocity = temp * 0
+        return copy
+
     def getVelocity(self):
         """ 
         returns the velocity of the Asteroid
@@ -256,6 +344,9 @@ class Asteroid(GImage):
                 self._velocity = temp.normal() * LARGE_SPEED
             except:
                 self._velocity = temp * 0
+        self._explosive = data.get("explosive", False)
+        if self._explosive:
+            self.fillcolor = EXPLOSIVE_COLOR
 
     def move(self): 
         """ 
@@ -0,0 +1,427 @@
+"""
+Nearest-asteroid queries for Planetoids
+
+Homing missiles and aim assist need the asteroids nearest to many points every
+frame. Scanning all asteroids for each point costs queries times asteroids. An
+AsteroidIndex buckets the asteroids into a grid instead, and answers a whole batch of
+queries at once by looking only at the grid cells around each point:
+
+    nearest(qx, qy, k)      the k nearest asteroids of each point
+    within(qx, qy, radius)  every (point, asteroid) pair closer than radius
+    cone(qx, qy, angle, spread, reach)
+                            the nearest asteroid of each point inside its cone
+
+Asteroids wrap around the dead zone, so the world is a torus of size
+(GAME_WIDTH+2*DEAD_ZONE, GAME_HEIGHT+2*DEAD_ZONE), and the asteroid just past the
+left edge is close to a point near the right edge. Distances are measured the short
+way round. (Large asteroids wrap a little further out, which this ignores.)
+
+The index is rebuilt by update every frame, from the positions alone. Since
+asteroids move much less than a cell per frame, the previous cell order is almost
+right, and update re-sorts from it rather than from scratch. Unless a cell size is
+given, update sizes the cells for about NEAREST_PER_CELL asteroids each, so a query
+looks at a handful of asteroids however crowded the field is. With only a few
+asteroids, walking the rings of the grid costs more than measuring every pair, so
+an index of at most NEAREST_SCAN asteroids answers nearest and cone by measuring them
+all at once.
+
+To compare with a linear scan, run
+
+    python planetoids/nearest.py
+
+from the root folder.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from consts import *
+from field import *
+import time
+
+
+def wrapDelta(d, period):
+    """
+    Returns the differences d wrapped into [-period/2, period/2)
+    """
+    return (d+period/2) % period-period/2
+
+
+class AsteroidIndex(object):
+    """
+    A uniform grid over the wrapped world, holding the positions of the asteroids.
+
+    Queries return asteroid indices, positions in the arrays given to update. The
+    grid has a whole number of cells along each side of the torus, so cells line
+    up across the wrap.
+    """
+    # Attribute _period: the size (width, height) of the wrapped world
+    # Invariant: _period is a pair of numbers > 0
+    #
+    # Attribute _cell: the largest size of a grid cell
+    # Invariant: _cell is a number > 0, or None to size cells by the asteroid count
+    #
+    # Attribute _cells: the number of grid cells (across, down)
+    # Invariant: _cells is a pair of ints > 0
+    #
+    # Attribute _size: the size (width, height) of a grid cell
+    # Invariant: _size is _period divided by _cells
+    #
+    # Attribute _x, _y: the asteroid positions, wrapped into the world
+    # Invariant: _x and _y are float arrays of the same length n
+    #
+    # Attribute _order: the asteroid indices sorted by grid cell
+    # Invariant: _order is an int64 permutation of range(n)
+    #
+    # Attribute _starts: where the run of each cell begins in _order
+    # Invariant: _starts is an int64 array of length cells+1, the last entry n
+
+    def __init__(self, width=GAME_WIDTH, height=GAME_HEIGHT, cell=None):
+        """
+        Creates an empty index
+
+        Parameter width, height: The size of the window; the world adds the dead zone
+        Precondition: width and height are numbers > 0
+
+        Parameter cell: The largest size of a grid cell
+        Precondition: cell is a number > 0, or None to size cells on every update
+        """
+        self._period = (width+2*DEAD_ZONE, height+2*DEAD_ZONE)
+        self._cell = cell
+        self._x = np.zeros(0)
+        self._y = np.zeros(0)
+        self._order = np.zeros(0, dtype=np.int64)
+        self._resize(FIELD_CELL if cell is None else cell)
+
+    @classmethod
+    def fromWave(cls, wave):
+        """
+        Returns the index of the asteroids of wave, with the list of their ids
+        """
+        entities = [e for e in wave.getEntities() if not e[1] in ('ship', 'bullet')]
+        index = cls()
+        index.update(np.array([e[2] for e in entities]),
+            np.array([e[3] for e in entities]))
+        return (index, [e[0] for e in entities])
+
+    @classmethod
+    def fromField(cls, field):
+        """
+        Returns the index of the asteroids of field, with the array of their rows
+        """
+        width, height = field.getSize()
+        rows = field.getRows()
+        asteroids = np.flatnonzero(rows[:, KIND] >= SMALL)
+        index = cls(width, height)
+        index.update(rows[asteroids, X], rows[asteroids, Y])
+        return (index, asteroids)
+
+    def __len__(self):
+        return len(self._x)
+
+    def update(self, x, y):
+        """
+        Rebuilds the index for the asteroids at (x, y)
+
+        Parameter x, y: The asteroid positions
+        Precondition: x and y are float arrays of the same length
+        """
+        # Shift by the dead zone so that the world runs from 0 to the period
+        self._x = (np.asarray(x, dtype=float)+DEAD_ZONE) % self._period[0]
+        self._y = (np.asarray(y, dtype=float)+DEAD_ZONE) % self._period[1]
+        if self._cell is None:
+            area = self._period[0]*self._period[1]
+            cell = np.sqrt(area*NEAREST_PER_CELL/max(len(self._x), 1))
+            if self._cells != tuple(max(1, int(np.ceil(p/cell))) for p in self._period):
+                self._resize(cell)
+        keys = self._cellOf(self._x, self._y)
+        if len(self._order) == len(keys):
+            # Nearly sorted already, which the stable sort handles in close to O(n)
+            self._order = self._order[np.argsort(keys[self._order], kind='stable')]
+        else:
+            self._order = np.argsort(keys, kind='stable')
+        counts = np.bincount(keys, minlength=self._cells[0]*self._cells[1])
+        self._starts[0] = 0
+        np.cumsum(counts, out=self._starts[1:])
+
+    def nearest(self, qx, qy, k=1, reach=np.inf):
+        """
+        Returns the arrays (index, distance) of the k nearest asteroids of each query.
+
+        Both arrays have shape (len(qx), k), nearest first. Where a query has fewer
+        than k asteroids within reach, the missing entries are -1 and inf.
+
+        Parameter qx, qy: The query points, in window coordinates
+        Precondition: qx and qy are float arrays of the same length
+
+        Parameter k: The number of asteroids per query
+        Precondition: k is an int > 0
+
+        Parameter reach: The furthest an asteroid may be
+        Precondition: reach is a number > 0
+        """
+        return self._search(qx, qy, k, reach)
+
+    def within(self, qx, qy, radius):
+        """
+        Returns the arrays (query, index, distance) of every pair closer than radius
+
+        Parameter qx, qy: The query points, in window coordinates
+        Precondition: qx and qy are float arrays of the same length
+
+        Parameter radius: The search radius
+        Precondition: radius is a number > 0
+        """
+        qx, qy = self._shift(qx, qy)
+        rings = int(np.ceil(radius/min(self._size)))
+        offsets = [o for r in range(rings+1) for o in self._ring(r)]
+        q, j, dx, dy, d = self._candidates(qx, qy, np.arange(len(qx)), offsets)
+        keep = d < radius
+        return (q[keep], j[keep], d[keep])
+
+    def cone(self, qx, qy, angle, spread, reach):
+        """
+        Returns the arrays (index, distance) of the nearest asteroid in each cone.
+
+        The cone of a query opens from the point along angle, spread degrees to
+        either side, out to reach. Where a cone is empty the entries are -1 and inf.
+
+        Parameter qx, qy: The query points, in window coordinates
+        Precondition: qx and qy are float arrays of the same length
+
+        Parameter angle: The direction of each cone, in degrees as Ship.angle
+        Precondition: angle is a float array (or number) of the same length as qx
+
+        Parameter spread: The half-angle of the cones in degrees
+        Precondition: spread is a number in 0..180
+
+        Parameter reach: The length of the cones
+        Precondition: reach is a number > 0
+        """
+        rad = np.radians(np.broadcast_to(angle, np.shape(qx)))
+        ux, uy = np.cos(rad), np.sin(rad)
+        limit = np.cos(np.radians(spread))
+        def inside(q, dx, dy, d):
+            return dx*ux[q]+dy*uy[q] >= d*limit
+        index, distance = self._search(qx, qy, 1, reach, inside)
+        return (index[:, 0], distance[:, 0])
+
+    def _search(self, qx, qy, k, reach, accept=None):
+        """
+        Returns the arrays (index, distance) of the k nearest accepted asteroids.
+
+        The search looks at the cells ring by ring outwards from each query, and
+        drops a query as soon as no further ring can hold a nearer asteroid.
+
+        Parameter accept: A filter of candidates
+        Precondition: accept is None or a function accept(q, dx, dy, d) of the
+        query numbers, offsets and distances of candidates returning a bool array
+        (the arrays may be two-dimensional, as the linear scan passes them)
+        """
+        qx, qy = self._shift(qx, qy)
+        index = np.full((len(qx), k), -1, dtype=np.int64)
+        distance = np.full((len(qx), k), np.inf)
+        if len(self._x) and len(self._x) <= NEAREST_SCAN:
+            for active in self._batches(len(qx)):
+                q, dx, dy, d = self._every(qx, qy, active)
+                keep = d <= reach
+                if not accept is None:
+                    keep &= accept(q, dx, dy, d)
+                d = np.where(keep, d, np.inf)
+                best = np.argsort(d, axis=1, kind='stable') if k >= d.shape[1] else \
+                    np.argpartition(d, k-1, axis=1)[:, :k]
+                gaps = np.take_along_axis(d, best, axis=1)
+                order = np.argsort(gaps, axis=1, kind='stable')[:, :k]
+                best = np.take_along_axis(best, order, axis=1)
+                gaps = np.take_along_axis(gaps, order, axis=1)
+                found = np.isfinite(gaps)
+                width = best.shape[1]
+                index[active, :width] = np.where(found, best, -1)
+                distance[active, :width] = gaps
+            return (index, distance)
+        active = np.arange(len(qx))
+        cell = min(self._size)
+        ring = 0
+        while len(active) and len(self._x):
+            offsets = self._ring(ring)
+            if not offsets or (ring-1)*cell > reach:
+                break
+            q, j, dx, dy, d = self._candidates(qx, qy, active, offsets)
+            keep = d <= reach
+            if not accept is None:
+                keep &= accept(q, dx, dy, d)
+            self._merge(index, distance, q[keep], j[keep], d[keep])
+            # Anything in a further ring is at least ring cells away
+            active = active[distance[active, -1] > ring*cell]
+            ring += 1
+        return (index, distance)
+
+    def _shift(self, qx, qy):
+        """
+        Returns the query points moved into the world coordinates of the index
+        """
+        return ((np.asarray(qx, dtype=float)+DEAD_ZONE) % self._period[0],
+            (np.asarray(qy, dtype=float)+DEAD_ZONE) % self._period[1])
+
+    def _resize(self, cell):
+        """
+        Lays out the grid with cells no larger than cell
+        """
+        self._cells = tuple(max(1, int(np.ceil(p/cell))) for p in self._period)
+        self._size = (self._period[0]/self._cells[0], self._period[1]/self._cells[1])
+        self._starts = np.zeros(self._cells[0]*self._cells[1]+1, dtype=np.int64)
+
+    def _cellOf(self, x, y):
+        """
+        Returns the cell number of each of the world points (x, y)
+        """
+        cx = np.minimum((x/self._size[0]).astype(np.int64), self._cells[0]-1)
+        cy = np.minimum((y/self._size[1]).astype(np.int64), self._cells[1]-1)
+        return cy*self._cells[0]+cx
+
+    def _ring(self, ring):
+        """
+        Returns the list of cell offsets (dx, dy) exactly ring cells away.
+
+        Offsets are kept to one lap of the torus, so no cell is visited twice.
+        """
+        (across, down) = self._cells
+        left, right = -((across-1)//2), across//2
+        bottom, top = -((down-1)//2), down//2
+        result = []
+        for dx in range(max(left, -ring), min(right, ring)+1):
+            for dy in range(max(bottom, -ring), min(top, ring)+1):
+                if max(abs(dx), abs(dy)) == ring:
+                    result.append((dx, dy))
+        return result
+
+    def _candidates(self, qx, qy, active, offsets):
+        """
+        Returns the arrays (query, index, dx, dy, distance) of the asteroids in the
+        cells at offsets from the cells of the active queries
+        """
+        (across, down) = self._cells
+        cx = np.minimum((qx[active]/self._size[0]).astype(np.int64), across-1)
+        cy = np.minimum((qy[active]/self._size[1]).astype(np.int64), down-1)
+        queries = []
+        targets = []
+        for (dx, dy) in offsets:
+            cells = ((cy+dy) % down)*across+(cx+dx) % across
+            lo = self._starts[cells]
+            counts = self._starts[cells+1]-lo
+            total = counts.sum()
+            if total == 0:
+                continue
+            # Expand each query into the run of asteroids in its cell
+            starts = np.repeat(lo-(np.cumsum(counts)-counts), counts)
+            queries.append(np.repeat(active, counts))
+            targets.append(self._order[starts+np.arange(total)])
+        if not queries:
+            empty = np.zeros(0, dtype=np.int64)
+            return (empty, empty, np.zeros(0), np.zeros(0), np.zeros(0))
+        q = np.concatenate(queries)
+        j = np.concatenate(targets)
+        dx = wrapDelta(self._x[j]-qx[q], self._period[0])
+        dy = wrapDelta(self._y[j]-qy[q], self._period[1])
+        return (q, j, dx, dy, np.sqrt(dx*dx+dy*dy))
+
+    def _batches(self, queries):
+        """
+        Returns the list of query number arrays to scan linearly, so that no batch
+        measures more than NEAREST_SCAN_PAIRS pairs
+        """
+        size = max(1, NEAREST_SCAN_PAIRS//max(len(self._x), 1))
+        return [np.arange(i, min(i+size, queries)) for i in range(0, queries, size)]
+
+    def _every(self, qx, qy, active):
+        """
+        Returns the arrays (query, dx, dy, distance) from each of the active
+        queries to every asteroid.
+
+        The offsets and distances have a row per query and a column per asteroid;
+        query is the column of the query numbers, which broadcasts against them.
+        """
+        q = active[:, None]
+        dx = wrapDelta(self._x[None, :]-qx[q], self._period[0])
+        dy = wrapDelta(self._y[None, :]-qy[q], self._period[1])
+        return (q, dx, dy, np.sqrt(dx*dx+dy*dy))
+
+    def _merge(self, index, distance, q, j, d):
+        """
+        Merges the candidates (q, j, d) into the k best of each query, in place
+        """
+        if len(q) == 0:
+            return
+        k = index.shape[1]
+        touched = np.unique(q)
+        q = np.concatenate([np.repeat(touched, k), q])
+        j = np.concatenate([index[touched].ravel(), j])
+        d = np.concatenate([distance[touched].ravel(), d])
+        order = np.lexsort((d, q))
+        q, j, d = q[order], j[order], d[order]
+        # The rank of each candidate among those of its query
+        first = np.searchsorted(q, q, 'left')
+        rank = np.arange(len(q))-first
+        best = rank < k
+        index[q[best], rank[best]] = j[best]
+        distance[q[best], rank[best]] = d[best]
+
+
+def scan(index, qx, qy, k=1):
+    """
+    Returns the k nearest asteroids of each query, as nearest does, by a linear scan
+    """
+    qx, qy = index._shift(qx, qy)
+    result = np.zeros((len(qx), k), dtype=np.int64)
+    gaps = np.zeros((len(qx), k))
+    for i in range(len(qx)):
+        dx = wrapDelta(index._x-qx[i], index._period[0])
+        dy = wrapDelta(index._y-qy[i], index._period[1])
+        d = np.sqrt(dx*dx+dy*dy)
+        best = np.argsort(d, kind='stable')[:k]
+        result[i] = best
+        gaps[i] = d[best]
+    return (result, gaps)
+
+
+def bench(count, queries, k=4, seed=0):
+    """
+    Prints the cost of the batched queries of an index against a linear scan
+    """
+    scale = np.sqrt(count/PARTITION_DENSITY)
+    width, height = GAME_WIDTH*scale, GAME_HEIGHT*scale
+    field = EntityField.random(count, seed, width, height)
+    rng = np.random.default_rng(seed+1)
+    qx = rng.uniform(-DEAD_ZONE, width+DEAD_ZONE, queries)
+    qy = rng.uniform(-DEAD_ZONE, height+DEAD_ZONE, queries)
+
+    start = time.perf_counter()
+    index, rows = AsteroidIndex.fromField(field)
+    building = time.perf_counter()-start
+    field.move()
+    moved = field.getRows()
+    start = time.perf_counter()
+    index.update(moved[rows, X], moved[rows, Y])
+    updating = time.perf_counter()-start
+
+    start = time.perf_counter()
+    found, gaps = index.nearest(qx, qy, k)
+    searching = time.perf_counter()-start
+    start = time.perf_counter()
+    target, _ = index.cone(qx, qy, rng.uniform(0, 360, queries), NEAREST_SPREAD,
+        NEAREST_REACH)
+    aiming = time.perf_counter()-start
+    start = time.perf_counter()
+    expected, distances = scan(index, qx, qy, k)
+    scanning = time.perf_counter()-start
+
+    # Ties may come out in either order, so compare the distances
+    same = np.allclose(gaps, distances)
+    print('%6d asteroids, %d queries: build %.2f ms, update %.2f ms, %d-nearest '
+        '%.2f ms, cone %.2f ms (%d hit), linear scan %.1f ms, %s' % (count, queries,
+        1000*building, 1000*updating, k, 1000*searching, 1000*aiming,
+        (target >= 0).sum(), 1000*scanning, 'same' if same else 'DIFFERENT'))
+
+
+if __name__ == '__main__':
+    for count in (50, 1000, 100000):
+        bench(count, 1000)
@@ -0,0 +1,413 @@
+"""
+Spatially partitioned multi-process simulation for Planetoids
+
+This module steps a very large EntityField (see field.py) on several worker processes
+at once. The world is cut into vertical strips, one per worker, and each worker owns
+the asteroids and bullets whose x coordinate lies in its strip. Every tick
+
+    1. the main process hands each worker the new bullets fired into its strip,
+    2. each worker moves its entities, takes out the ones that left its strip (the
+       migrants) and exports them, together with its halo: the entities within
+       FIELD_REACH of its edges,
+    3. each worker adopts the migrants sent to it, and resolves its collisions with
+       the halos of its neighbours (and its own migrants) as ghosts, and
+    4. each worker copies its rows out for the main process to gather.
+
+All of this data moves through multiprocessing.shared_memory blocks, and the steps are
+kept in lock step by a barrier. As the collision rule of a field only depends on each
+bullet-asteroid pair on its own, a partitioned field breaks exactly the same asteroids
+as a single field would; only the ids of the pieces differ.
+
+Workers give their new pieces ids starting from a different large number each, so
+ids stay unique without talking to each other.
+
+To benchmark against a single process, run
+
+    python planetoids/partition.py --asteroids 100000 --workers 4
+
+from the root folder. Add --check to first confirm on a small field that the
+partitioned simulation matches a single field.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from consts import *
+from field import *
+from multiprocessing import shared_memory
+import multiprocessing
+import argparse
+import time
+
+# The header slots of a partition buffer
+_COUNT, _SCORE, _BROKEN, _BUSY = range(4)
+# The number of header slots of a partition buffer
+_HEADER = 4
+# The column of an exported row that holds the worker it migrates to (-1 for halo)
+DEST = len(FIELD_COLUMNS)
+# The first id given to the pieces created by worker k is (k+1)*PARTITION_ID_BLOCK
+PARTITION_ID_BLOCK = 1 << 40
+
+
+class _Buffer(object):
+    """
+    A shared memory block holding a few int64 stats and up to capacity rows.
+    """
+    # Attribute block: the shared memory block
+    # Invariant: block is a SharedMemory
+    #
+    # Attribute header: the stats, indexed by _COUNT, _SCORE, _BROKEN and _BUSY
+    # Invariant: header is an int64 array of _HEADER slots
+    #
+    # Attribute rows: the space for the rows
+    # Invariant: rows is a float64 array of shape (capacity, columns)
+
+    def __init__(self, capacity, columns, name=None):
+        """
+        Creates a new buffer, or attaches to the buffer of the given name (in which
+        case capacity is ignored)
+        """
+        size = 8*_HEADER+8*columns*capacity
+        self.block = shared_memory.SharedMemory(name, create=name is None, size=size)
+        capacity = (self.block.size-8*_HEADER)//(8*columns)
+        self.header = np.ndarray((_HEADER,), dtype=np.int64, buffer=self.block.buf)
+        self.rows = np.ndarray((capacity, columns), dtype=np.float64,
+            buffer=self.block.buf, offset=8*_HEADER)
+
+    def write(self, rows):
+        """
+        Replaces the rows in the buffer with rows
+        """
+        if len(rows) > len(self.rows):
+            raise RuntimeError('partition buffer of %d rows is too small for %d rows'
+                % (len(self.rows), len(rows)))
+        self.rows[:len(rows)] = rows
+        self.header[_COUNT] = len(rows)
+
+    def read(self):
+        """
+        Returns a zero-copy view of the rows in the buffer
+        """
+        return self.rows[:self.header[_COUNT]]
+
+    def close(self, unlink=False):
+        """
+        Closes the buffer, removing the block as well if unlink is True
+        """
+        self.header = self.rows = None
+        self.block.close()
+        if unlink:
+            self.block.unlink()
+
+
+def stripOf(x, edges):
+    """
+    Returns the number of the strip that each x coordinate lies in
+
+    Parameter x: The coordinates
+    Precondition: x is a float array
+
+    Parameter edges: The strip edges, from -inf to inf
+    Precondition: edges is a sorted float array of the number of strips + 1
+    """
+    return np.searchsorted(edges, x, 'right')-1
+
+
+def _worker(index, edges, size, names, barrier, control):
+    """
+    Runs the strip index of a partitioned field until told to stop.
+
+    This function is run in the worker processes. See the module docstring for the
+    steps of a tick.
+    """
+    strips = len(edges)-1
+    lo = edges[index]
+    hi = edges[index+1]
+    neighbours = [k for k in (index-1, index+1) if 0 <= k < strips]
+    buffers = []
+    try:
+        inboxes, exports, outputs = [[_Buffer(0, columns, name) for name in group]
+            for (group, columns) in zip(names, (len(FIELD_COLUMNS), DEST+1,
+            len(FIELD_COLUMNS)))]
+        buffers = inboxes+exports+outputs
+        output = outputs[index]
+        field = EntityField(output.read().copy(), (index+1)*PARTITION_ID_BLOCK, *size)
+        while True:
+            barrier.wait()
+            if control[0]:
+                break
+            start = time.perf_counter()
+            field.addRows(inboxes[index].read())
+            field.move()
+            rows = field.getRows()
+            owner = stripOf(rows[:, X], edges)
+            leaving = owner != index
+            migrants = np.column_stack([rows[leaving], owner[leaving]])
+            field.remove(leaving)
+            rows = field.getRows()
+            near = (rows[:, X] < lo+FIELD_REACH) | (rows[:, X] >= hi-FIELD_REACH)
+            halo = np.column_stack([rows[near], np.full(near.sum(), -1.0)])
+            exports[index].write(np.concatenate([migrants, halo]))
+            busy = time.perf_counter()-start
+            barrier.wait()
+
+            start = time.perf_counter()
+            ghosts = [migrants[:, :DEST]]
+            for k in range(strips):
+                rows = exports[k].read()
+                field.addRows(rows[rows[:, DEST] == index, :DEST])
+                if k in neighbours:
+                    ghosts.append(rows[rows[:, DEST] == -1, :DEST])
+            broken = field.collide(np.concatenate(ghosts))
+            output.write(field.getRows())
+            output.header[_SCORE] = field.score
+            output.header[_BROKEN] += broken
+            output.header[_BUSY] += int(1e9*(busy+time.perf_counter()-start))
+            barrier.wait()
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        for buffer in buffers:
+            buffer.close()
+
+
+class PartitionedField(object):
+    """
+    An EntityField split into strips, each stepped by its own worker process.
+
+    Use step to advance every strip one tick, fire to add bullets, and gather (or
+    getViews) to read the positions back for drawing. Close the field when done to
+    stop the workers and free the shared memory.
+    """
+    # Attribute _edges: the x coordinates where the strips meet, from -inf to inf
+    # Invariant: _edges is a sorted float array of length workers+1
+    #
+    # Attribute _inboxes, _exports, _outputs: the buffers of each worker
+    # Invariant: each is a list of _Buffer, one per worker
+    #
+    # Attribute _fired: the bullets waiting to be handed to each worker
+    # Invariant: _fired is a list of lists of row arrays, one list per worker
+    #
+    # Attribute _nextid: the id to give the next bullet
+    # Invariant: _nextid is an int greater than every id in the initial field
+    #
+    # Attribute _processes: the worker processes
+    # Invariant: _processes is a list of multiprocessing processes
+    #
+    # Attribute ticks: the number of ticks stepped
+    # Invariant: ticks is an int >= 0
+
+    def __init__(self, field, workers=PARTITION_WORKERS, capacity=None):
+        """
+        Splits field into strips and starts their workers
+
+        Parameter field: The initial entities, and the size of the world
+        Precondition: field is an EntityField whose strips are each wider than
+        2*FIELD_REACH plus the fastest speed
+
+        Parameter workers: The number of strips (and processes)
+        Precondition: workers is an int > 0
+
+        Parameter capacity: The most rows a worker may ever hold
+        Precondition: capacity is None (enough for every asteroid to break twice)
+        or an int > 0
+        """
+        width, height = field.getSize()
+        if width/workers <= 2*FIELD_REACH+KIND_SPEEDS.max():
+            raise ValueError('%d strips are too narrow for a world %d wide'
+                % (workers, width))
+        if capacity is None:
+            capacity = 9*len(field)//workers+PARTITION_SLACK
+        self._edges = np.array([-np.inf]+[width*k/workers for k in range(1, workers)]
+            +[np.inf])
+        self._nextid = field.getNextId()
+        self._fired = [[] for k in range(workers)]
+        self.ticks = 0
+        self._inboxes = [_Buffer(PARTITION_SLACK, len(FIELD_COLUMNS)) for k in range(workers)]
+        self._exports = [_Buffer(capacity, DEST+1) for k in range(workers)]
+        self._outputs = [_Buffer(capacity, len(FIELD_COLUMNS)) for k in range(workers)]
+        rows = field.getRows()
+        owner = stripOf(rows[:, X], self._edges)
+        for k in range(workers):
+            self._inboxes[k].write(rows[:0])
+            self._exports[k].write(np.zeros((0, DEST+1)))
+            self._outputs[k].write(rows[owner == k])
+            self._outputs[k].header[_SCORE:] = 0
+
+        # Kivy does not survive a fork, so every worker starts a fresh interpreter
+        context = multiprocessing.get_context('spawn')
+        self._barrier = context.Barrier(workers+1)
+        self._control = context.RawArray('q', 1)
+        names = [[b.block.name for b in group]
+            for group in (self._inboxes, self._exports, self._outputs)]
+        self._processes = [context.Process(target=_worker, args=(k, self._edges,
+            (width, height), names, self._barrier, self._control))
+            for k in range(workers)]
+        for p in self._processes:
+            p.start()
+
+    def fire(self, x, y, vx, vy):
+        """
+        Adds bullets at the given positions and velocities, from the next tick on
+
+        Parameter x, y, vx, vy: The columns of the new bullets
+        Precondition: each is a NumPy array (or number) of the same length
+        """
+        x, y, vx, vy = np.broadcast_arrays(x, y, vx, vy)
+        ids = np.arange(self._nextid, self._nextid+len(x))
+        self._nextid += len(x)
+        rows = np.column_stack([ids, np.full(len(x), BULLET), x, y, vx, vy])
+        owner = stripOf(x, self._edges)
+        for k in range(len(self._fired)):
+            self._fired[k].append(rows[owner == k])
+
+    def step(self):
+        """
+        Advances every strip one tick, returning once all workers are done
+        """
+        for k in range(len(self._fired)):
+            if self._fired[k]:
+                self._inboxes[k].write(np.concatenate(self._fired[k]))
+            else:
+                self._inboxes[k].write(np.zeros((0, len(FIELD_COLUMNS))))
+            self._fired[k] = []
+        self._barrier.wait()
+        self._barrier.wait()
+        self._barrier.wait()
+        self.ticks += 1
+
+    def getViews(self):
+        """
+        Returns the zero-copy views of the rows of every strip, valid until step
+        """
+        return [b.read() for b in self._outputs]
+
+    def gather(self):
+        """
+        Returns a copy of the rows of every strip, in one array
+        """
+        return np.concatenate(self.getViews())
+
+    def getScore(self):
+        """
+        Returns the points scored in every strip together
+        """
+        return int(sum(b.header[_SCORE] for b in self._outputs))
+
+    def getBusy(self):
+        """
+        Returns the seconds each worker has spent working (not waiting) so far
+        """
+        return [b.header[_BUSY]/1e9 for b in self._outputs]
+
+    def close(self):
+        """
+        Stops the workers and frees the shared memory
+        """
+        if self._processes:
+            self._control[0] = 1
+            try:
+                self._barrier.wait()
+            except Exception:
+                pass
+            for p in self._processes:
+                p.join()
+            self._processes = []
+            for buffer in self._inboxes+self._exports+self._outputs:
+                buffer.close(True)
+
+
+def _volley(rng, count, width, height):
+    """
+    Returns the columns x, y, vx, vy of count bullets fired in random directions
+    """
+    angles = rng.uniform(0, 2*np.pi, count)
+    return (rng.uniform(0, width, count), rng.uniform(0, height, count),
+        np.cos(angles)*BULLET_SPEED, np.sin(angles)*BULLET_SPEED)
+
+
+def _canonical(rows):
+    """
+    Returns rows without their ids, sorted, to compare fields whose ids differ
+    """
+    rows = np.round(rows[:, KIND:], 6)
+    return rows[np.lexsort(rows.T[::-1])]
+
+
+def check(count, workers, ticks, bullets, seed=0):
+    """
+    Steps the same field in one process and partitioned, and reports any difference
+    """
+    scale = np.sqrt(count/PARTITION_DENSITY)
+    width, height = GAME_WIDTH*scale, GAME_HEIGHT*scale
+    single = EntityField.random(count, seed, width, height)
+    split = PartitionedField(EntityField.random(count, seed, width, height), workers)
+    rng = np.random.default_rng(seed)
+    try:
+        for tick in range(ticks):
+            volley = _volley(rng, bullets, width, height)
+            single.add(BULLET, *volley)
+            split.fire(*volley)
+            single.step()
+            split.step()
+            a = _canonical(single.getRows())
+            b = _canonical(split.gather())
+            if a.shape != b.shape or not np.array_equal(a, b):
+                print('check: tick %d differs (%d rows single, %d partitioned)'
+                    % (tick, len(a), len(b)))
+                return False
+        print('check: %d ticks of %d asteroids match, score %d'
+            % (ticks, count, split.getScore()))
+        return single.score == split.getScore()
+    finally:
+        split.close()
+
+
+def bench(count, workers, ticks, bullets, seed=0):
+    """
+    Prints the tick rate of a single field and of a partitioned one
+    """
+    scale = np.sqrt(count/PARTITION_DENSITY)
+    width, height = GAME_WIDTH*scale, GAME_HEIGHT*scale
+    single = EntityField.random(count, seed, width, height)
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    for tick in range(ticks):
+        single.add(BULLET, *_volley(rng, bullets, width, height))
+        single.step()
+    elapsed = time.perf_counter()-start
+    print('single:      %7.2f ms/tick, %d entities' % (1000*elapsed/ticks, len(single)))
+
+    split = PartitionedField(EntityField.random(count, seed, width, height), workers)
+    rng = np.random.default_rng(seed)
+    try:
+        split.step()
+        gathering = 0.0
+        start = time.perf_counter()
+        for tick in range(ticks):
+            split.fire(*_volley(rng, bullets, width, height))
+            split.step()
+            begin = time.perf_counter()
+            rows = split.gather()
+            gathering += time.perf_counter()-begin
+        elapsed = time.perf_counter()-start
+        busy = split.getBusy()
+        print('partitioned: %7.2f ms/tick (%.2f ms gathering), %d entities, '
+            '%d workers busy %.0f%% on average' % (1000*elapsed/ticks,
+            1000*gathering/ticks, len(rows), workers,
+            100*sum(busy)/len(busy)/max(elapsed, 1e-9)))
+    finally:
+        split.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark a partitioned field.')
+    parser.add_argument('--asteroids', type=int, default=100000, help='asteroids in the field')
+    parser.add_argument('--workers', type=int, default=PARTITION_WORKERS, help='worker processes')
+    parser.add_argument('--ticks', type=int, default=60, help='ticks to run')
+    parser.add_argument('--bullets', type=int, default=200, help='bullets fired per tick')
+    parser.add_argument('--check', action='store_true', help='check against one process first')
+    args = parser.parse_args()
+    if args.check and not check(2000, args.workers, 120, 20):
+        raise SystemExit(1)
+    bench(args.asteroids, args.workers, args.ticks, args.bullets)
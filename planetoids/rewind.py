@@ -0,0 +1,243 @@
+"""
+Rewind history for Planetoids
+
+Keeping every frame of the last few seconds as a full Wave copy costs a copy of
+every model on every frame. History keeps far less. Because waves are deterministic
+(see golden.py), the input mask of a frame is all it takes to get from that frame
+to the next one, so the per-frame delta is a single byte. Every REWIND_KEYFRAME
+frames the history also keeps a keyframe, a Wave.copy() of the state before that
+frame. Any past frame is rebuilt by restoring the keyframe before it and stepping
+the recorded masks forward, which is at most REWIND_KEYFRAME-1 steps.
+
+Masks and keyframes live in fixed-size rings, so pushing a frame is O(1) however
+long the history is, and the memory is bounded: the oldest frames are overwritten
+as new ones come in. At least the last REWIND_SECONDS seconds can always be rebuilt.
+
+The frames are pushed right before each Wave.update, with the ship in place, which
+is how both Planetoids and inputs.step update a wave. Replaying them with
+inputs.step therefore puts the wave back exactly where it was.
+
+To measure push cost, memory per second of history and rewind time against the
+number of entities, run
+
+    python planetoids/rewind.py
+
+from the root folder.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from consts import *
+from inputs import step
+import random
+import time
+
+
+class History(object):
+    """
+    A bounded ring of input masks and periodic keyframes of one wave.
+
+    Frames are numbered from 0, the first frame pushed. Frame n is the state of the
+    wave before its n-th update; the newest frame, getLast(), is the current state.
+    """
+    # Attribute _masks: the input mask of each frame, indexed by frame % capacity
+    # Invariant: _masks is a bytearray of length capacity
+    #
+    # Attribute _keys: the keyframes, indexed by (frame // _every) % len(_keys)
+    # Invariant: _keys is a list of (frame, Wave) pairs or None
+    #
+    # Attribute _every: the frames between keyframes
+    # Invariant: _every is an int > 0
+    #
+    # Attribute _capacity: the most frames of masks kept
+    # Invariant: _capacity is an int, a multiple of _every
+    #
+    # Attribute _first: the oldest frame that can be rebuilt
+    # Invariant: _first is an int, a keyframe, with 0 <= _first <= _last
+    #
+    # Attribute _last: the number of frames pushed, which is the current frame
+    # Invariant: _last is an int >= 0
+
+    def __init__(self, seconds=REWIND_SECONDS, every=REWIND_KEYFRAME):
+        """
+        Creates an empty history
+
+        Parameter seconds: The seconds of frames that are always kept
+        Precondition: seconds is a number > 0
+
+        Parameter every: The frames between keyframes
+        Precondition: every is an int > 0
+        """
+        frames = int(seconds*GAME_FPS)
+        self._every = every
+        self._capacity = -(-frames//every)*every
+        self._masks = bytearray(self._capacity)
+        # One more keyframe than the masks cover, so a full window always has one
+        self._keys = [None]*(self._capacity//every+1)
+        self._first = 0
+        self._last = 0
+
+    def __len__(self):
+        return self._last-self._first
+
+    def getFirst(self):
+        """
+        Returns the oldest frame that can be rebuilt
+        """
+        return self._first
+
+    def getLast(self):
+        """
+        Returns the newest frame, the number of frames pushed so far
+        """
+        return self._last
+
+    def push(self, wave, mask):
+        """
+        Records the frame about to be played.
+
+        Call this right before stepping wave with mask. Every REWIND_KEYFRAME
+        frames this copies the wave; otherwise it only stores the mask.
+
+        Parameter wave: The wave, with its ship in place if it has lives left
+        Precondition: wave is a Wave object
+
+        Parameter mask: The input mask the wave is about to be stepped with
+        Precondition: mask is an int in 0..2**len(INPUT_KEYS)-1
+        """
+        frame = self._last
+        if frame % self._every == 0:
+            self._keys[(frame//self._every) % len(self._keys)] = (frame, wave.copy())
+        self._masks[frame % self._capacity] = mask
+        self._last = frame+1
+        if self._last-self._first > self._capacity:
+            self._first += self._every
+
+    def seek(self, wave, frame):
+        """
+        Puts wave back to the given past frame, keeping the history after it.
+
+        Parameter wave: The wave to restore
+        Precondition: wave is a Wave object (usually the one that was pushed)
+
+        Parameter frame: The frame to go to
+        Precondition: frame is an int in getFirst()..getLast()
+        """
+        if frame < self._first or frame > self._last:
+            raise ValueError('frame %d is not in %d..%d' % (frame, self._first,
+                self._last))
+        start = frame-frame % self._every
+        key = self._keys[(start//self._every) % len(self._keys)]
+        assert key is not None and key[0] == start, 'keyframe %d was lost' % start
+        wave.restore(key[1])
+        # The replayed frames have been seen already, so they spawn no effects
+        effects = wave.getEffects()
+        wave.setEffects(None)
+        for n in range(start, frame):
+            step(wave, self._masks[n % self._capacity])
+        wave.setEffects(effects)
+
+    def rewind(self, wave, frames):
+        """
+        Puts wave back the given number of frames and forgets the frames after it.
+
+        The rewind stops at the oldest frame kept, so an empty history does nothing.
+        Returns the number of frames actually rewound.
+
+        Parameter wave: The wave to rewind
+        Precondition: wave is a Wave object (usually the one that was pushed)
+
+        Parameter frames: The number of frames to go back
+        Precondition: frames is an int >= 0
+        """
+        if self._last == self._first:
+            return 0
+        target = max(self._first, self._last-frames)
+        self.seek(wave, target)
+        rewound = self._last-target
+        self._last = target
+        return rewound
+
+    def getMasks(self, start, stop):
+        """
+        Returns the list of recorded masks of the frames start..stop-1
+
+        Parameter start, stop: The range of frames
+        Precondition: getFirst() <= start <= stop <= getLast()
+        """
+        return [self._masks[n % self._capacity] for n in range(start, stop)]
+
+
+def crowdedWave(count, seed=0):
+    """
+    Returns the JSON dictionary of wave1.json with count random large asteroids
+    """
+    from headless import loadWave
+    data = loadWave('wave1.json')
+    rng = random.Random(seed)
+    data['asteroids'] = [{'size': LARGE_ASTEROID,
+        'position': [rng.uniform(0, GAME_WIDTH), rng.uniform(0, GAME_HEIGHT)],
+        'direction': [rng.uniform(-1, 1), rng.uniform(-1, 1)]} for _ in range(count)]
+    return data
+
+
+def keyframeSize(wave):
+    """
+    Returns the bytes allocated by one Wave.copy() of wave
+    """
+    import tracemalloc
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    copy = wave.copy()
+    size = tracemalloc.get_traced_memory()[0]-before
+    tracemalloc.stop()
+    return size
+
+
+def bench(count, frames=REWIND_SECONDS*GAME_FPS, seed=0):
+    """
+    Prints the costs of a full history of a wave of count asteroids
+    """
+    from golden import hashState
+    from headless import Wave, KeyInput, RandomPilot
+
+    wave = Wave(crowdedWave(count, seed))
+    entities = len(wave.getEntities())
+    history = History()
+    pilot = RandomPilot()
+    rng = random.Random(seed)
+    hashes = []
+    pushing = 0.0
+    for frame in range(frames):
+        mask = pilot(wave, frame, rng)
+        if wave.pauseCheck() and wave.getLives() > 0:
+            wave.resetShip()
+        hashes.append(hashState(wave))
+        start = time.perf_counter()
+        history.push(wave, mask)
+        pushing += time.perf_counter()-start
+        wave.update(KeyInput.forMask(mask))
+
+    # The worst seek is the frame just before a keyframe
+    worst = history.getFirst()+REWIND_KEYFRAME-1
+    start = time.perf_counter()
+    history.seek(wave, worst)
+    seeking = time.perf_counter()-start
+    exact = hashState(wave) == hashes[worst]
+    start = time.perf_counter()
+    history.rewind(wave, frames)
+    rewinding = time.perf_counter()-start
+    exact = exact and hashState(wave) == hashes[history.getFirst()]
+
+    keyframe = keyframeSize(wave)
+    second = GAME_FPS*(1+keyframe/REWIND_KEYFRAME)
+    full = GAME_FPS*keyframe
+    print('%4d entities: push %.1fus per frame, %.1f KB per second of history '
+        '(%.0f KB for full copies), worst seek %.1f ms, rewind %d frames %.1f ms, %s'
+        % (entities, 1e6*pushing/frames, second/1024, full/1024, 1000*seeking,
+        frames, 1000*rewinding, 'exact' if exact else 'MISMATCH'))
+
+
+if __name__ == '__main__':
+    for count in (8, 50, 200, 800):
+        bench(count)
@@ -0,0 +1,361 @@
+"""
+Headless match server for Planetoids
+
+This module hosts many concurrent Wave matches in one process for bot tournaments.
+Clients connect over local TCP or a Unix socket and speak newline-delimited JSON.
+A client sends
+
+    {"op": "join", "wave": "wave1.json"}     to start a match on a wave
+    {"op": "input", "mask": 5}               to hold an input mask (see headless.py)
+    {"op": "leave"}                          to end its match
+
+and the server answers a join with {"op": "joined", "match": id}. After every
+SERVER_STATE_EVERY ticks the server sends each client a state message with the frame,
+score, lives and whether the wave is done. A message the server cannot act on, such
+as a join naming a wave that is not in the Data folder, is answered with
+{"op": "error", "message": ...}. A socket client that falls more than
+SERVER_SEND_LIMIT bytes behind in reading its messages is disconnected.
+
+All matches share one fixed-rate scheduler running at SERVER_TICK_RATE. Each tick
+steps every live match in a single batch, with the last mask its client submitted,
+and only then writes the state messages out. A tick overruns when this work does not
+finish before the next tick is due; the server counts overruns and the worst lateness
+so that we can tell how many matches a machine can host.
+
+LocalClient stands in for a socket client inside the server process, so tests and
+load experiments do not need the network. To try the server under load, run
+
+    python planetoids/server.py --bots 200
+
+from the root folder. It reports the tick metrics every second.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from headless import *
+import argparse
+import asyncio
+
+
+class Match(object):
+    """
+    A single match hosted by the server.
+    """
+    # Attribute ident: the match id
+    # Invariant: ident is an int >= 0
+    #
+    # Attribute wave: the wave being played
+    # Invariant: wave is a Wave object
+    #
+    # Attribute mask: the input mask most recently submitted by the client
+    # Invariant: mask is an int
+    #
+    # Attribute frame: the number of frames simulated
+    # Invariant: frame is an int >= 0
+    #
+    # Attribute conn: the connection of the client playing this match
+    # Invariant: conn is a connection object with a method send(message)
+
+    def __init__(self, ident, wave, conn):
+        self.ident = ident
+        self.wave = wave
+        self.mask = 0
+        self.frame = 0
+        self.conn = conn
+
+    def getState(self):
+        """
+        Returns the state message for this match
+        """
+        return {'op': 'state', 'match': self.ident, 'frame': self.frame,
+            'score': self.wave.getScore(), 'lives': self.wave.getLives(),
+            'done': self.wave.endCheck()}
+
+
+class _StreamConnection(object):
+    """
+    A connection to a client over a socket stream.
+
+    The server sends from its tick, which cannot wait for a slow client, so send
+    only queues the message. A client that lets more than SERVER_SEND_LIMIT bytes
+    queue up is closed instead, which ends its match.
+    """
+    # Attribute _writer: the stream to write messages to
+    # Invariant: _writer is an asyncio.StreamWriter
+
+    def __init__(self, writer):
+        self._writer = writer
+
+    def send(self, message):
+        """
+        Queues message (a dictionary) to be sent to the client
+        """
+        if self._writer.is_closing():
+            return
+        if self._writer.transport.get_write_buffer_size() > SERVER_SEND_LIMIT:
+            # Closing would wait to flush the backlog, so drop it
+            self._writer.transport.abort()
+            return
+        self._writer.write((json.dumps(message)+'\n').encode())
+
+    async def drain(self):
+        """
+        Waits until the messages queued for the client have been handed to the socket
+        """
+        if not self._writer.is_closing():
+            await self._writer.drain()
+
+
+class LocalClient(object):
+    """
+    A client that talks to a MatchServer in the same process, without a socket.
+
+    It supports the same messages as a socket client. Create one with the server
+    method connectLocal.
+    """
+    # Attribute _server: the server this client is connected to
+    # Invariant: _server is a MatchServer
+    #
+    # Attribute _inbox: the messages sent by the server and not yet received
+    # Invariant: _inbox is an asyncio.Queue
+
+    def __init__(self, server):
+        self._server = server
+        self._inbox = asyncio.Queue()
+
+    def send(self, message):
+        """
+        Called by the server to deliver message to this client
+        """
+        self._inbox.put_nowait(message)
+
+    def submit(self, message):
+        """
+        Sends message (a dictionary) to the server
+        """
+        self._server.handle(self, message)
+
+    async def receive(self):
+        """
+        Returns the next message from the server, waiting for it if necessary
+        """
+        return await self._inbox.get()
+
+    def pending(self):
+        """
+        Returns the list of messages received but not yet read, emptying the inbox
+        """
+        messages = []
+        while not self._inbox.empty():
+            messages.append(self._inbox.get_nowait())
+        return messages
+
+
+class MatchServer(object):
+    """
+    A server that hosts many matches on a shared fixed-rate scheduler.
+    """
+    # Attribute _matches: the matches being hosted, by connection
+    # Invariant: _matches is a dictionary of connection objects to Match
+    #
+    # Attribute _nextid: the id of the next match to be created
+    # Invariant: _nextid is an int >= 0
+    #
+    # Attribute _period: the time between ticks in seconds
+    # Invariant: _period is a float > 0
+    #
+    # Attribute _running: whether the scheduler is running
+    # Invariant: _running is a bool
+    #
+    # Attribute ticks, overruns, steps: the number of ticks run, the number of
+    # ticks whose work ran past the next deadline, and the match steps performed
+    # Invariant: each is an int >= 0
+    #
+    # Attribute busy, worst_late: the total time spent working in ticks, and the
+    # worst time in seconds that a tick started after its deadline
+    # Invariant: each is a float >= 0
+
+    def __init__(self, rate=SERVER_TICK_RATE):
+        self._matches = {}
+        self._nextid = 0
+        self._period = 1.0/rate
+        self._running = False
+        self.ticks = 0
+        self.overruns = 0
+        self.steps = 0
+        self.busy = 0.0
+        self.worst_late = 0.0
+
+    def getMetrics(self):
+        """
+        Returns a dictionary of the tick metrics so far
+        """
+        return {'matches': len(self._matches), 'ticks': self.ticks,
+            'overruns': self.overruns, 'steps': self.steps,
+            'load': self.busy/max(self.ticks*self._period, 1e-9),
+            'worst_late_ms': 1000*self.worst_late}
+
+    def connectLocal(self):
+        """
+        Returns a new LocalClient connected to this server
+        """
+        return LocalClient(self)
+
+    def handle(self, conn, message):
+        """
+        Processes one message from the client on connection conn
+
+        Parameter conn: The connection the message arrived on
+        Precondition: conn is a connection object with a method send(message)
+
+        Parameter message: The message, as decoded from JSON
+        Precondition: None (a message that is not a valid request gets an error reply)
+        """
+        op = message.get('op') if type(message) == dict else None
+        if op == 'join':
+            name = message.get('wave', DEFAULT_WAVE)
+            if not name in waveNames():
+                conn.send({'op': 'error', 'message': 'unknown wave %s' % repr(name)})
+                return
+            try:
+                wave = Wave(loadWave(name))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                conn.send({'op': 'error', 'message': 'cannot load wave %s: %s' % (repr(name), e)})
+                return
+            self._matches[conn] = Match(self._nextid, wave, conn)
+            conn.send({'op': 'joined', 'match': self._nextid})
+            self._nextid += 1
+        elif op == 'input' and conn in self._matches:
+            try:
+                self._matches[conn].mask = int(message['mask'])
+            except (KeyError, TypeError, ValueError):
+                conn.send({'op': 'error', 'message': 'bad mask in %s' % repr(message)})
+        elif op == 'leave':
+            self._matches.pop(conn, None)
+        else:
+            conn.send({'op': 'error', 'message': 'bad message %s' % repr(message)})
+
+    def tick(self):
+        """
+        Steps every live match once, then sends the state messages.
+
+        The messages are only sent after all matches have been stepped, so the
+        simulation work of a tick is done in one batch.
+        """
+        matches = list(self._matches.values())
+        for match in matches:
+            if not match.wave.endCheck():
+                step(match.wave, match.mask)
+                match.frame += 1
+                self.steps += 1
+        self.ticks += 1
+        if self.ticks % SERVER_STATE_EVERY == 0:
+            for match in matches:
+                match.conn.send(match.getState())
+
+    async def run(self):
+        """
+        Runs the fixed-rate scheduler until stop is called
+        """
+        loop = asyncio.get_running_loop()
+        self._running = True
+        deadline = loop.time()
+        while self._running:
+            start = loop.time()
+            self.worst_late = max(self.worst_late, start-deadline)
+            self.tick()
+            finish = loop.time()
+            self.busy += finish-start
+            deadline += self._period
+            if finish > deadline:
+                # Skip the ticks we missed rather than running them back to back
+                self.overruns += 1
+                deadline = finish
+            await asyncio.sleep(deadline-finish)
+
+    def stop(self):
+        """
+        Stops the scheduler after the current tick
+        """
+        self._running = False
+
+    async def serve(self, host='127.0.0.1', port=SERVER_PORT, path=None):
+        """
+        Returns an asyncio server accepting clients for this match server.
+
+        The server listens on the Unix socket path if it is given, and on the TCP
+        host and port otherwise.
+        """
+        if path is None:
+            return await asyncio.start_server(self._client, host, port)
+        return await asyncio.start_unix_server(self._client, path)
+
+    async def _client(self, reader, writer):
+        """
+        Serves a single socket client until it disconnects
+        """
+        conn = _StreamConnection(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    conn.send({'op': 'error', 'message': 'malformed JSON'})
+                    await conn.drain()
+                    continue
+                self.handle(conn, message)
+                await conn.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._matches.pop(conn, None)
+            writer.close()
+
+
+async def _bot(client, name, seed):
+    """
+    Plays a match on client with a random pilot until the wave is done
+    """
+    pilot = RandomPilot()
+    rng = random.Random(seed)
+    client.submit({'op': 'join', 'wave': name})
+    while True:
+        message = await client.receive()
+        if message['op'] == 'state':
+            if message['done']:
+                client.submit({'op': 'leave'})
+                return
+            client.submit({'op': 'input', 'mask': pilot(None, message['frame'], rng)})
+
+
+async def _main(args):
+    """
+    Runs the server with args from the command line
+    """
+    server = MatchServer(args.rate)
+    listener = await server.serve(port=args.port, path=args.unix)
+    names = waveNames()
+    for i in range(args.bots):
+        asyncio.ensure_future(_bot(server.connectLocal(), names[i % len(names)], i))
+    scheduler = asyncio.ensure_future(server.run())
+    try:
+        for second in range(args.seconds):
+            await asyncio.sleep(1)
+            print(server.getMetrics())
+    finally:
+        server.stop()
+        await scheduler
+        listener.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Host headless Planetoids matches.')
+    parser.add_argument('--port', type=int, default=SERVER_PORT, help='local TCP port')
+    parser.add_argument('--unix', default=None, help='listen on this Unix socket instead')
+    parser.add_argument('--rate', type=float, default=SERVER_TICK_RATE, help='ticks per second')
+    parser.add_argument('--bots', type=int, default=0, help='local bot matches to host')
+    parser.add_argument('--seconds', type=int, default=10, help='seconds to run')
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,323 @@
+"""
+Shared-memory state export for Planetoids
+
+This module lets analysis tools and bots in other processes watch a live game
+without sockets or pickling. A StatePublisher owns a multiprocessing.shared_memory
+block; a wave given the publisher (see Wave.setPublisher) copies its entities into
+the block at the end of every update. A StateReader in any other process attaches to
+the block by name and sees the entities as a NumPy array straight over the shared
+memory, without copying it.
+
+The block starts with EXPORT_HEADER int64 slots
+
+    sequence, frame, count, lives, score, capacity
+
+followed by capacity rows of float64 values, one per entity, in the order of
+EXPORT_COLUMNS. The kind column holds the numbers of sync.KIND_CODES.
+
+Writes are guarded by a seqlock. The publisher makes the sequence odd before it
+starts writing and even again when it is done, so a reader knows a view is torn if
+the sequence was odd, or changed, while it was reading:
+
+    while True:
+        seq = reader.begin()
+        ... use reader.getHeader() and reader.getEntities() ...
+        if not reader.retry(seq):
+            break
+
+The publisher never waits for readers, so watching a game cannot slow it down.
+Readers that would rather not loop can call read(), which returns a consistent copy.
+
+To publish the state of a game, start it with
+
+    python planetoids --export NAME
+
+and attach readers to the block NAME. To measure the cost of publishing with a
+reader process attached, run
+
+    python planetoids/shared.py
+
+from the root folder.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from consts import *
+from sync import KIND_CODES
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+import time
+import sys
+import os
+
+# The names of the int64 header slots, in order
+EXPORT_FIELDS = ('sequence', 'frame', 'count', 'lives', 'score', 'capacity')
+# The number of int64 header slots (the unused ones are reserved)
+EXPORT_HEADER = 8
+# The names of the float64 columns of each entity row, in order
+EXPORT_COLUMNS = ('id', 'kind', 'x', 'y', 'vx', 'vy', 'radius', 'angle')
+
+# The radius of each entity kind
+RADII = {'ship': SHIP_RADIUS, 'bullet': BULLET_RADIUS, SMALL_ASTEROID: SMALL_RADIUS,
+    MEDIUM_ASTEROID: MEDIUM_RADIUS, LARGE_ASTEROID: LARGE_RADIUS}
+
+
+def blockSize(capacity):
+    """
+    Returns the size in bytes of a shared block for capacity entities
+    """
+    return 8*EXPORT_HEADER + 8*len(EXPORT_COLUMNS)*capacity
+
+
+def _views(block, capacity):
+    """
+    Returns the (header, rows) NumPy views over the shared memory block
+    """
+    header = np.ndarray((EXPORT_HEADER,), dtype=np.int64, buffer=block.buf)
+    rows = np.ndarray((capacity, len(EXPORT_COLUMNS)), dtype=np.float64,
+        buffer=block.buf, offset=8*EXPORT_HEADER)
+    return (header, rows)
+
+
+class StatePublisher(object):
+    """
+    The writing end of a shared state block.
+
+    The process that creates the publisher owns the block, and removes it when the
+    publisher is closed. If a wave has more entities than the capacity, only the
+    first capacity of them are exported.
+    """
+    # Attribute _block: the shared memory block
+    # Invariant: _block is a SharedMemory, or None once closed
+    #
+    # Attribute _header, _rows: NumPy views over the header and the entity rows
+    # Invariant: _header is an int64 array of EXPORT_HEADER slots, and _rows is a
+    # float64 array of capacity rows of len(EXPORT_COLUMNS) columns
+    #
+    # Attribute _capacity: the most entities the block can hold
+    # Invariant: _capacity is an int > 0
+
+    def __init__(self, name=None, capacity=EXPORT_CAPACITY):
+        """
+        Creates a new shared block
+
+        Parameter name: The name of the block, for readers to attach to
+        Precondition: name is a string not used by another block, or None for
+        a generated name
+
+        Parameter capacity: The most entities the block can hold
+        Precondition: capacity is an int > 0
+        """
+        self._block = shared_memory.SharedMemory(name, create=True,
+            size=blockSize(capacity))
+        self._capacity = capacity
+        self._header, self._rows = _views(self._block, capacity)
+        self._header[:] = 0
+        self._header[EXPORT_FIELDS.index('capacity')] = capacity
+
+    def getName(self):
+        """
+        Returns the name readers use to attach to this block
+        """
+        return self._block.name
+
+    def publish(self, wave):
+        """
+        Copies the entities, score and lives of wave into the block
+        """
+        entities = wave.getEntities()
+        count = min(len(entities), self._capacity)
+        header = self._header
+        header[0] += 1
+        if count:
+            self._rows[:count] = [(e[0], KIND_CODES[e[1]], e[2], e[3], e[4], e[5],
+                RADII[e[1]], e[6]) for e in entities[:count]]
+        header[1] += 1
+        header[2] = count
+        header[3] = wave.getLives()
+        header[4] = wave.getScore()
+        header[0] += 1
+
+    def close(self):
+        """
+        Closes and removes the block. Attached readers keep their mapping.
+        """
+        if self._block is None:
+            return
+        self._header = self._rows = None
+        self._block.close()
+        self._block.unlink()
+        self._block = None
+
+
+class StateReader(object):
+    """
+    The reading end of a shared state block, in any process on this machine.
+
+    A reader never removes the block; only the publisher does. By default the
+    reader keeps the block off the resource tracker of its process, which would
+    otherwise remove the block when the reader exits. A reader in the publisher's
+    own process, or in a child process sharing its tracker, should attach with
+    track=True instead, as the tracker has to keep the publisher's registration.
+    """
+    # Attribute _block: the shared memory block
+    # Invariant: _block is a SharedMemory, or None once closed
+    #
+    # Attribute _header, _rows: NumPy views over the header and the entity rows
+    # Invariant: as in StatePublisher
+    #
+    # Attribute retries: the number of reads of read() that were torn and redone
+    # Invariant: retries is an int >= 0
+
+    def __init__(self, name, track=False):
+        """
+        Attaches to the block of the given name
+
+        Parameter name: The name of the block
+        Precondition: name is the name of a StatePublisher block
+
+        Parameter track: Whether to leave the block on the resource tracker
+        Precondition: track is a bool
+        """
+        if sys.version_info >= (3, 13):
+            self._block = shared_memory.SharedMemory(name, track=track)
+        else:
+            # Older versions always register the block as they attach, by its POSIX
+            # name (the name with a leading slash)
+            self._block = shared_memory.SharedMemory(name)
+            if not track and os.name == 'posix':
+                resource_tracker.unregister('/'+self._block.name, 'shared_memory')
+        header = np.ndarray((EXPORT_HEADER,), dtype=np.int64, buffer=self._block.buf)
+        self._header, self._rows = _views(self._block,
+            int(header[EXPORT_FIELDS.index('capacity')]))
+        self.retries = 0
+
+    def begin(self):
+        """
+        Returns the sequence number to check with retry, once the writer is idle
+        """
+        while True:
+            seq = int(self._header[0])
+            if seq % 2 == 0:
+                return seq
+            time.sleep(0)
+
+    def retry(self, seq):
+        """
+        Returns True if the block changed since begin returned seq
+
+        Parameter seq: The sequence number returned by begin
+        Precondition: seq is an int
+        """
+        return int(self._header[0]) != seq
+
+    def getHeader(self):
+        """
+        Returns a dictionary of the header fields, read without copying the block
+        """
+        return dict(zip(EXPORT_FIELDS, self._header[:len(EXPORT_FIELDS)].tolist()))
+
+    def getEntities(self):
+        """
+        Returns a zero-copy view of the live entity rows.
+
+        The view reads the shared memory directly, so its values change as the
+        game publishes. Check it with begin and retry.
+        """
+        return self._rows[:int(self._header[EXPORT_FIELDS.index('count')])]
+
+    def read(self):
+        """
+        Returns a consistent (header, entities) copy of the latest published frame
+        """
+        while True:
+            seq = self.begin()
+            header = self.getHeader()
+            entities = self._rows[:header['count']].copy()
+            if not self.retry(seq):
+                return (header, entities)
+            self.retries += 1
+
+    def close(self):
+        """
+        Detaches from the block
+        """
+        if self._block is None:
+            return
+        self._header = self._rows = None
+        self._block.close()
+        self._block = None
+
+
+def watch(name, seconds, results):
+    """
+    Reads the block name in a loop for the given seconds.
+
+    This function is run in the reader process of measure, which shares the
+    resource tracker of its parent. It puts a tuple of the number of consistent
+    reads, torn reads that were retried, and distinct frames seen on the queue
+    results.
+    """
+    reader = StateReader(name, track=True)
+    reads = 0
+    frames = set()
+    end = time.monotonic()+seconds
+    while time.monotonic() < end:
+        header, entities = reader.read()
+        reads += 1
+        frames.add(header['frame'])
+        time.sleep(0.001)
+    retries = reader.retries
+    reader.close()
+    results.put((reads, retries, len(frames)))
+
+
+def measure(name, frames, seed=0):
+    """
+    Plays the wave file name with a reader process attached and prints the costs
+    """
+    import multiprocessing
+    import random
+    from headless import Wave, loadWave, step, RandomPilot
+
+    publisher = StatePublisher()
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    wave = Wave(loadWave(name))
+    pilot = RandomPilot()
+    rng = random.Random(seed)
+    process = context.Process(target=watch, args=(publisher.getName(), frames/60+1.5, results))
+    process.start()
+    time.sleep(1)
+
+    # Publish by hand instead of with Wave.setPublisher, to time the two apart
+    played = 0
+    publishing = 0.0
+    stepping = 0.0
+    deadline = time.monotonic()
+    for frame in range(frames):
+        if wave.endCheck():
+            break
+        start = time.perf_counter()
+        step(wave, pilot(wave, frame, rng))
+        stepping += time.perf_counter()-start
+        start = time.perf_counter()
+        publisher.publish(wave)
+        publishing += time.perf_counter()-start
+        played += 1
+        deadline += 1/60
+        time.sleep(max(0, deadline-time.monotonic()))
+    reads, retries, seen = results.get()
+    process.join()
+    publisher.close()
+
+    played = max(played, 1)
+    print('%s: %d frames, step %.0fus, publish %.1fus per frame; reader %d reads, '
+        '%d torn reads retried, %d frames seen' % (name, played, 1e6*stepping/played,
+        1e6*publishing/played, reads, retries, seen))
+
+
+if __name__ == '__main__':
+    from headless import waveNames
+    for name in sys.argv[1:] or waveNames():
+        measure(name, 120)
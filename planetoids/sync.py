@@ -0,0 +1,473 @@
+"""
+Delta-compressed state sync protocol for Planetoids
+
+This module sends the state of a Wave to a viewer in another process. Every tick
+the sender captures a Snapshot, with positions, velocities and angles quantized to
+ints by the SYNC constants. Instead of the whole snapshot, it sends only how the
+snapshot differs from the last one the viewer acknowledged:
+
+    * destroy records for entities that no longer exist (hit asteroids and bullets),
+    * create records for entities that are new (from breakUp, bullet spawns and
+      ship restores), with their full state, and
+    * update records for entities whose state differs from a prediction.
+
+The prediction moves each entity of the acknowledged snapshot along its velocity
+for the frames that have passed since. Asteroids and bullets only change velocity
+when they are created, so away from the wrap edges they predict exactly and cost
+nothing. That way the size of a message scales with what changed, not with the
+number of entities on screen. Update records only carry the fields that differ,
+as zig-zag varints.
+
+Entities are told apart by the id numbers that Wave gives them (see tagEntity).
+The protocol itself never touches Kivy, so a viewer process does not need game2d.
+
+To measure the protocol with a loopback viewer process, run
+
+    python planetoids/sync.py
+
+from the root folder. It plays every wave headless and reports the bytes per tick,
+compared to sending full snapshots.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from consts import *
+import struct
+import zlib
+import socket
+
+# The number used for each entity kind on the wire
+KIND_CODES = {'ship': 0, 'bullet': 1, SMALL_ASTEROID: 2, MEDIUM_ASTEROID: 3,
+    LARGE_ASTEROID: 4}
+# The kind for each number on the wire
+KIND_NAMES = {v: k for (k, v) in KIND_CODES.items()}
+
+# The base frame of a message that is not relative to any snapshot
+NO_BASE = 0xFFFFFFFF
+# The number of quantized fields per entity: x, y, vx, vy, angle
+FIELDS = 5
+
+
+### WIRE HELPERS ###
+
+def putVarint(out, value):
+    """
+    Appends the unsigned int value to the bytearray out as a varint
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def putSigned(out, value):
+    """
+    Appends the int value to the bytearray out as a zig-zag varint
+    """
+    putVarint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))
+
+
+def getVarint(data, pos):
+    """
+    Returns the pair (value, next position) of the varint at pos in data
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return (value, pos)
+        shift += 7
+
+
+def getSigned(data, pos):
+    """
+    Returns the pair (value, next position) of the zig-zag varint at pos in data
+    """
+    value, pos = getVarint(data, pos)
+    return ((value >> 1) if not value & 1 else -((value + 1) >> 1), pos)
+
+
+### SNAPSHOTS ###
+
+class Snapshot(object):
+    """
+    The quantized state of a wave at one frame.
+    """
+    # Attribute frame: the frame this snapshot was taken at
+    # Invariant: frame is an int >= 0
+    #
+    # Attribute score: the wave score
+    # Invariant: score is an int >= 0
+    #
+    # Attribute lives: the lives left
+    # Invariant: lives is an int >= 0
+    #
+    # Attribute entities: the entity states, by id
+    # Invariant: entities is a dictionary of int to a list [kind, x, y, vx, vy, angle]
+    #            where kind is a key of KIND_NAMES and the rest are quantized ints
+
+    def __init__(self, frame, score, lives, entities):
+        self.frame = frame
+        self.score = score
+        self.lives = lives
+        self.entities = entities
+
+    def checksum(self):
+        """
+        Returns a 32-bit checksum of this snapshot, for checking viewers
+        """
+        crc = zlib.crc32(struct.pack('<3q', self.frame, self.score, self.lives))
+        for ident in sorted(self.entities):
+            e = self.entities[ident]
+            crc = zlib.crc32(struct.pack('<7q', ident, *e), crc)
+        return crc
+
+
+def capture(wave, frame):
+    """
+    Returns the Snapshot of wave at the given frame number
+
+    Parameter wave: The wave to capture
+    Precondition: wave is a Wave object
+
+    Parameter frame: The frame number
+    Precondition: frame is an int >= 0 and larger than any earlier capture
+    """
+    entities = {}
+    for (ident, kind, x, y, vx, vy, angle) in wave.getEntities():
+        entities[ident] = [KIND_CODES[kind], round(x*SYNC_POSITION_QUANTUM),
+            round(y*SYNC_POSITION_QUANTUM), round(vx*SYNC_VELOCITY_QUANTUM),
+            round(vy*SYNC_VELOCITY_QUANTUM), round(angle*SYNC_ANGLE_QUANTUM)]
+    return Snapshot(frame, wave.getScore(), wave.getLives(), entities)
+
+
+def predict(entity, frames):
+    """
+    Returns the predicted quantized fields of entity after the given frames.
+
+    Only ints are used, so that the sender and viewer predict exactly the same.
+
+    Parameter entity: The entity state in a snapshot
+    Precondition: entity is a list [kind, x, y, vx, vy, angle] of int
+
+    Parameter frames: The number of frames that have passed
+    Precondition: frames is an int >= 0
+    """
+    kind, x, y, vx, vy, angle = entity
+    half = SYNC_VELOCITY_QUANTUM//2
+    return [x + (vx*frames*SYNC_POSITION_QUANTUM+half)//SYNC_VELOCITY_QUANTUM,
+        y + (vy*frames*SYNC_POSITION_QUANTUM+half)//SYNC_VELOCITY_QUANTUM, vx, vy, angle]
+
+
+def encodeDelta(snapshot, base):
+    """
+    Returns the message (bytes) encoding snapshot relative to base.
+
+    Parameter snapshot: The snapshot to send
+    Precondition: snapshot is a Snapshot
+
+    Parameter base: The snapshot acknowledged by the viewer
+    Precondition: base is None (to send everything) or an earlier Snapshot
+    """
+    out = bytearray(struct.pack('<II', snapshot.frame,
+        NO_BASE if base is None else base.frame))
+    putVarint(out, snapshot.score)
+    putVarint(out, snapshot.lives)
+    old = {} if base is None else base.entities
+    new = snapshot.entities
+    frames = 0 if base is None else snapshot.frame-base.frame
+
+    destroyed = sorted(i for i in old if not i in new)
+    putVarint(out, len(destroyed))
+    prev = 0
+    for ident in destroyed:
+        putVarint(out, ident-prev)
+        prev = ident
+
+    created = sorted(i for i in new if not i in old)
+    putVarint(out, len(created))
+    prev = 0
+    for ident in created:
+        putVarint(out, ident-prev)
+        prev = ident
+        entity = new[ident]
+        out.append(entity[0])
+        for value in entity[1:]:
+            putSigned(out, value)
+
+    updates = bytearray()
+    count = 0
+    prev = 0
+    for ident in sorted(i for i in new if i in old):
+        guess = predict(old[ident], frames)
+        actual = new[ident]
+        mask = 0
+        for f in range(FIELDS):
+            if actual[f+1] != guess[f]:
+                mask |= 1 << f
+        if mask:
+            putVarint(updates, ident-prev)
+            prev = ident
+            updates.append(mask)
+            for f in range(FIELDS):
+                if mask & (1 << f):
+                    putSigned(updates, actual[f+1]-guess[f])
+            count += 1
+    putVarint(out, count)
+    out += updates
+    return bytes(out)
+
+
+class SyncEncoder(object):
+    """
+    The sending end of the protocol, for one viewer.
+
+    It remembers the snapshots it has sent until the viewer acknowledges them, and
+    encodes each new snapshot relative to the last acknowledged one.
+    """
+    # Attribute _sent: the snapshots sent and not yet superseded by an ack
+    # Invariant: _sent is a dictionary of frame numbers to Snapshot
+    #
+    # Attribute _acked: the last frame acknowledged by the viewer
+    # Invariant: _acked is an int in _sent, or None
+
+    def __init__(self):
+        self._sent = {}
+        self._acked = None
+
+    def encode(self, snapshot):
+        """
+        Returns the message for snapshot, relative to the last acknowledged one
+        """
+        base = None if self._acked is None else self._sent[self._acked]
+        self._sent[snapshot.frame] = snapshot
+        if len(self._sent) > SYNC_HISTORY:
+            oldest = min(self._sent)
+            del self._sent[oldest]
+            if oldest == self._acked:
+                self._acked = None
+        return encodeDelta(snapshot, base)
+
+    def acknowledge(self, frame, checksum=None):
+        """
+        Records that the viewer has the snapshot for frame.
+
+        Returns False if checksum is given and does not match the snapshot that was
+        sent for that frame (the viewer is out of sync), and True otherwise.
+        """
+        if not frame in self._sent:
+            return True
+        if self._acked is None or frame > self._acked:
+            self._acked = frame
+            for old in [f for f in self._sent if f < frame]:
+                del self._sent[old]
+        return checksum is None or checksum == self._sent[frame].checksum()
+
+
+class SyncDecoder(object):
+    """
+    The receiving end of the protocol, for a viewer.
+
+    It keeps the snapshots it has received that the sender may still use as a base.
+    """
+    # Attribute _received: the snapshots received, by frame
+    # Invariant: _received is a dictionary of frame numbers to Snapshot
+
+    def __init__(self):
+        self._received = {}
+
+    def decode(self, data):
+        """
+        Returns the Snapshot encoded by the message data.
+
+        This raises a ValueError if the message is relative to a snapshot that this
+        decoder never received (or has already discarded).
+        """
+        frame, baseframe = struct.unpack_from('<II', data)
+        pos = 8
+        if baseframe == NO_BASE:
+            base = None
+            old = {}
+        elif baseframe in self._received:
+            base = self._received[baseframe]
+            old = base.entities
+        else:
+            raise ValueError('message for frame %d needs missing frame %d' % (frame, baseframe))
+        frames = 0 if base is None else frame-baseframe
+        score, pos = getVarint(data, pos)
+        lives, pos = getVarint(data, pos)
+
+        entities = {}
+        destroyed = set()
+        count, pos = getVarint(data, pos)
+        ident = 0
+        for i in range(count):
+            gap, pos = getVarint(data, pos)
+            ident += gap
+            destroyed.add(ident)
+        for ident in old:
+            if not ident in destroyed:
+                entities[ident] = [old[ident][0]]+predict(old[ident], frames)
+
+        count, pos = getVarint(data, pos)
+        ident = 0
+        for i in range(count):
+            gap, pos = getVarint(data, pos)
+            ident += gap
+            entity = [data[pos]]
+            pos += 1
+            for f in range(FIELDS):
+                value, pos = getSigned(data, pos)
+                entity.append(value)
+            entities[ident] = entity
+
+        count, pos = getVarint(data, pos)
+        ident = 0
+        for i in range(count):
+            gap, pos = getVarint(data, pos)
+            ident += gap
+            mask = data[pos]
+            pos += 1
+            entity = entities[ident]
+            for f in range(FIELDS):
+                if mask & (1 << f):
+                    value, pos = getSigned(data, pos)
+                    entity[f+1] += value
+
+        snapshot = Snapshot(frame, score, lives, entities)
+        self._received[frame] = snapshot
+        if baseframe != NO_BASE:
+            for stale in [f for f in self._received if f < baseframe]:
+                del self._received[stale]
+        return snapshot
+
+
+### LOOPBACK TRANSPORT ###
+
+def sendMessage(sock, data):
+    """
+    Sends the message data on sock, prefixed by its length
+    """
+    sock.sendall(struct.pack('<I', len(data))+data)
+
+
+def receiveMessage(sock):
+    """
+    Returns the next length-prefixed message on sock, or None at the end
+    """
+    header = _receiveExactly(sock, 4)
+    if header is None:
+        return None
+    return _receiveExactly(sock, struct.unpack('<I', header)[0])
+
+
+def _receiveExactly(sock, size):
+    """
+    Returns exactly size bytes from sock, or None if it closes first
+    """
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size-len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+def viewer(address):
+    """
+    Runs a loopback viewer that connects to address and acknowledges every message.
+
+    Each acknowledgement is 8 bytes: the frame and the checksum of the decoded
+    snapshot. The viewer stops when it receives an empty message.
+    """
+    sock = socket.create_connection(address)
+    decoder = SyncDecoder()
+    while True:
+        data = receiveMessage(sock)
+        if not data:
+            break
+        snapshot = decoder.decode(data)
+        sock.sendall(struct.pack('<II', snapshot.frame, snapshot.checksum()))
+    sock.close()
+
+
+def measure(name, frames, seed=0):
+    """
+    Plays the wave file name with a loopback viewer and prints the bandwidth used
+    """
+    import multiprocessing
+    import select
+    from headless import Wave, loadWave, step, RandomPilot
+    import random
+
+    wave = Wave(loadWave(name))
+    pilot = RandomPilot()
+    rng = random.Random(seed)
+    encoder = SyncEncoder()
+    ticks = 0
+    sent = 0
+    full = 0
+    count = 0
+    desyncs = 0
+    pending = b''
+
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+    # A daemon, so that an error here cannot leave us waiting on it at exit
+    process = multiprocessing.get_context('spawn').Process(target=viewer,
+        args=(listener.getsockname(),), daemon=True)
+    process.start()
+    sock = None
+    try:
+        sock, addr = listener.accept()
+        listener.close()
+        for frame in range(frames):
+            if wave.endCheck():
+                break
+            step(wave, pilot(wave, frame, rng))
+            snapshot = capture(wave, frame)
+            data = encoder.encode(snapshot)
+            sendMessage(sock, data)
+            sent += len(data)+4
+            full += len(encodeDelta(snapshot, None))+4
+            count += len(snapshot.entities)
+            ticks += 1
+            while select.select([sock], [], [], 0)[0]:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                pending += chunk
+                while len(pending) >= 8:
+                    ackframe, checksum = struct.unpack_from('<II', pending)
+                    pending = pending[8:]
+                    if not encoder.acknowledge(ackframe, checksum):
+                        desyncs += 1
+        sendMessage(sock, b'')
+    finally:
+        listener.close()
+        if sock is not None:
+            sock.close()
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    ticks = max(ticks, 1)
+    print('%s: %d ticks, %.1f entities/tick, %.1f bytes/tick delta vs %.1f full (%.0f%%), %d desyncs'
+        % (name, ticks, count/ticks, sent/ticks, full/ticks, 100*sent/max(full, 1), desyncs))
+
+
+if __name__ == '__main__':
+    import argparse
+    from headless import waveNames
+    parser = argparse.ArgumentParser(description='Measure state sync with a loopback viewer.')
+    parser.add_argument('waves', nargs='*', help='wave files in Data (default: all)')
+    parser.add_argument('--frames', type=int, default=1200, help='the most frames to play')
+    args = parser.parse_args()
+    for name in args.waves or waveNames():
+        measure(name, args.frames)
@@ -0,0 +1,181 @@
+"""
+Hierarchical timing wheel for Planetoids
+
+Cooldowns, lifetimes and timed effects are all countdowns in frames. Ticking every
+countdown down by one each frame costs time for every pending timer, every frame.
+A TimingWheel instead files each timer under the frame it expires on, so advancing
+a frame only looks at the timers that expire on it.
+
+The wheel has TIMER_LEVELS levels of TIMER_SLOTS slots. Level 0 holds the timers
+expiring in the next TIMER_SLOTS frames, one slot per frame. Each level above holds
+timers TIMER_SLOTS times further out, one slot per TIMER_SLOTS**level frames. When
+level 0 comes round to slot 0, the next slot of level 1 is emptied and its timers
+filed again lower down, and so on up the levels. Every timer is refiled at most
+once per level, so advancing costs O(1) per frame on average, however many timers
+are pending.
+
+Timers are named by keys rather than callbacks, so that a wheel can be copied along
+with the wave that owns it (see Wave.copy) and keep working on the copy. Scheduling a
+key that is already pending moves it; cancelled and moved timers are dropped lazily
+when their slot comes round.
+
+To compare with ticking a list of countdowns, run
+
+    python planetoids/timers.py
+
+from the root folder.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from consts import *
+import random
+import time
+
+
+class TimingWheel(object):
+    """
+    A hierarchical timing wheel of timers named by hashable keys.
+    """
+    # Attribute _now: the current frame
+    # Invariant: _now is an int >= 0
+    #
+    # Attribute _slots: the slots of each level
+    # Invariant: _slots is a list of TIMER_LEVELS lists of TIMER_SLOTS lists of
+    # (frame, key) pairs
+    #
+    # Attribute _pending: the frame each pending key expires on
+    # Invariant: _pending is a dict from keys to ints > _now
+
+    def __init__(self):
+        self._now = 0
+        self._slots = [[[] for _ in range(TIMER_SLOTS)] for _ in range(TIMER_LEVELS)]
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, key):
+        return key in self._pending
+
+    def copy(self):
+        """
+        Returns an independent copy of this wheel
+        """
+        copy = self.__class__.__new__(self.__class__)
+        copy._now = self._now
+        copy._slots = [[list(slot) for slot in level] for level in self._slots]
+        copy._pending = dict(self._pending)
+        return copy
+
+    def getNow(self):
+        """
+        Returns the current frame
+        """
+        return self._now
+
+    def schedule(self, key, frames):
+        """
+        Makes the timer key expire after the given number of frames.
+
+        If key is already pending, it is moved to the new frame.
+
+        Parameter key: The name of the timer
+        Precondition: key is hashable
+
+        Parameter frames: The frames until the timer expires
+        Precondition: frames is an int in 1..TIMER_SLOTS**TIMER_LEVELS-1
+        """
+        if frames < 1 or frames >= TIMER_SLOTS**TIMER_LEVELS:
+            raise ValueError('%d frames is outside the wheel' % frames)
+        frame = self._now+frames
+        self._pending[key] = frame
+        self._file(frame, key)
+
+    def cancel(self, key):
+        """
+        Stops the timer key, if it is pending
+        """
+        self._pending.pop(key, None)
+
+    def remaining(self, key):
+        """
+        Returns the frames until the timer key expires, or 0 if it is not pending
+        """
+        frame = self._pending.get(key)
+        return 0 if frame is None else frame-self._now
+
+    def advance(self):
+        """
+        Moves forward one frame and returns the list of keys that expire on it
+        """
+        self._now += 1
+        now = self._now
+        # Refile the next slot of each higher level whose turn has come
+        level = 1
+        while level < TIMER_LEVELS and now % TIMER_SLOTS**level == 0:
+            index = (now//TIMER_SLOTS**level) % TIMER_SLOTS
+            slot = self._slots[level][index]
+            self._slots[level][index] = []
+            for (frame, key) in slot:
+                if self._pending.get(key) == frame:
+                    self._file(frame, key)
+            level += 1
+        index = now % TIMER_SLOTS
+        slot = self._slots[0][index]
+        self._slots[0][index] = []
+        expired = []
+        for (frame, key) in slot:
+            if self._pending.get(key) == frame:
+                del self._pending[key]
+                expired.append(key)
+        return expired
+
+    def _file(self, frame, key):
+        """
+        Puts the timer key expiring on frame into the slot of the right level
+        """
+        delta = frame-self._now
+        level = 0
+        while delta >= TIMER_SLOTS**(level+1):
+            level += 1
+        self._slots[level][(frame//TIMER_SLOTS**level) % TIMER_SLOTS].append((frame, key))
+
+
+def bench(count, frames, seed=0):
+    """
+    Prints the cost per frame of count timers in a wheel, against ticking a list
+    """
+    rng = random.Random(seed)
+    delays = [rng.randrange(1, 20*SERVER_TICK_RATE) for _ in range(count)]
+
+    wheel = TimingWheel()
+    for k in range(count):
+        wheel.schedule(k, delays[k])
+    start = time.perf_counter()
+    fired = 0
+    for frame in range(frames):
+        for key in wheel.advance():
+            fired += 1
+            wheel.schedule(key, delays[key])
+    wheeling = time.perf_counter()-start
+
+    counters = list(delays)
+    start = time.perf_counter()
+    ticked = 0
+    for frame in range(frames):
+        for k in range(count):
+            counters[k] -= 1
+            if counters[k] == 0:
+                ticked += 1
+                counters[k] = delays[k]
+    ticking = time.perf_counter()-start
+
+    print('%6d timers, %d frames: wheel %.1fus per frame, countdowns %.1fus per frame '
+        '(%d and %d expiries)' % (count, frames, 1e6*wheeling/frames,
+        1e6*ticking/frames, fired, ticked))
+
+
+if __name__ == '__main__':
+    for count in (10, 1000, 100000):
+        bench(count, 1200)
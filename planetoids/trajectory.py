@@ -0,0 +1,447 @@
+"""
+Closed-form asteroid trajectories for Planetoids
+
+Until something hits it, an asteroid only ever moves along its velocity, wrapping
+around the dead zone as in Asteroid.move. Its position is therefore a function of
+time alone. Along one axis, with size the window size, m the wrap margin and v > 0,
+the asteroid starting at p0 first leaves the far edge on frame
+
+    n1 = floor((size+m-p0)/v) + 1
+
+where it is put back at -m. From then on it crosses the whole range every
+
+    period = floor((size+2m)/v) + 1
+
+frames, so on frame n >= n1 it is at -m + ((n-n1) % period)*v. Before n1 it is
+simply at p0 + n*v. Negative velocities are the mirror image of this.
+
+Trajectories stores asteroids as (spawn frame, origin, velocity) and only works out
+positions when they are asked for, for all asteroids at once or for a chosen few.
+Advancing time is a counter increment, so skipping frames, seeking to any frame
+and asteroids that nobody looks at cost nothing.
+
+A PathField is an EntityField that keeps its asteroids as Trajectories. Moving it
+only steps the bullets and advances the trajectories; the asteroid rows are brought
+up to date when the rows are asked for, or when there is a bullet that could hit
+them. A field without bullets therefore moves its asteroids for free.
+
+The closed form computes p0 + k*v with one multiplication instead of k additions,
+so it can differ from frame-by-frame stepping by rounding error (and, for an
+asteroid within rounding error of a wrap edge, by when it wraps). Waves keep
+stepping their models, and EntityField keeps stepping its rows, so that results
+stay exact where they are compared; a PathField is for the stress tools.
+
+To compare with stepping an EntityField every frame, run
+
+    python planetoids/trajectory.py
+
+from the root folder.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from consts import *
+from field import *
+import time
+
+
+def wrapAxis(p0, v, frames, size, margin):
+    """
+    Returns the positions along one axis after the given frames, as Asteroid.move
+    would put them there.
+
+    Parameter p0: The starting positions
+    Precondition: p0 is a float array. A position outside [-margin, size+margin]
+    (a piece broken off a larger asteroid near the edge) is put back in by its
+    first move, as in EntityField.move.
+
+    Parameter v: The velocities along the axis
+    Precondition: v is a float array of the same length as p0
+
+    Parameter frames: The frames moved so far
+    Precondition: frames is an int array (or int) >= 0
+
+    Parameter size: The window size along the axis
+    Precondition: size is a number > 0
+
+    Parameter margin: The wrap margins
+    Precondition: margin is a float array of the same length as p0
+    """
+    frames = np.broadcast_to(frames, p0.shape)
+    loose = ((p0 < -margin) | (p0 > size+margin)) & (frames > 0)
+    if loose.any():
+        step = p0+v
+        step = np.where(step < -margin, size+margin, np.where(step > size+margin,
+            -margin, step))
+        p0 = np.where(loose, step, p0)
+        frames = np.where(loose, frames-1, frames)
+    speed = np.abs(v)
+    moving = speed > 0
+    safe = np.where(moving, speed, 1)
+    # Distance to the edge the asteroid leaves by, and where it comes back in
+    ahead = np.where(v > 0, size+margin-p0, p0+margin)
+    first = np.floor(ahead/safe).astype(np.int64)+1
+    period = np.floor((size+2*margin)/safe).astype(np.int64)+1
+    entry = np.where(v > 0, -margin, size+margin)
+    wrapped = moving & (frames >= first) & (frames > 0)
+    laps = np.where(wrapped, (frames-first) % period, 0)
+    return np.where(wrapped, entry+laps*v, p0+frames*v)
+
+
+class Trajectories(object):
+    """
+    Asteroids stored as closed-form trajectories, evaluated lazily.
+
+    Entities are kept in columns: id, kind, spawn frame, origin and velocity. The
+    positions of the current frame are cached, so asking for them twice in one
+    frame costs nothing the second time.
+    """
+    # Attribute _ids, _kinds, _spawn: the id, kind number and spawn frame of each
+    # asteroid
+    # Invariant: each is an int64 array of the same length n
+    #
+    # Attribute _ox, _oy, _vx, _vy: the origin and velocity of each asteroid
+    # Invariant: each is a float array of length n
+    #
+    # Attribute _frame: the current frame
+    # Invariant: _frame is an int >= every spawn frame
+    #
+    # Attribute _width, _height: the size of the world
+    # Invariant: _width and _height are numbers > 0
+    #
+    # Attribute _cache: the positions at the current frame
+    # Invariant: _cache is a pair of float arrays of length n, or None if stale
+    #
+    # Attribute evaluated: the number of asteroid positions worked out so far
+    # Invariant: evaluated is an int >= 0
+
+    def __init__(self, width=GAME_WIDTH, height=GAME_HEIGHT):
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._kinds = np.zeros(0, dtype=np.int64)
+        self._spawn = np.zeros(0, dtype=np.int64)
+        self._ox = np.zeros(0)
+        self._oy = np.zeros(0)
+        self._vx = np.zeros(0)
+        self._vy = np.zeros(0)
+        self._frame = 0
+        self._width = width
+        self._height = height
+        self._cache = None
+        self.evaluated = 0
+
+    @classmethod
+    def fromField(cls, field):
+        """
+        Returns the trajectories of the asteroids of field, spawned at frame 0
+        """
+        width, height = field.getSize()
+        result = cls(width, height)
+        rows = field.getRows()
+        rows = rows[rows[:, KIND] >= SMALL]
+        result.add(rows[:, ID], rows[:, KIND], rows[:, X], rows[:, Y], rows[:, VX],
+            rows[:, VY])
+        return result
+
+    def __len__(self):
+        return len(self._ids)
+
+    def getFrame(self):
+        """
+        Returns the current frame
+        """
+        return self._frame
+
+    def advance(self, frames=1):
+        """
+        Moves time forward by the given number of frames, without moving anything
+        """
+        self.seek(self._frame+frames)
+
+    def seek(self, frame):
+        """
+        Jumps to the given frame, which may be in the past of the current frame
+        but not before any asteroid was spawned.
+        """
+        if len(self._spawn) and frame < self._spawn.max():
+            raise ValueError('frame %d is before an asteroid was spawned' % frame)
+        if frame != self._frame:
+            self._frame = frame
+            self._cache = None
+
+    def add(self, ids, kinds, x, y, vx, vy):
+        """
+        Adds asteroids at the given positions on the current frame
+
+        Parameter ids, kinds, x, y, vx, vy: The columns of the new asteroids
+        Precondition: each is an array (or number) of the same length, the
+        kinds are asteroid kinds, and the positions are inside the wrap margins
+        """
+        ids, kinds, x, y, vx, vy = np.broadcast_arrays(ids, kinds, x, y, vx, vy)
+        self._ids = np.concatenate([self._ids, ids.astype(np.int64)])
+        self._kinds = np.concatenate([self._kinds, kinds.astype(np.int64)])
+        self._spawn = np.concatenate([self._spawn, np.full(len(ids), self._frame)])
+        self._ox = np.concatenate([self._ox, x])
+        self._oy = np.concatenate([self._oy, y])
+        self._vx = np.concatenate([self._vx, vx])
+        self._vy = np.concatenate([self._vy, vy])
+        self._cache = None
+
+    def remove(self, mask):
+        """
+        Removes the asteroids whose entry in the boolean array mask is True
+        """
+        if mask.any():
+            self.take(~mask)
+
+    def positions(self, index=None):
+        """
+        Returns the arrays (x, y) of positions at the current frame.
+
+        Without an index this evaluates every asteroid (once per frame). With an
+        index it evaluates just those asteroids, which is cheaper for a few.
+
+        Parameter index: The asteroids to evaluate
+        Precondition: index is None or an int or bool array over the asteroids
+        """
+        if index is None:
+            if self._cache is None:
+                self._cache = self._evaluate(slice(None))
+            return self._cache
+        if not self._cache is None:
+            return (self._cache[0][index], self._cache[1][index])
+        return self._evaluate(index)
+
+    def getRows(self):
+        """
+        Returns the asteroids as EntityField rows at the current frame
+        """
+        x, y = self.positions()
+        return np.column_stack([self._ids, self._kinds, x, y, self._vx, self._vy])
+
+    def take(self, index):
+        """
+        Keeps only the asteroids at index, in that order
+
+        Parameter index: The asteroids to keep
+        Precondition: index is an int or bool array over the asteroids
+        """
+        for name in ('_ids', '_kinds', '_spawn', '_ox', '_oy', '_vx', '_vy'):
+            setattr(self, name, getattr(self, name)[index])
+        if not self._cache is None:
+            self._cache = (self._cache[0][index], self._cache[1][index])
+
+    def _evaluate(self, index):
+        """
+        Returns the positions (x, y) at the current frame of the asteroids at index
+        """
+        frames = self._frame-self._spawn[index]
+        margin = KIND_MARGINS[self._kinds[index]]
+        x = wrapAxis(self._ox[index], self._vx[index], frames, self._width, margin)
+        y = wrapAxis(self._oy[index], self._vy[index], frames, self._height, margin)
+        self.evaluated += len(x)
+        return (x, y)
+
+
+class PathField(EntityField):
+    """
+    An EntityField whose asteroids follow their closed-form trajectories.
+
+    The rows of the field are the same as those of an EntityField, but the
+    positions of the asteroid rows are only worked out when they are needed. This
+    pays off while there are few bullets or none: with bullets in every frame,
+    every asteroid is still evaluated every frame, and the closed form costs more
+    than a step.
+    """
+    # Attribute _paths: the trajectories of the asteroid rows
+    # Invariant: _paths is a Trajectories with the asteroid rows in row order
+    #
+    # Attribute _stale: whether the asteroid positions in _rows lag behind _paths
+    # Invariant: _stale is a bool
+
+    def __init__(self, rows=None, nextid=None, width=GAME_WIDTH, height=GAME_HEIGHT):
+        """
+        Creates a field from rows, as EntityField does
+        """
+        super().__init__(rows, nextid, width, height)
+        self._track()
+
+    def _track(self):
+        """
+        Helper to start the trajectories over from the current asteroid rows
+        """
+        width, height = self.getSize()
+        self._paths = Trajectories(width, height)
+        self._stale = False
+        rows = self._rows[self._rows[:, KIND] >= SMALL]
+        self._paths.add(rows[:, ID], rows[:, KIND], rows[:, X], rows[:, Y], rows[:, VX],
+            rows[:, VY])
+
+    def _catchUp(self):
+        """
+        Helper to write the current positions of the asteroids into their rows
+        """
+        if self._stale:
+            asteroid = self._rows[:, KIND] >= SMALL
+            x, y = self._paths.positions()
+            self._rows[asteroid, X] = x
+            self._rows[asteroid, Y] = y
+            self._stale = False
+
+    def getRows(self):
+        """
+        Returns the array of entity rows, with the asteroids where they are now.
+        It is not a copy.
+        """
+        self._catchUp()
+        return self._rows
+
+    def setRows(self, rows):
+        """
+        Replaces every row of the field with rows (which must keep their ids)
+        """
+        super().setRows(rows)
+        self._track()
+
+    def sortMorton(self, cell=FIELD_CELL):
+        """
+        Re-sorts the rows by the Morton key of their grid cell (see EntityField)
+        """
+        self._catchUp()
+        asteroid = self._rows[:, KIND] >= SMALL
+        # The trajectory of each old row, counted among the asteroid rows
+        rank = np.cumsum(asteroid)-1
+        order = super().sortMorton(cell)
+        self._paths.take(rank[order[asteroid[order]]])
+        return order
+
+    def addRows(self, rows):
+        """
+        Adds rows that already have their ids, starting the new asteroids on
+        their trajectories from the current frame
+        """
+        super().addRows(rows)
+        rows = rows[rows[:, KIND] >= SMALL]
+        if len(rows):
+            self._paths.add(rows[:, ID], rows[:, KIND], rows[:, X], rows[:, Y],
+                rows[:, VX], rows[:, VY])
+
+    def remove(self, mask):
+        """
+        Removes the entities whose entry in the boolean array mask is True
+        """
+        self._paths.remove(mask[self._rows[:, KIND] >= SMALL])
+        super().remove(mask)
+
+    def move(self):
+        """
+        Moves every bullet along its velocity, removing the bullets that are out,
+        and advances the asteroids one frame without working out where they are.
+        """
+        rows = self._rows
+        bullet = rows[:, KIND] == BULLET
+        rows[bullet, X] += rows[bullet, VX]
+        rows[bullet, Y] += rows[bullet, VY]
+        self.remove(bullet & ((rows[:, X] > self._width+DEAD_ZONE) |
+            (rows[:, Y] > self._height+DEAD_ZONE)))
+        self._paths.advance()
+        self._stale = True
+
+    def collide(self, ghosts=None):
+        """
+        Resolves every bullet-asteroid hit, as EntityField does.
+
+        The asteroids are only brought up to date if this field or the ghosts have
+        a bullet, as nothing can be hit otherwise.
+        """
+        bullets = (self._rows[:, KIND] == BULLET).any()
+        if not ghosts is None:
+            bullets = bullets or (ghosts[:, KIND] == BULLET).any()
+        if not bullets:
+            return 0
+        self._catchUp()
+        return super().collide(ghosts)
+
+
+def bench(count, frames, seed=0):
+    """
+    Prints the cost of stepping count asteroids for frames, against trajectories
+    """
+    scale = np.sqrt(count/PARTITION_DENSITY)
+    width, height = GAME_WIDTH*scale, GAME_HEIGHT*scale
+    field = EntityField.random(count, seed, width, height)
+    paths = Trajectories.fromField(field)
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        field.move()
+    stepping = time.perf_counter()-start
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        paths.advance()
+    x, y = paths.positions()
+    skipping = time.perf_counter()-start
+
+    rows = field.getRows()
+    error = np.maximum(np.abs(rows[:, X]-x), np.abs(rows[:, Y]-y))
+    late = (error > 1).sum()
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        paths.advance()
+        paths.positions()
+    every = (time.perf_counter()-start)/frames
+
+    screen = (x >= 0) & (x <= GAME_WIDTH) & (y >= 0) & (y <= GAME_HEIGHT)
+    start = time.perf_counter()
+    for frame in range(frames):
+        paths.advance()
+        paths.positions(screen)
+    visible = (time.perf_counter()-start)/frames
+
+    start = time.perf_counter()
+    paths.seek(paths.getFrame()+100000)
+    paths.positions()
+    seeking = time.perf_counter()-start
+
+    print('%d asteroids, %d frames: stepping %.1f ms, skip then evaluate %.2f ms; '
+        'per frame %.2f ms all, %.3f ms for the %d on screen; seek 100000 frames '
+        '%.2f ms; max error %.1e (%d wrapped a frame apart)' % (count, frames,
+        1000*stepping, 1000*skipping, 1000*every, 1000*visible, screen.sum(),
+        1000*seeking, error[error <= 1].max(), late))
+
+
+def benchField(count, frames, seed=0):
+    """
+    Prints the cost of stepping count asteroids as an EntityField and as a
+    PathField for frames, without bullets and with count/100 of them
+    """
+    scale = np.sqrt(count/PARTITION_DENSITY)
+    width, height = GAME_WIDTH*scale, GAME_HEIGHT*scale
+    for shots in (0, count//100):
+        rng = np.random.default_rng(seed)
+        angles = rng.uniform(0, 2*np.pi, shots)
+        bullets = (BULLET, rng.uniform(0, width, shots), rng.uniform(0, height, shots),
+            np.cos(angles)*BULLET_SPEED, np.sin(angles)*BULLET_SPEED)
+        times = []
+        fields = []
+        for kind in (EntityField, PathField):
+            field = kind(EntityField.random(count, seed, width, height).getRows(),
+                width=width, height=height)
+            field.add(*bullets)
+            start = time.perf_counter()
+            for frame in range(frames):
+                field.step()
+            times.append(time.perf_counter()-start)
+            fields.append(field)
+        print('%d asteroids, %d bullets, %d frames: EntityField %.1f ms, PathField '
+            '%.1f ms (%.1fx); score %d and %d, %d and %d entities left' % (count,
+            shots, frames, 1000*times[0], 1000*times[1], times[0]/times[1],
+            fields[0].score, fields[1].score, len(fields[0]), len(fields[1])))
+
+
+if __name__ == '__main__':
+    for count in (10000, 100000):
+        bench(count, 600)
+    for count in (10000, 100000):
+        benchField(count, 600)
@@ -0,0 +1,721 @@
+"""
+Two-player versus mode with rollback netcode for Planetoids
+
+This module lets two players on the same machine fly against each other from two
+processes, without input lag. VersusWave is a Wave with two ships: each player's
+bullets break asteroids (for points) and can destroy the other ship.
+
+Each process runs a RollbackSession. Every frame it simulates right away with the
+local input and a prediction of the remote input (the last remote input it has
+seen). Before each frame it keeps a snapshot made with Wave.copy. When a remote
+input arrives that differs from the prediction used for its frame, the session
+restores the snapshot of that frame and re-simulates the frames since, so the next
+draw shows the corrected state. A session never runs more than VERSUS_MAX_ROLLBACK
+frames past the last confirmed remote input; beyond that it waits.
+
+Once both inputs of a frame are known, the session checksums the state after that
+frame and sends it to the peer, which compares it with its own to detect desyncs.
+The session also measures the rollback depth and the cost of snapshots, restores
+and re-simulation.
+
+The peers exchange inputs over local UDP. To play, start two copies with
+
+    python planetoids/versus.py --player 0
+    python planetoids/versus.py --player 1
+
+from the root folder. To measure rollback without windows, add --bench (and maybe
+--delay and --jitter in milliseconds) to a single command; it runs both peers
+headless in two processes with random pilots and prints their reports.
+
+Lucas Casas lcc79, Borjan Jovanov bj262
+Oct 18, 2026
+"""
+from headless import *
+from golden import hashState
+import argparse
+import socket
+import struct
+import zlib
+
+
+class VersusWave(Wave):
+    """
+    A wave with two ships, one per player.
+
+    The first player starts where the wave JSON places the ship, and the second
+    starts at the opposite point of the screen, facing the other way. A destroyed
+    ship is restored at the start of the next frame if its player has lives left.
+    The wave is over when either player runs out of lives, or when no asteroids
+    are left.
+    """
+    # Attribute _ships: the ship of each player
+    # Invariant: _ships is a list of two elements, each a Ship or None
+    #
+    # Attribute _shots: the bullets fired by each player
+    # Invariant: _shots is a list of two lists of Bullet
+    #
+    # Attribute _lives, _score: as in Wave, but one per player
+    # Invariant: each is a list of two ints >= 0
+    #
+    # The fire cooldown of player p is the timer (FIRE_TIMER, p), and the bullet
+    # timers (BULLET_TIMER, id) cover the shots of both players
+    #
+    # Attribute _ship and _bullets from Wave are unused (None and empty)
+
+    def getLives(self, player=0):
+        """
+        returns the remaining lives of the given player
+        """
+        return self._lives[player]
+
+    def getScore(self, player=0):
+        """
+        returns the current score of the given player
+        """
+        return self._score[player]
+
+    def getState(self):
+        """
+        returns the full simulation state as a list of tuples, like Wave.getState,
+        but with counters and ships for both players.
+        """
+        state = []
+        for p in range(2):
+            state.append(('wave', self._lives[p], self._score[p],
+                self.getTimer((FIRE_TIMER, p))))
+        for ship in self._ships:
+            if not ship is None:
+                vel = ship.getVelocity()
+                state.append(('ship', ship.x, ship.y, ship.angle, vel.x, vel.y))
+        for i in self._asteroids:
+            vel = i.getVelocity()
+            state.append(('asteroid', i.getRadius(), i.x, i.y, vel.x, vel.y))
+        for shots in self._shots:
+            for i in shots:
+                vel = i.getVelocity()
+                state.append(('bullet', i.x, i.y, vel.x, vel.y))
+        return state
+
+    def copy(self):
+        """
+        returns an independent copy of this wave, including both players
+        """
+        copy = super().copy()
+        copy._ships = [None if s is None else s.copy() for s in self._ships]
+        copy._shots = [[i.copy() for i in shots] for shots in self._shots]
+        copy._lives = list(self._lives)
+        copy._score = list(self._score)
+        return copy
+
+    def __init__(self, level):
+        super().__init__(level)
+        self._ship = None
+        self._ships = [self.spawnShip(0), self.spawnShip(1)]
+        self._shots = [[], []]
+        self._lives = [SHIP_LIVES, SHIP_LIVES]
+        self._score = [0, 0]
+
+    def spawnShip(self, player):
+        """
+        Helper to create a new ship for the given player
+        """
+        data = self._data["ship"]
+        if player == 1:
+            data = {"position": [GAME_WIDTH-data["position"][0],
+                GAME_HEIGHT-data["position"][1]], "angle": data["angle"]+180}
+        return self.tagEntity(Ship(data))
+
+    def expire(self, key):
+        """
+        Helper for update, as in Wave, but a bullet timer removes the bullet
+        from the shots of either player.
+        """
+        if key[0] == BULLET_TIMER:
+            for shots in self._shots:
+                shots[:] = [i for i in shots if i.getIdent() != key[1]]
+
+    def update(self, inputs):
+        """
+        updates the wave one frame, given the input of each player (as a list
+        of two objects with the method is_key_down).
+        """
+        for key in self._timers.advance():
+            self.expire(key)
+        for p in range(2):
+            if self._ships[p] is None and self._lives[p] > 0:
+                self._ships[p] = self.spawnShip(p)
+            ship = self._ships[p]
+            if ship is None:
+                continue
+            if inputs[p].is_key_down('left'):
+                ship.addAngle(SHIP_TURN_RATE)
+            if inputs[p].is_key_down('right'):
+                ship.addAngle(-abs(SHIP_TURN_RATE))
+            ship.move(inputs[p].is_key_down('up'))
+            cooling = (FIRE_TIMER, p) in self._timers
+            if inputs[p].is_key_down('spacebar') and not cooling:
+                bullet = self.launch(Bullet(ship))
+                if not bullet is None:
+                    self._shots[p].append(bullet)
+                self.schedule((FIRE_TIMER, p), BULLET_RATE)
+        for i in self._asteroids:
+            i.move()
+        for shots in self._shots:
+            for i in shots:
+                i.move()
+
+        for p in range(2):
+            self.checkShotCollision(p)
+        for p in range(2):
+            self.checkVersusShipCollision(p)
+
+    def draw(self, view):
+        """
+        Draws the ships, asteroids and bullets to view
+        """
+        for ship in self._ships:
+            if not ship is None:
+                ship.draw(view)
+        for i in self._asteroids:
+            i.draw(view)
+        for shots in self._shots:
+            for i in shots:
+                i.draw(view)
+
+    def checkShotCollision(self, player):
+        """
+        Helper to check the bullets of player against the asteroids and the
+        other ship. At most one bullet hits something each frame, as in Wave.
+        """
+        other = self._ships[1-player]
+        for i in self._shots[player]:
+            bulletPoint = Point2(i.x, i.y)
+            if not other is None:
+                if bulletPoint.distance(Point2(other.x, other.y)) < SHIP_RADIUS+BULLET_RADIUS:
+                    self._shots[player].remove(i)
+                    self._timers.cancel((BULLET_TIMER, i.getIdent()))
+                    self._ships[1-player] = None
+                    self._lives[1-player] -= 1
+                    self._score[player] += VERSUS_KILL_SCORE
+                    return
+            for j in self._asteroids:
+                point = Point2(j.x, j.y)
+                if bulletPoint.distance(point) < BULLET_RADIUS + j.getRadius():
+                    if j.isExplosive():
+                        self.credit(player, self.detonate, j, i.getVelocity().normal())
+                    else:
+                        self.credit(player, self.breakUp, point,
+                            i.getVelocity().normal(), j.getSize())
+                        self._asteroids.remove(j)
+                    self._shots[player].remove(i)
+                    self._timers.cancel((BULLET_TIMER, i.getIdent()))
+                    return
+
+    def checkVersusShipCollision(self, player):
+        """
+        Helper to check the ship of player against the asteroids
+        """
+        ship = self._ships[player]
+        if ship is None:
+            return
+        shipPoint = Point2(ship.x, ship.y)
+        for i in self._asteroids:
+            if shipPoint.distance(Point2(i.x, i.y)) < SHIP_RADIUS + i.getRadius():
+                if ship.getVelocity().x == 0 and ship.getVelocity().y == 0:
+                    collision = ship.getFacing()
+                else:
+                    collision = ship.getVelocity().normal()
+                self._ships[player] = None
+                self._lives[player] -= 1
+                if i.isExplosive():
+                    self.credit(player, self.detonate, i, collision)
+                else:
+                    self.credit(player, self.breakUp, shipPoint, collision, i.getSize())
+                    self._asteroids.remove(i)
+                return
+
+    def credit(self, player, method, *args):
+        """
+        Helper to call breakUp or detonate with args, crediting the points to player.
+
+        In versus mode, blasts only destroy asteroids, not ships.
+        """
+        score = self._score
+        self._score = 0
+        method(*args)
+        score[player] += self._score
+        self._score = score
+
+    def pauseCheck(self):
+        """
+        versus mode never pauses; destroyed ships are restored automatically
+        """
+        return False
+
+    def endCheck(self):
+        """
+        returns True if either player is out of lives, or no asteroids are left
+        """
+        return self._lives[0] == 0 or self._lives[1] == 0 or self._asteroids == []
+
+
+def checksum(wave):
+    """
+    Returns the 32-bit checksum of the state of wave, for desync detection
+    """
+    return zlib.crc32(hashState(wave).encode())
+
+
+class RollbackSession(object):
+    """
+    The rollback state of one versus peer.
+
+    Frames are numbered from 0. Call addRemote as remote inputs arrive, and advance
+    once per displayed frame (if canAdvance allows it) with the local input.
+    """
+    # Attribute _wave: the wave being played
+    # Invariant: _wave is a VersusWave
+    #
+    # Attribute _local: the player number of this peer
+    # Invariant: _local is 0 or 1
+    #
+    # Attribute _frame: the next frame to simulate
+    # Invariant: _frame is an int >= 0
+    #
+    # Attribute _inputs: the known input masks of each player, by frame
+    # Invariant: _inputs is a list of two dictionaries of int to int
+    #
+    # Attribute _used: the remote mask that was used to simulate each frame
+    # Invariant: _used is a dictionary of int to int
+    #
+    # Attribute _confirmed: the last frame up to which all remote inputs are known
+    # Invariant: _confirmed is an int >= -1
+    #
+    # Attribute _rollback: the first frame that must be re-simulated
+    # Invariant: _rollback is an int < _frame, or None
+    #
+    # Attribute _snapshots: copies of the wave before each recent frame
+    # Invariant: _snapshots is a dictionary of int to VersusWave
+    #
+    # Attribute _checksums: the checksum after each recent frame
+    # Invariant: _checksums is a dictionary of int to int
+    #
+    # Attribute _final: the last frame whose checksum is final (both inputs known)
+    # Invariant: _final is an int >= -1
+    #
+    # Attribute _remotesums: checksums received from the peer, not yet compared
+    # Invariant: _remotesums is a dictionary of int to int
+    #
+    # Attribute _rollbacks: the number of rollbacks so far
+    # Invariant: _rollbacks is an int >= 0
+    #
+    # Attribute _depths: the number of frames re-simulated by each rollback
+    # Invariant: _depths is a list of _rollbacks ints > 0
+    #
+    # Attribute _resimTimes, _snapshotTimes, _restoreTimes: the seconds taken by
+    # each rollback, snapshot and restore
+    # Invariant: each is a list of floats >= 0
+    #
+    # Attribute _compared, _desyncs: the checksums compared with the peer, and
+    # how many of them differed
+    # Invariant: each is an int >= 0, and _desyncs <= _compared
+
+    def __init__(self, wave, local):
+        self._wave = wave
+        self._local = local
+        self._frame = 0
+        self._inputs = [{}, {}]
+        self._used = {}
+        self._confirmed = -1
+        self._rollback = None
+        self._snapshots = {}
+        self._checksums = {}
+        self._final = -1
+        self._remotesums = {}
+        self._rollbacks = 0
+        self._depths = []
+        self._resimTimes = []
+        self._snapshotTimes = []
+        self._restoreTimes = []
+        self._compared = 0
+        self._desyncs = 0
+
+    def getWave(self):
+        """
+        Returns the wave, in its state after the last simulated frame
+        """
+        return self._wave
+
+    def getFrame(self):
+        """
+        Returns the number of the next frame to simulate
+        """
+        return self._frame
+
+    def getLocalInputs(self, count):
+        """
+        Returns the pair (first frame, masks) of the last count local inputs
+        """
+        first = max(0, self._frame-count)
+        return (first, [self._inputs[self._local][f] for f in range(first, self._frame)])
+
+    def canAdvance(self):
+        """
+        Returns True if the session may simulate another frame without waiting
+        """
+        return self._frame-self._confirmed <= VERSUS_MAX_ROLLBACK
+
+    def addRemote(self, frame, mask):
+        """
+        Records the remote input mask for frame, scheduling a rollback if needed
+        """
+        inputs = self._inputs[1-self._local]
+        if frame in inputs or frame <= self._confirmed:
+            return
+        inputs[frame] = mask
+        if frame in self._used and self._used[frame] != mask:
+            self._rollback = frame if self._rollback is None else min(self._rollback, frame)
+        while self._confirmed+1 in inputs:
+            self._confirmed += 1
+
+    def addRemoteChecksum(self, frame, value):
+        """
+        Records the checksum the peer computed after frame, comparing it if possible
+        """
+        self._remotesums[frame] = value
+        self._compare()
+
+    def advance(self, mask):
+        """
+        Simulates the next frame with the local input mask.
+
+        Any pending rollback is resolved first. Returns the list of (frame, checksum)
+        pairs that became final and should be sent to the peer.
+        """
+        if not self._rollback is None:
+            self._resimulate()
+        frame = self._frame
+        self._inputs[self._local][frame] = mask
+        start = time.perf_counter()
+        self._snapshots[frame] = self._wave.copy()
+        self._snapshotTimes.append(time.perf_counter()-start)
+        self._simulate(frame)
+        self._frame += 1
+
+        # Forget everything that can no longer be rolled back to
+        for old in [f for f in self._snapshots if f < frame-VERSUS_MAX_ROLLBACK]:
+            del self._snapshots[old]
+            self._used.pop(old, None)
+        return self._finalize()
+
+    def getStats(self):
+        """
+        Returns a dictionary of the rollback counts and costs so far.
+
+        The keys are 'frames', 'rollbacks', 'compared' and 'desyncs' (ints), and
+        'depths', 'resims', 'snapshots' and 'restores' (lists with one value per
+        rollback, snapshot or restore; the times are in seconds). The lists are
+        copies.
+        """
+        return {'frames': self._frame, 'rollbacks': self._rollbacks,
+            'compared': self._compared, 'desyncs': self._desyncs,
+            'depths': list(self._depths), 'resims': list(self._resimTimes),
+            'snapshots': list(self._snapshotTimes), 'restores': list(self._restoreTimes)}
+
+    def report(self):
+        """
+        Returns a readable summary of the rollback costs so far
+        """
+        def mean(values):
+            return sum(values)/len(values) if values else 0.0
+        stats = self.getStats()
+        depths = stats['depths']
+        resims = stats['resims']
+        return ('%d frames, %d rollbacks (depth mean %.1f max %d), re-sim mean %.2fms '
+            'max %.2fms, snapshot %.0fus, restore %.0fus, %d checksums compared, %d desyncs'
+            % (stats['frames'], stats['rollbacks'], mean(depths), max(depths, default=0),
+            1000*mean(resims), 1000*max(resims, default=0),
+            1e6*mean(stats['snapshots']), 1e6*mean(stats['restores']),
+            stats['compared'], stats['desyncs']))
+
+    def _remoteMask(self, frame):
+        """
+        Returns the remote mask for frame: the real one if known, or a prediction
+        """
+        inputs = self._inputs[1-self._local]
+        if frame in inputs:
+            return inputs[frame]
+        return inputs.get(self._confirmed, 0)
+
+    def _simulate(self, frame):
+        """
+        Simulates frame from the current state of the wave
+        """
+        remote = self._remoteMask(frame)
+        self._used[frame] = remote
+        masks = [0, 0]
+        masks[self._local] = self._inputs[self._local][frame]
+        masks[1-self._local] = remote
+        if not self._wave.endCheck():
+            self._wave.update([KeyInput.forMask(m) for m in masks])
+        self._checksums[frame] = checksum(self._wave)
+
+    def _resimulate(self):
+        """
+        Restores the snapshot at the rollback frame and re-simulates up to now
+        """
+        first = self._rollback
+        self._rollback = None
+        start = time.perf_counter()
+        self._wave.restore(self._snapshots[first])
+        self._restoreTimes.append(time.perf_counter()-start)
+        for frame in range(first, self._frame):
+            if frame > first:
+                self._snapshots[frame] = self._wave.copy()
+            self._simulate(frame)
+        self._rollbacks += 1
+        self._depths.append(self._frame-first)
+        self._resimTimes.append(time.perf_counter()-start)
+
+    def _finalize(self):
+        """
+        Returns the newly final (frame, checksum) pairs, comparing them if possible
+        """
+        final = []
+        while self._final < min(self._confirmed, self._frame-1):
+            self._final += 1
+            final.append((self._final, self._checksums[self._final]))
+        for old in [f for f in self._checksums if f < self._final-VERSUS_MAX_ROLLBACK]:
+            del self._checksums[old]
+        self._compare()
+        return final
+
+    def _compare(self):
+        """
+        Compares the remote checksums for frames that are final here
+        """
+        for frame in [f for f in self._remotesums if f <= self._final]:
+            value = self._remotesums.pop(frame)
+            if frame in self._checksums:
+                self._compared += 1
+                if self._checksums[frame] != value:
+                    self._desyncs += 1
+
+
+class VersusLink(object):
+    """
+    The UDP connection between two versus peers on this machine.
+
+    Outgoing packets can be held back by an artificial delay and jitter, to test
+    rollback under latency. Input packets repeat the last VERSUS_REDUNDANCY inputs
+    so that a lost packet does not stall the peer.
+    """
+    # Attribute _sock: the UDP socket
+    # Invariant: _sock is a non-blocking socket bound to this peer's port
+    #
+    # Attribute _peer: the address of the other peer
+    # Invariant: _peer is a (host, port) pair
+    #
+    # Attribute _delay, _jitter: the artificial delay and its random spread in seconds
+    # Invariant: each is a float >= 0
+    #
+    # Attribute _outbox: the held packets, as (release time, data) pairs
+    # Invariant: _outbox is a list sorted by release time
+
+    def __init__(self, player, delay=0.0, jitter=0.0, seed=0):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind(('127.0.0.1', VERSUS_PORT+player))
+        self._sock.setblocking(False)
+        self._peer = ('127.0.0.1', VERSUS_PORT+1-player)
+        self._delay = delay
+        self._jitter = jitter
+        self._rng = random.Random(seed)
+        self._outbox = []
+
+    def sendInputs(self, first, masks):
+        """
+        Sends the masks of the consecutive frames starting at first
+        """
+        self._send(b'i'+struct.pack('<IB', first, len(masks))+bytes(masks))
+
+    def sendChecksum(self, frame, value):
+        """
+        Sends the checksum of the state after frame
+        """
+        self._send(b'c'+struct.pack('<II', frame, value))
+
+    def poll(self, session):
+        """
+        Sends any held packets that are due, and feeds received ones to session
+        """
+        now = time.monotonic()
+        while self._outbox and self._outbox[0][0] <= now:
+            self._transmit(self._outbox.pop(0)[1])
+        while True:
+            try:
+                data = self._sock.recv(512)
+            except (BlockingIOError, ConnectionRefusedError):
+                return
+            if data[:1] == b'i':
+                first, count = struct.unpack_from('<IB', data, 1)
+                for k in range(count):
+                    session.addRemote(first+k, data[6+k])
+            elif data[:1] == b'c':
+                session.addRemoteChecksum(*struct.unpack_from('<II', data, 1))
+
+    def close(self):
+        """
+        Closes the socket
+        """
+        self._sock.close()
+
+    def _send(self, data):
+        """
+        Sends data now, or holds it back if there is an artificial delay
+        """
+        if self._delay == 0 and self._jitter == 0:
+            self._transmit(data)
+            return
+        release = time.monotonic()+self._delay+self._rng.uniform(0, self._jitter)
+        self._outbox.append((release, data))
+        self._outbox.sort(key=lambda item: item[0])
+
+    def _transmit(self, data):
+        """
+        Sends data to the peer, ignoring a peer that is not listening yet
+        """
+        try:
+            self._sock.sendto(data, self._peer)
+        except ConnectionRefusedError:
+            pass
+
+
+def exchange(session, link, mask):
+    """
+    Advances session one frame with the local mask and sends the results on link
+    """
+    for (frame, value) in session.advance(mask):
+        link.sendChecksum(frame, value)
+    link.sendInputs(*session.getLocalInputs(VERSUS_REDUNDANCY))
+
+
+def benchPeer(player, name, frames, delay, jitter, results):
+    """
+    Plays one headless peer of a benchmark at 60 frames a second.
+
+    The peer uses a random pilot, and puts its report on the queue results.
+    """
+    bootstrap()
+    session = RollbackSession(VersusWave(loadWave(name)), player)
+    link = VersusLink(player, delay, jitter, player)
+    pilot = RandomPilot()
+    rng = random.Random(player)
+    period = 1/60
+    deadline = time.monotonic()
+    stalls = 0
+    while session.getFrame() < frames:
+        link.poll(session)
+        if session.canAdvance():
+            exchange(session, link, pilot(None, session.getFrame(), rng))
+        else:
+            stalls += 1
+        deadline += period
+        time.sleep(max(0, deadline-time.monotonic()))
+    # Keep answering for a moment so the other peer can confirm its last frames
+    end = time.monotonic()+0.5
+    while time.monotonic() < end:
+        link.poll(session)
+        time.sleep(period)
+    link.close()
+    results.put('player %d: %s, %d stalled frames' % (player, session.report(), stalls))
+
+
+class VersusApp(GameApp):
+    """
+    The game window for one player of a versus match.
+    """
+    # Attribute _player: the player number of this window
+    # Invariant: _player is 0 or 1
+    #
+    # Attribute _wave: the wave file the match is played on
+    # Invariant: _wave is a string naming a JSON file in Data
+    #
+    # Attribute _session: the rollback session of this player
+    # Invariant: _session is a RollbackSession
+    #
+    # Attribute _link: the connection to the other player
+    # Invariant: _link is a VersusLink
+    #
+    # Attribute _status: the label showing the scores and lives
+    # Invariant: _status is a GBitmapLabel
+
+    def __init__(self, player=0, wave=DEFAULT_WAVE, **keywords):
+        """
+        Creates the window for the given player, with the keywords of GameApp
+
+        Parameter player: The player number of this window
+        Precondition: player is 0 or 1
+
+        Parameter wave: The wave file to play
+        Precondition: wave is a string naming a JSON file in Data
+        """
+        assert player in (0, 1), 'player %s is not 0 or 1' % repr(player)
+        self._player = player
+        self._wave = wave
+        GameApp.__init__(self, **keywords)
+
+    def start(self):
+        """
+        Creates the versus wave, session and link
+        """
+        self._session = RollbackSession(VersusWave(self.load_json(self._wave)), self._player)
+        self._link = VersusLink(self._player)
+        self._status = GBitmapLabel(text='', font_size=MESSAGE_SIZE/2, font_name=MESSAGE_FONT)
+        self._status.top = self.height
+        self._status.left = 0
+
+    def update(self, dt):
+        """
+        Advances the match one frame if the remote player is not too far behind
+        """
+        self._link.poll(self._session)
+        wave = self._session.getWave()
+        if self._session.canAdvance() and not wave.endCheck():
+            exchange(self._session, self._link, readMask(self.input))
+        self._status.text = 'P1 %d (%d)   P2 %d (%d)' % (wave.getScore(0),
+            wave.getLives(0), wave.getScore(1), wave.getLives(1))
+
+    def draw(self):
+        """
+        Draws the latest (possibly re-simulated) state of the match
+        """
+        self._session.getWave().draw(self.view)
+        self._status.draw(self.view)
+
+
+if __name__ == '__main__':
+    import multiprocessing
+    parser = argparse.ArgumentParser(description='Play or benchmark versus mode.')
+    parser.add_argument('--player', type=int, default=0, choices=(0, 1),
+        help='the player number of this window')
+    parser.add_argument('--wave', default='wave1.json', help='wave file in Data')
+    parser.add_argument('--bench', action='store_true', help='run both peers headless')
+    parser.add_argument('--frames', type=int, default=600, help='frames to benchmark')
+    parser.add_argument('--delay', type=float, default=50, help='benchmark delay in ms')
+    parser.add_argument('--jitter', type=float, default=30, help='benchmark jitter in ms')
+    args = parser.parse_args()
+
+    if args.bench:
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        peers = [context.Process(target=benchPeer, args=(p, args.wave, args.frames,
+            args.delay/1000, args.jitter/1000, results)) for p in range(2)]
+        for p in peers:
+            p.start()
+        for p in peers:
+            print(results.get(timeout=args.frames/60+60))
+        for p in peers:
+            p.join()
+    else:
+        VersusApp(args.player, args.wave, width=GAME_WIDTH, height=GAME_HEIGHT,
+            fps=GAME_FPS).run()
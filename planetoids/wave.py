@@ -19,13 +19,26 @@ Dec 8, 2022
 from game2d import *
 from consts import *
 from models import *
+from timers import TimingWheel
 import random
 import datetime
+import numpy as np
 
 # PRIMARY RULE: Wave can only access attributes in models.py via getters/setters
 # Level is NOT allowed to access anything in app.py (Subcontrollers are not permitted
 # to access anything in their parent. To see why, take CS 3152)
 
+# The collision tests of a wave, in the order they run: the two layers tested and
+# the method testing them. A test is skipped if LAYER_MASKS says its layers do not
+# collide.
+COLLISION_PASS = ((LAYER_BULLET, LAYER_ASTEROID, 'checkBulletCollision'),
+    (LAYER_SHIP, LAYER_ASTEROID, 'checkShipCollision'))
+
+# The timer key of the cooldown between shots
+FIRE_TIMER = 'fire'
+# The first part of the timer key (BULLET_TIMER, id) that removes the bullet id
+BULLET_TIMER = 'bullet'
+
 class Wave(object):
     """
     This class controls a single level or wave of Planetoids.
@@ -68,19 +81,61 @@ class Wave(object):
     # Attribute _lives: the number of lives left 
     # Invariant: _lives is an int >= 0
     #
-    # Attribute _firerate: the number of frames until the player can fire again 
-    # Invariant: _firerate is an int >= 0
+    # Attribute _timers: the cooldowns and timed effects of the wave, one frame
+    # per update. The timer FIRE_TIMER runs until the player can fire again, and
+    # each bullet has a timer (BULLET_TIMER, id) that runs until it is out.
+    # Invariant: _timers is a TimingWheel
     #
     # Attribute _score: the users current score
     # Invarient: _score is an int >= 0
+    #
+    # Attribute _nextid: the id number to give the next ship, asteroid or bullet
+    # Invariant: _nextid is an int greater than the id of every entity so far
+    #
+    # Attribute _publisher: where to export the state after every update
+    # Invariant: _publisher is an object with a method publish(wave), or None
+    #
+    # Attribute _collisions: the pairs tested and hit so far by each collision test
+    # Invariant: _collisions is a dict from layer pairs to (tested, hit) int pairs
+    #
+    # Attribute _effects: the particle effects, which are not part of the wave state
+    # Invariant: _effects is an Effects object, or None for no effects
     
     def resetShip(self):
         """ 
         Creates a new ship object. This helper is called when
         app state continues after a death if lives remain.
         """
-        self._ship = Ship(self._data["ship"])
+        self._ship = self.tagEntity(Ship(self._data["ship"]))
+
+    def tagEntity(self, entity):
+        """ 
+        Helper to give a new ship, asteroid or bullet the next unused id
+        number. Returns the entity, so that it can be used inline.
+        """
+        entity.setIdent(self._nextid)
+        self._nextid += 1
+        return entity
     
+    def setPublisher(self, publisher):
+        """
+        Makes the wave export its state to publisher (such as a StatePublisher
+        from shared.py) at the end of every update. None stops the export.
+        """
+        self._publisher = publisher
+
+    def setEffects(self, effects):
+        """
+        sets the particle effects that breakups and thrust spawn, or None for none
+        """
+        self._effects = effects
+
+    def getEffects(self):
+        """
+        returns the particle effects of this wave, or None if it has none
+        """
+        return self._effects
+
     def getLives(self):
         """ 
         returns the remaining lives of the player
@@ -92,18 +147,139 @@ class Wave(object):
         returns the current game score
         """
         return self._score
-    
+
+    def getCollisions(self):
+        """
+        returns a dict from each pair of collision layers to the number of
+        entity pairs tested for it and the number that hit, over all updates.
+        """
+        return dict(self._collisions)
+
+    def getTimer(self, key):
+        """
+        returns the number of frames left on the timer key, or 0 if it is not
+        running.
+        """
+        return self._timers.remaining(key)
+
+    def schedule(self, key, frames):
+        """
+        starts (or restarts) the timer key to run out after the given number
+        of updates. Timers that run out are passed to expire.
+        """
+        self._timers.schedule(key, frames)
+
+    def expire(self, key):
+        """
+        Helper for update, called for each timer key that runs out. A bullet
+        timer removes its bullet. Cooldowns such as FIRE_TIMER are only read
+        through getTimer, so nothing happens for them here.
+        """
+        # The first letter of FIRE_TIMER is never BULLET_TIMER
+        if key[0] == BULLET_TIMER:
+            self._bullets[:] = [i for i in self._bullets if i.getIdent() != key[1]]
+
+    def launch(self, bullet):
+        """
+        Helper to give a new bullet its id number and the timer that removes it.
+        Returns the bullet, or None if its first move already takes it out.
+
+        A bullet fired this frame makes its first move this frame, and is out
+        (see Bullet.isOut) on the move given by getLifetime. Its timer runs out
+        at the start of the update that would make that move, so it is never
+        on screen out of bounds, and no update has to check every bullet.
+        """
+        self.tagEntity(bullet)
+        life = bullet.getLifetime()
+        if not life is None and life <= 1:
+            return None
+        # A bullet that is out in more frames than the wheel holds is never removed
+        if not life is None and life-1 < TIMER_SLOTS**TIMER_LEVELS:
+            self.schedule((BULLET_TIMER, bullet.getIdent()), life-1)
+        return bullet
+
+    def getState(self):
+        """
+        returns the full simulation state as a list of tuples, one per entity.
+        The first tuple holds the wave counters, followed by the ship (if alive),
+        the asteroids and the bullets, in that order. Each tuple starts with the
+        entity kind; the remaining values are numbers.
+        """
+        state = [('wave', self._lives, self._score, self.getTimer(FIRE_TIMER))]
+        if not self._ship is None:
+            vel = self._ship.getVelocity()
+            state.append(('ship', self._ship.x, self._ship.y, self._ship.angle,
+                vel.x, vel.y))
+        for i in self._asteroids:
+            vel = i.getVelocity()
+            state.append(('asteroid', i.getRadius(), i.x, i.y, vel.x, vel.y))
+        for i in self._bullets:
+            vel = i.getVelocity()
+            state.append(('bullet', i.x, i.y, vel.x, vel.y))
+        return state
+
+    def getEntities(self):
+        """
+        returns a list of (id, kind, x, y, vx, vy, angle) tuples, one for the
+        ship (if alive) and each asteroid and bullet. The kind is 'ship',
+        'bullet' or the asteroid size.
+        """
+        entities = []
+        if not self._ship is None:
+            vel = self._ship.getVelocity()
+            entities.append((self._ship.getIdent(), 'ship', self._ship.x,
+                self._ship.y, vel.x, vel.y, self._ship.angle))
+        for i in self._asteroids:
+            vel = i.getVelocity()
+            entities.append((i.getIdent(), i.getSize(), i.x, i.y, vel.x, vel.y, 0))
+        for i in self._bullets:
+            vel = i.getVelocity()
+            entities.append((i.getIdent(), 'bullet', i.x, i.y, vel.x, vel.y, 0))
+        return entities
+
+    def copy(self):
+        """
+        returns an independent copy of this wave, for searching ahead or
+        rolling back. The models are copied without rebuilding their images,
+        so this is much cheaper than creating a new Wave from the JSON data.
+        """
+        copy = self.__class__.__new__(self.__class__)
+        copy.__dict__.update(self.__dict__)
+        copy._ship = None if self._ship is None else self._ship.copy()
+        copy._asteroids = [i.copy() for i in self._asteroids]
+        copy._bullets = [i.copy() for i in self._bullets]
+        copy._publisher = None
+        copy._effects = None
+        copy._collisions = dict(self._collisions)
+        copy._timers = self._timers.copy()
+        return copy
+
+    def restore(self, snapshot):
+        """
+        rolls this wave back to the state of snapshot, a wave returned by
+        copy(). The snapshot is left untouched, so it can be restored again.
+        """
+        publisher = self._publisher
+        effects = self._effects
+        self.__dict__.update(snapshot.copy().__dict__)
+        self._publisher = publisher
+        self._effects = effects
+
     def __init__(self, level):
         self._data = level
-        self._ship = Ship(self._data["ship"])
+        self._nextid = 0
+        self._ship = self.tagEntity(Ship(self._data["ship"]))
         self._asteroids = []
         for i in range(len(self._data["asteroids"])):
-            asteroid = Asteroid(self._data["asteroids"][i])
+            asteroid = self.tagEntity(Asteroid(self._data["asteroids"][i]))
             self._asteroids.append(asteroid)
         self._bullets = []
-        self._firerate = 0
+        self._timers = TimingWheel()
         self._lives = SHIP_LIVES
         self._score = 0
+        self._publisher = None
+        self._collisions = {}
+        self._effects = None
     
     def update(self, input):
         """ 
@@ -113,43 +289,48 @@ class Wave(object):
         """
         if self._ship is None:
             return
-        if self._firerate > 0:
-            self._firerate -= 1
+        for key in self._timers.advance():
+            self.expire(key)
+        if not self._effects is None:
+            self._effects.update()
         if input.is_key_down('left'):
             self._ship.addAngle(SHIP_TURN_RATE)
         if input.is_key_down('right'):
             self._ship.addAngle(-abs(SHIP_TURN_RATE))
         if input.is_key_down('up'):
             self._ship.move(True)
+            if not self._effects is None:
+                self._effects.thrust(self._ship)
         else:
             self._ship.move(False)
         for i in self._asteroids:
             i.move()
         
         if input.is_key_down('spacebar'):
-            if self._firerate == 0:
-                newbullet = Bullet(self._ship)
-                self._bullets.append(newbullet)
-                self._firerate = BULLET_RATE
+            if not FIRE_TIMER in self._timers:
+                newbullet = self.launch(Bullet(self._ship))
+                if not newbullet is None:
+                    self._bullets.append(newbullet)
+                self.schedule(FIRE_TIMER, BULLET_RATE)
         
         for i in self._bullets:
             i.move()
-        i = 0
-        while i < len(self._bullets):
-            if self._bullets[i].isOut():
-                del self._bullets[i]
-            else:
-                i += 1
-
-        self.checkBulletCollision()
-        self.checkShipCollision()
+
+        self.collide()
         self.endCheck()
         self.pauseCheck()
+        if not self._publisher is None:
+            self._publisher.publish(self)
     
     def draw(self, view):
         """ 
         Draws the wave objects to view
+
+        Objects entirely off screen are culled by the view (see GView.cull), so they
+        cost nothing to render.
         """
+        if not self._effects is None:
+            self._effects.draw(view)
         if self._ship is None:
             return
         self._ship.draw(view)
@@ -158,11 +339,42 @@ class Wave(object):
         for i in self._bullets:
             i.draw(view)
     
+    def layerSize(self, layer):
+        """
+        returns the number of entities on the given collision layer
+        """
+        if layer == LAYER_SHIP:
+            return 0 if self._ship is None else 1
+        if layer == LAYER_BULLET:
+            return len(self._bullets)
+        if layer == LAYER_ASTEROID:
+            return len(self._asteroids)
+        return 0
+
+    def collide(self):
+        """
+        runs the tests of COLLISION_PASS for the layers that collide, skipping
+        those with an empty layer, and counts the pairs each test covers.
+        """
+        for (first, second, check) in COLLISION_PASS:
+            if not LAYER_MASKS[first] & second:
+                continue
+            tested = self.layerSize(first)*self.layerSize(second)
+            if tested == 0:
+                continue
+            hit = getattr(self, check)()
+            total = self._collisions.get((first, second), (0, 0))
+            self._collisions[(first, second)] = (total[0]+tested, total[1]+int(hit))
+
     def checkShipCollision(self):
         """ 
         Helper function to check if the ship has collided with an asteroid.
-        If so, handles image removal and lives.
+        If so, handles image removal and lives. Returns True if it has.
+
+        The ship may already be gone this frame, destroyed by a blast.
         """
+        if self._ship is None:
+            return False
         shipPoint = Point2(self._ship.x, self._ship.y)
         for i in self._asteroids:
             other = Point2(i.x, i.y)
@@ -172,16 +384,22 @@ class Wave(object):
                     collision = self._ship.getFacing()
                 else:
                     collision = self._ship.getVelocity().normal()
-                self.breakUp(shipPoint, collision, i.getSize())
-                self._asteroids.remove(i)
+                if not self._effects is None:
+                    self._effects.explode(self._ship.x, self._ship.y, MEDIUM_ASTEROID)
                 self._ship = None
                 self._lives -=1
-                return
+                if i.isExplosive():
+                    self.detonate(i, collision)
+                else:
+                    self.breakUp(shipPoint, collision, i.getSize())
+                    self._asteroids.remove(i)
+                return True
+        return False
 
     def checkBulletCollision(self):
         """ 
         Helper function to check if a bullet has collided with an asteroid.
-        If so, deletes both images.
+        If so, deletes both images. Returns True if one has.
         """
         for i in self._bullets:
             bulletPoint = Point2(i.x, i.y)
@@ -190,16 +408,23 @@ class Wave(object):
                 distance = bulletPoint.distance(other)
                 if distance < BULLET_RADIUS + j.getRadius():
                     collision = i.getVelocity().normal()
-                    self.breakUp(other, collision, j.getSize())
-                    self._asteroids.remove(j)
+                    if j.isExplosive():
+                        self.detonate(j, collision)
+                    else:
+                        self.breakUp(other, collision, j.getSize())
+                        self._asteroids.remove(j)
                     self._bullets.remove(i)
-                    return
+                    self._timers.cancel((BULLET_TIMER, i.getIdent()))
+                    return True
+        return False
 
     def breakUp(self, point, collision, size):
         """ 
         Helper to checkBulletCollision(). handles score and breaking up
         larger asteroids into smaller counterparts.
         """
+        if not self._effects is None:
+            self._effects.explode(point.x, point.y, size)
         if size == "small":
             self._score += 20
             return
@@ -211,17 +436,85 @@ class Wave(object):
             collision.x*math.sin(rad) + collision.y*math.cos(rad))
         if size == "medium":
             self._score += 10
-            a1 = Asteroid({"size": "small", "position": [point.x, point.y], "direction": [collision.x, collision.y]})
-            a2 = Asteroid({"size": "small", "position": [point.x, point.y], "direction": [vector1.x, vector1.y]})
-            a3 = Asteroid({"size": "small", "position": [point.x, point.y], "direction": [vector2.x, vector2.y]})
-            self._asteroids = self._asteroids + [a1, a2, a3]
+            a1 = self.tagEntity(Asteroid({"size": "small", "position": [point.x, point.y], "direction": [collision.x, collision.y]}))
+            a2 = self.tagEntity(Asteroid({"size": "small", "position": [point.x, point.y], "direction": [vector1.x, vector1.y]}))
+            a3 = self.tagEntity(Asteroid({"size": "small", "position": [point.x, point.y], "direction": [vector2.x, vector2.y]}))
+            self._asteroids.extend([a1, a2, a3])
 
         if size == "large":
             self._score += 5
-            a1 = Asteroid({"size": "medium", "position": [point.x, point.y], "direction": [collision.x, collision.y]})
-            a2 = Asteroid({"size": "medium", "position": [point.x, point.y], "direction": [vector1.x, vector1.y]})
-            a3 = Asteroid({"size": "medium", "position": [point.x, point.y], "direction": [vector2.x, vector2.y]})
-            self._asteroids = self._asteroids + [a1, a2, a3]
+            a1 = self.tagEntity(Asteroid({"size": "medium", "position": [point.x, point.y], "direction": [collision.x, collision.y]}))
+            a2 = self.tagEntity(Asteroid({"size": "medium", "position": [point.x, point.y], "direction": [vector1.x, vector1.y]}))
+            a3 = self.tagEntity(Asteroid({"size": "medium", "position": [point.x, point.y], "direction": [vector2.x, vector2.y]}))
+            self._asteroids.extend([a1, a2, a3])
+
+    def detonate(self, first, collision):
+        """ 
+        Helper to destroy the explosive asteroid first, hit in the direction
+        collision, together with everything its blast reaches.
+
+        The blast destroys every asteroid within EXPLOSIVE_RADIUS (plus the radius
+        of that asteroid), and the ship if it is within reach. Explosive asteroids
+        caught in the blast explode in turn. The whole chain is worked out with
+        array operations, one ring of explosions at a time, and the pieces of all
+        the destroyed asteroids are added in a single pass at the end. Each one
+        breaks up as in breakUp, heading away from the explosion that caught it.
+        """
+        asteroids = self._asteroids
+        pos = np.array([(a.x, a.y) for a in asteroids])
+        reach = EXPLOSIVE_RADIUS+np.array([a.getRadius() for a in asteroids])
+        explosive = np.array([a.isExplosive() for a in asteroids])
+        start = asteroids.index(first)
+        destroyed = np.zeros(len(asteroids), dtype=bool)
+        destroyed[start] = True
+        dirs = np.zeros((len(asteroids), 2))
+        dirs[start] = (collision.x, collision.y)
+        frontier = np.array([start])
+        while len(frontier):
+            offsets = pos[np.newaxis, :, :]-pos[frontier, np.newaxis, :]
+            inside = ((offsets**2).sum(axis=2) < reach**2) & ~destroyed
+            new = np.flatnonzero(inside.any(axis=0))
+            away = offsets[inside.argmax(axis=0)[new], new]
+            length = np.hypot(away[:, 0], away[:, 1])
+            away[length == 0] = (collision.x, collision.y)
+            length[length == 0] = 1
+            dirs[new] = away/length[:, np.newaxis]
+            destroyed[new] = True
+            frontier = new[explosive[new]]
+
+        centers = pos[destroyed & explosive]
+        if not self._ship is None:
+            near = np.hypot(centers[:, 0]-self._ship.x, centers[:, 1]-self._ship.y)
+            if (near < EXPLOSIVE_RADIUS+SHIP_RADIUS).any():
+                if not self._effects is None:
+                    self._effects.explode(self._ship.x, self._ship.y, MEDIUM_ASTEROID)
+                self._ship = None
+                self._lives -= 1
+
+        # Pieces are copies of one plain asteroid per size, as that is much cheaper
+        pieces = []
+        sizes = {LARGE_ASTEROID: MEDIUM_ASTEROID, MEDIUM_ASTEROID: SMALL_ASTEROID}
+        models = {}
+        points = {SMALL_ASTEROID: 20, MEDIUM_ASTEROID: 10, LARGE_ASTEROID: 5}
+        index = np.flatnonzero(destroyed)
+        rad = degToRad(np.array([0, 120, 240]))
+        cos = np.cos(rad)[:, np.newaxis]
+        sin = np.sin(rad)[:, np.newaxis]
+        turned = np.stack([dirs[index, 0]*cos-dirs[index, 1]*sin,
+            dirs[index, 0]*sin+dirs[index, 1]*cos], axis=2)
+        for k in range(len(index)):
+            size = asteroids[index[k]].getSize()
+            self._score += points[size]
+            if not self._effects is None:
+                self._effects.explode(pos[index[k], 0], pos[index[k], 1], size)
+            if size in sizes:
+                if not sizes[size] in models:
+                    models[sizes[size]] = Asteroid({"size": sizes[size],
+                        "position": [0, 0], "direction": [1, 0]})
+                for d in turned[:, k]:
+                    pieces.append(self.tagEntity(models[sizes[size]].copyAt(
+                        pos[index[k]].tolist(), d.tolist())))
+        self._asteroids = [asteroids[k] for k in np.flatnonzero(~destroyed)]+pieces
 
     def pauseCheck(self):
         """ 
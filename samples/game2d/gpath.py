@@ -102,6 +102,13 @@ class GPath(GObject):
     On the other hand, the attributes ``x`` and ``y`` are used.  By default, these values
     are 0.  However, if they are nonzero, then Python will add them to all of the points
     in the path, shifting the path accordingly.
+    
+    Setting ``points`` rebuilds the line from scratch.  To grow a path a point at a time,
+    as with a stroke that follows the mouse, use :meth:`append` (or :meth:`extend`) and 
+    :meth:`truncate` instead.  They change the points of the Kivy line in place, so the
+    cost of a change does not depend on the length of the path.  If ``capacity`` is set,
+    appending past that many points drops the oldest ones, which makes a trail of fixed 
+    length.
     """
     
     # MUTABLE PROPERTIES
@@ -113,15 +120,37 @@ class GPath(GObject):
         **Invariant**: Must be a sequence (list or tuple) of int or float. 
         The length of this sequence must be even with length at least 4.
         """
-        return self._points
+        return tuple(self._points)
     
     @points.setter
     def points(self,value):
         assert is_point_tuple(value,2),'value %s is not a valid list of points' %  repr(value)
-        self._points = tuple(value)
+        self._points = list(value)
+        if not self._capacity is None and len(self._points) > 2*self._capacity:
+            del self._points[:len(self._points)-2*self._capacity]
         if self._defined:
             self._reset()
     
+    @property
+    def capacity(self):
+        """
+        The most points this path keeps, or None for no limit.
+        
+        When :meth:`append` or :meth:`extend` takes the path past this many points, the 
+        oldest points are dropped.
+        
+        **Invariant**: Must be None or an int >= 2.
+        """
+        return self._capacity
+    
+    @capacity.setter
+    def capacity(self,value):
+        assert value is None or type(value) == int, 'value %s is not an int' % repr(value)
+        assert value is None or value >= 2, 'value %s is less than 2' % repr(value)
+        self._capacity = value
+        if not value is None and self._defined and len(self._points) > 2*value:
+            self._drop(len(self._points)//2-value)
+    
     @property
     def linewidth(self):
         """
@@ -183,12 +212,15 @@ class GPath(GObject):
         
         This class supports the same keywords as :class:`GObject`, though some of them 
         are unused, as the ``width`` and ``height`` attributes are now immutable. The 
-        primary keywords for this class are ``points``, ``linecolor``, and ``linewidth``.
+        primary keywords for this class are ``points``, ``linecolor``, ``linewidth`` and
+        ``capacity``.
         
         :param keywords: dictionary of keyword arguments 
         :type keywords:  keys are attribute names
         """
         self._defined = False
+        self._line = None
+        self.capacity = keywords['capacity'] if 'capacity' in keywords else None
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 1.0
         self.points = keywords['points'] if 'points' in keywords else (0,0,10,10)
         if not 'linecolor' in keywords:
@@ -199,6 +231,61 @@ class GPath(GObject):
     
     
     # PUBLIC METHODS
+    def append(self,x,y):
+        """
+        Adds a point to the end of this path.
+        
+        The point is added to the Kivy line in place, and the oldest point is dropped if
+        the path is already at its ``capacity``.
+        
+        :param x: the horizontal coordinate of the point
+        :type x:  ``int`` or ``float``
+        
+        :param y: the vertical coordinate of the point
+        :type y:  ``int`` or ``float``
+        """
+        self.extend((x,y))
+    
+    def extend(self,points):
+        """
+        Adds points to the end of this path.
+        
+        The points are added to the Kivy line in place, and the oldest points are 
+        dropped if that takes the path past its ``capacity``.
+        
+        :param points: the points to add
+        :type points:  an even sequence (list or tuple) of int or float
+        """
+        assert is_point_tuple(points,0),'value %s is not a valid list of points' %  repr(points)
+        # Subclasses keep a fixed tuple of points, and must be rebuilt
+        if type(self._points) != list:
+            self.points = tuple(self._points)+tuple(points)
+            return
+        self._points.extend(points)
+        if not self._capacity is None and len(self._points) > 2*self._capacity:
+            self._drop(len(self._points)//2-self._capacity)
+        elif not self._line is None:
+            self._line.flag_data_update()
+    
+    def truncate(self,count):
+        """
+        Removes all but the first count points of this path.
+        
+        The points are removed from the Kivy line in place.
+        
+        :param count: the number of points to keep
+        :type count:  ``int`` >= 2
+        """
+        assert type(count) == int and count >= 2, 'value %s is not an int >= 2' % repr(count)
+        if 2*count >= len(self._points):
+            return
+        if type(self._points) != list:
+            self.points = self._points[:2*count]
+            return
+        del self._points[2*count:]
+        if not self._line is None:
+            self._line.flag_data_update()
+    
     def contains(self,point):
         """
         Checks whether this shape contains the point
@@ -255,11 +342,22 @@ class GPath(GObject):
         Resets the drawing cache
         """
         GObject._reset(self)
+        self._line = None
         if not self._linecolor is None:
             self._cache.add(self._linecolor)
-            line = Line(points=self.points,cap='round',joint='round',width=self.linewidth)
-            self._cache.add(line)
+            self._line = Line(points=self._points,cap='round',joint='round',width=self.linewidth)
+            # Share the points of the line, so that they can change in place
+            self._points = self._line.points
+            self._cache.add(self._line)
         self._cache.add(PopMatrix())
+    
+    def _drop(self,count):
+        """
+        Removes the first count points of this path.
+        """
+        del self._points[:2*count]
+        if not self._line is None:
+            self._line.flag_data_update()
 
 
 # #mark -
@@ -319,6 +417,8 @@ class GTriangle(GPath):
         :type keywords:  keys are attribute names
         """
         self._defined = False
+        self._line = None
+        self._capacity = None
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.points = keywords['points'] if 'points' in keywords else (-100,-58,0,116,100,-58)
         GObject.__init__(self,**keywords)
@@ -505,6 +605,8 @@ class GPolygon(GPath):
         :type keywords:  keys are attribute names
         """
         self._defined = False
+        self._line = None
+        self._capacity = None
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.points = keywords['points'] if 'points' in keywords else (-100,-58,0,116,100,-58)
         self.source = keywords['source'] if 'source' in keywords else None
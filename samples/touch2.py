@@ -44,6 +44,9 @@ class Touch(GameApp):
     Attribute lines: the set of lines to be drawn
     Invariant: lines is a list of GPath objects
     
+    Attribute stroke: the line following the mouse
+    Invariant: stroke is a GPath in lines, or None if the mouse is not drawing
+    
     Attribute clicks: the # of fast clicks in a row 
     Invariant: clicks is an int >= 0
     
@@ -63,6 +66,7 @@ class Touch(GameApp):
         self.time   = 0
         self.clicks = 0
         self.lines  = []
+        self.stroke = None
         self.state  = STATE_NONE
     
     def update(self,dt):
@@ -147,30 +151,36 @@ class Touch(GameApp):
         """
         self.clicks = 0
         self.lines = []
+        self.stroke = None
     
     def _drawLines(self):
         """
-        Adds a new line from touch to last.
+        Extends the stroke from last to touch.
+        
+        The stroke grows in place, so adding a point does not rebuild the line.
         """
         touch = self.input.touch
         
-        # Specify a line as list of two points
-        points = [self.last.x,self.last.y,touch.x,touch.y]
-        line = GPath(points=points,linecolor=LINE_COLOR)
-        self.lines.append(line)
+        if self.stroke is None:
+            # Specify a line as list of two points
+            points = [self.last.x,self.last.y,touch.x,touch.y]
+            self.stroke = GPath(points=points,linecolor=LINE_COLOR)
+            self.lines.append(self.stroke)
+        else:
+            self.stroke.append(touch.x,touch.y)
     
     def _smooth(self):
-        points = []
-        for x in self.lines:
-            points.extend(x.points[:2])
-        points.extend(self.lines[-1].points[2:])
+        if self.stroke is None:
+            return
+        points = self.stroke.points
+        self.stroke = None
         
         epsilon = 1
         from introcs import Vector2
         v1 = Vector2(0,0)
         v2 = Vector2(0,0)
         
-        copy = points[:2]
+        copy = list(points[:2])
         pivot = 0
         for ii in range(1,len(points)//2-1):
             # Get current point